@@ -110,14 +110,40 @@ class SatAPI(metaclass=MetaSatAPI):
     __satref__: dict = {}
     __loaded__: bool = False
     __energy__: Posiform = None
+    __fixed__: dict = {}
+    __bound__: float = None
 
     ext: str = "out.txt"
 
-    def __init__(self, *paths, guess: dict = None, legacy: bool = False):
-        """"""
+    ## Output file mode, either text ("t") or binary ("b")
+    mode: str = "t"
+
+    def __init__(self, *paths, guess: dict = None, legacy: bool = False, compact: bool = False, parallel: bool | int = False, constraint_cache: bool = True, preprocess: bool = False, early_stop: bool = False, tolerance: float = 1e-6):
+        """
+        Parameters
+        ----------
+        *paths : str
+            Source (.sat) and energy (.json, .satb) files.
+        guess : dict (optional)
+            Partial assignment fixed before solving.
+        legacy : bool (optional)
+            If true, opts for the legacy parser and its syntax.
+        compact : bool (optional)
+            If true, energy equations are built as array-backed 'CompactPosiform' objects.
+        parallel : bool or int (optional)
+            If true, constraints are compiled in a pool of worker processes, one for each CPU. An integer sets the number of workers instead.
+        constraint_cache : bool (optional)
+            If true (default), energies of single constraints are cached between compilations of each source.
+        preprocess : bool (optional)
+            If true, variables whose optimal values are known beforehand (roof duality) are fixed before solving, and merged back into complete answers. Interfaces that output anything else (e.g. the energy itself) are refused once variables are fixed, since their output would miss them.
+        early_stop : bool (optional)
+            If true, a lower bound on the energy is computed beforehand, so that interfaces may stop solving once it is reached (see `SatAPI.reached`).
+        tolerance : float (optional)
+            Absolute tolerance for an energy value to be taken as reaching the lower bound.
+        """
         if paths:
             try:
-                energy: Posiform | None = Satyrus(legacy=legacy).compile(*paths)
+                energy: Posiform | None = Satyrus(legacy=legacy, compact=compact, parallel=parallel, constraint_cache=constraint_cache).compile(*paths)
             except SatRuntimeError as exc:
                 stderr[0] << exc
                 energy: Posiform | None = None
@@ -125,14 +151,48 @@ class SatAPI(metaclass=MetaSatAPI):
             energy: Posiform | None = None
 
         if (energy is not None) and (guess is not None):
-            energy = energy(guess)
+            ## The energy was just compiled, so it is safe to fix it in place
+            energy = energy.fix(guess)
+
+        if (energy is not None) and preprocess:
+            energy, fixed = energy.preprocess()
+            self.log(f"Preprocessing fixed {len(fixed)} variables", level=2)
+        else:
+            fixed = {}
+
+        if (energy is not None) and early_stop:
+            bound = energy.lower_bound()
+            self.log(f"Energy lower bound: {bound}", level=2)
+            bound += tolerance
+        else:
+            bound = None
 
         self.energy(energy)
+        self.fixed(fixed)
+        self.bound(bound)
 
     @classmethod
     def energy(cls, __energy: Posiform | None):
         cls.__energy__ = __energy
 
+    @classmethod
+    def fixed(cls, __fixed: dict):
+        cls.__fixed__ = __fixed
+
+    @classmethod
+    def bound(cls, __bound: float | None):
+        cls.__bound__ = __bound
+
+    @classmethod
+    def target(cls) -> float | None:
+        """Energy value at which solvers may stop, being the lower bound plus tolerance. If early stopping is disabled, returns None."""
+        return cls.__bound__
+
+    @classmethod
+    def reached(cls, value: float) -> bool:
+        """Tells if energy `value` is known to be optimal, as it reaches the lower bound within tolerance."""
+        return (cls.__bound__ is not None) and (value <= cls.__bound__)
+
     @classmethod
     def extension(cls, name: str) -> str:
         if name in cls.__satapi__:
@@ -140,6 +200,13 @@ class SatAPI(metaclass=MetaSatAPI):
         else:
             return cls.ext
 
+    @classmethod
+    def output_mode(cls, name: str) -> str:
+        if name in cls.__satapi__:
+            return cls.__satapi__[name].mode
+        else:
+            return cls.mode
+
     def __getitem__(self, name: str):
         """"""
 
@@ -184,8 +251,60 @@ class SatAPI(metaclass=MetaSatAPI):
 
         if self.__energy__ is None:
             return None
+
+        answer = self[name]().solve(self.__energy__, **params)
+
+        if not self.complete(answer):
+            if self.__fixed__:
+                self.unfixed(name)
+            return answer
+
+        solution, value = answer
+
+        if self.reached(value):
+            self.log("Solution reaches the energy lower bound, thus it is optimal", level=2)
+
+        if self.__fixed__:
+            ## Merge preprocessed variables back into the solution
+            return ({**self.__fixed__, **solution}, value)
         else:
-            return self[name]().solve(self.__energy__, **params)
+            return answer
+
+    @Timing.timer(level=2, section="Solver.stream")
+    def dump(self, file, **params) -> bool:
+        """
+        Writes the interface output straight into `file`, for interfaces implementing `stream`.
+
+        Returns
+        -------
+        bool
+            Whether anything was written.
+        """
+
+        if "$solver" not in params:
+            raise KeyError("No solver specified")
+
+        name: str = params["$solver"]
+
+        if self.__energy__ is None or not self.streams(name):
+            return False
+        elif self.__fixed__:
+            self.unfixed(name)
+            return False
+        else:
+            self[name]().stream(self.__energy__, file, **params)
+            return True
+
+    @classmethod
+    def unfixed(cls, name: str):
+        """Refuses output from interface `name` other than solutions, since it would miss the variables fixed by preprocessing."""
+        cls.error(
+            f"Interface {name!r} doesn't return solutions, so its output would miss the {len(cls.__fixed__)} variable(s) fixed by preprocessing. Run it without preprocessing"
+        )
+
+    def streams(self, name: str) -> bool:
+        """Tells if interface `name` implements `stream`."""
+        return self[name].stream is not SatAPI.stream
 
     @classmethod
     def __load__(cls):
@@ -419,6 +538,10 @@ class SatAPI(metaclass=MetaSatAPI):
     def solve(self, energy: Posiform, **params: dict) -> tuple[dict, float] | object:
         pass
 
+    def stream(self, energy: Posiform, file, **params: dict):
+        """Optional counterpart of `solve` for textual outputs, writing them into `file` piecewise instead of returning them."""
+        raise NotImplementedError
+
     @staticmethod
     def error(message: str, code: int | None = EXIT_FAILURE):
         if stderr[0]:
@@ -448,6 +571,12 @@ class default(SatAPI):
         
         return energy.toJSON(indent=indent)
 
+    def stream(self, energy: Posiform, file, indent: int | None = 4, **params: dict):
+        """"""
+        self.check_params(indent=indent)
+
+        energy.dumpJSON(file, indent=indent)
+
     def check_params(self, **params):
         """"""
         if "indent" in params:
@@ -310,6 +310,54 @@ class SatCLI:
             help=satyrus_help("legacy"),
         )
 
+        # Optional - Compact Energy Representation
+        parser.add_argument(
+            "--compact",
+            dest="compact",
+            action="store_true",
+            help=satyrus_help("compact"),
+        )
+
+        # Optional - Parallel Compilation
+        parser.add_argument(
+            "-j",
+            "--parallel",
+            type=int,
+            dest="parallel",
+            nargs="?",
+            const=True,
+            default=False,
+            metavar="N",
+            help=satyrus_help("parallel"),
+        )
+
+        # Optional - Constraint Cache
+        parser.add_argument(
+            "--no-constraint-cache",
+            dest="constraint_cache",
+            action="store_false",
+            help=satyrus_help("no-constraint-cache"),
+        )
+
+        # Optional - Preprocessing
+        parser.add_argument(
+            "--preprocess",
+            dest="preprocess",
+            action="store_true",
+            help=satyrus_help("preprocess"),
+        )
+
+        # Optional - Early Stopping
+        parser.add_argument(
+            "--early-stop",
+            type=float,
+            dest="early_stop",
+            nargs="?",
+            const=1e-6,
+            metavar="TOL",
+            help=satyrus_help("early-stop"),
+        )
+
         # Optional - Timing Report
         parser.add_argument(
             "-r",
@@ -357,8 +405,13 @@ class SatCLI:
             stdwar[1] << "Warning: Cache Cleared."
 
         try:
+            if args.early_stop is None:
+                early_stop = {}
+            else:
+                early_stop = {"early_stop": True, "tolerance": args.early_stop}
+
             # Launch API
-            api = SatAPI(*args.source, guess=args.guess, legacy=args.legacy)
+            api = SatAPI(*args.source, guess=args.guess, legacy=args.legacy, compact=args.compact, parallel=args.parallel, constraint_cache=args.constraint_cache, preprocess=args.preprocess, **early_stop)
 
             # Solve in desired way
             if args.params is None:
@@ -366,15 +419,33 @@ class SatCLI:
             else:
                 params = {"$solver": args.solver, **args.params}
 
-            answer: tuple[dict, float] | str | object = api(**params)
+            if api.__energy__ is not None and api.streams(args.solver):
+                ext: str = api.extension(args.solver)
+
+                ## Refused before the output file is created
+                if api.__fixed__:
+                    api.unfixed(args.solver)
+
+                # Write output as it is produced
+                if args.output is None:
+                    args.output = f"{Path(args.source[0]).stem}.{ext}"
+
+                if api.output_mode(args.solver) == "b":
+                    with open(args.output, mode="wb") as file:
+                        api.dump(file, **params)
+                else:
+                    with open(args.output, mode="w", encoding="utf8") as file:
+                        api.dump(file, **params)
+            else:
+                answer: tuple[dict, float] | str | object = api(**params)
 
-            ext: str = api.extension(args.solver)
+                ext: str = api.extension(args.solver)
 
-            # Retrieve Output Destination
-            args.output, answer = cls.infer_output(ext, args, answer)
+                # Retrieve Output Destination
+                args.output, answer = cls.infer_output(ext, args, answer)
 
-            with open(args.output, mode="w", encoding="utf8") as file:
-                file.write(answer)
+                with open(args.output, mode="w", encoding="utf8") as file:
+                    file.write(answer)
 
             # Report
             if args.report:
@@ -10,6 +10,11 @@ __SATYRUS_HELP = {
     "report": "Shows detailed sectioned elapsed time",
     "params": "Path to JSON file containing parameters for passing to Solver API",
     "clear": "Clears compiler cache",
+    "compact": "Builds energy equations using the array-backed compact representation, for large models",
+    "parallel": "Compiles constraints in a pool of N worker processes (default: one for each CPU)",
+    "no-constraint-cache": "Compiles every constraint of changed sources again, instead of reusing the cached energies of unchanged ones",
+    "preprocess": "Fixes variables whose optimal values are known beforehand (roof duality) and solves for the remaining ones. Only for solvers, since energy outputs would miss the fixed variables",
+    "early-stop": "Computes a lower bound on the energy and lets solvers stop once it is reached, within an optional absolute tolerance (default: 1e-6)",
 }
 
 __SAT_API_HELP = {
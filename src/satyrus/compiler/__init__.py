@@ -1 +1,4 @@
-from .compiler import SatCompiler
\ No newline at end of file
+from .compiler import SatCompiler
+from .cache import ConstraintCache
+from .graph import DependencyGraph
+from .parallel import ConstraintPool
\ No newline at end of file
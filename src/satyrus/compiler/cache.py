@@ -0,0 +1,170 @@
+"""
+Constraint cache
+----------------
+
+Energies of constraint definitions are kept between compilations, keyed by a fingerprint of everything they depend on:
+
+    1. The constraint statement itself;
+    2. The values of the constants and arrays it refers to;
+    3. The environment options read while building it (`?tseitin`) and the numeric precision.
+
+Fingerprints are built from canonical strings (see `Expr.canonical`), so they hold across interpreter sessions. Entries are JSON data, which `Satyrus` keeps in a file for each source. The cache is bounded both by its number of entries and by the total size of their serialized energies.
+"""
+# Future Imports
+from __future__ import annotations
+
+# Standard Library
+import hashlib
+
+# Local
+from ..satlib import Posiform
+from ..types import Expr, Array, Number, SatType
+from ..symbols import TSEITIN
+
+## Bump whenever constraint compilation changes its results
+CACHE_VERSION = 1
+
+## Largest number of cached constraints
+CACHE_SIZE = 4096
+
+## Largest total size of cached energies, in characters of mini JSON
+CACHE_BYTES = 32 * 2**20
+
+
+class ConstraintCache(object):
+    """Least recently used cache of constraint energies."""
+
+    def __init__(self, entries: dict = None, maxbytes: int = CACHE_BYTES):
+        """
+        Parameters
+        ----------
+        entries : dict (optional)
+            Fingerprint -> {constype: [[level, energy], ...]}, with energies in mini JSON format. Kept by reference and updated in place.
+        maxbytes : int (optional)
+            Largest total size of cached energies. Least recently used entries are dropped past it, and larger energies aren't cached at all.
+        """
+        self.entries = {} if entries is None else entries
+        self.maxbytes = maxbytes
+
+        self.hits = 0
+        self.misses = 0
+
+        ## Total size of cached energies, and whether entries were added or dropped since loaded
+        self.size = sum(map(self.sizeof, self.entries.values()))
+        self.dirty = False
+
+        self.evict()
+
+        ## Array fingerprints, by object id (arrays are kept alive along with them)
+        self.arrays: dict[int, tuple[Array, str]] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __getitem__(self, key: str) -> dict[str, list[tuple[int, Posiform]]]:
+        """Fresh copies of the cached energies, since they are consumed by `RUN_SCRIPT`."""
+        ## Most recently used entries go last
+        entry = self.entries[key] = self.entries.pop(key)
+
+        return {
+            constype: [(level, Posiform.fromMiniJSON(energy)) for level, energy in energies]
+            for constype, energies in entry.items()
+        }
+
+    def __setitem__(self, key: str, constraints: dict[str, list[tuple[int, Posiform]]]):
+        if key in self.entries:
+            self.size -= self.sizeof(self.entries.pop(key))
+
+        entry = {
+            constype: [[level, energy.toMiniJSON()] for level, energy in energies]
+            for constype, energies in constraints.items()
+        }
+
+        self.dirty = True
+
+        if self.sizeof(entry) <= self.maxbytes:
+            self.entries[key] = entry
+            self.size += self.sizeof(entry)
+            self.evict()
+
+    def evict(self):
+        """Drops least recently used entries until the cache is within bounds."""
+        while len(self.entries) > CACHE_SIZE or self.size > self.maxbytes:
+            self.size -= self.sizeof(self.entries.pop(next(iter(self.entries))))
+            self.dirty = True
+
+    @staticmethod
+    def sizeof(entry: dict) -> int:
+        return sum(len(energy) for energies in entry.values() for _, energy in energies)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": CACHE_SIZE, "bytes": self.size, "maxbytes": self.maxbytes}
+
+    def key(self, compiler, stmt: tuple) -> str:
+        """Fingerprint of constraint definition `stmt` in the current compiler state."""
+        _, constype, name, loops, expr, level = stmt
+
+        names: set = set()
+
+        def leaf(x: SatType) -> str:
+            if x.is_var:
+                names.add(x)
+            return repr(x)
+
+        def write(x: object) -> str:
+            if x is None:
+                return "None"
+            elif isinstance(x, SatType):
+                return Expr.canonical(x, leaf)
+            elif isinstance(x, (tuple, list)):
+                return f"({','.join(map(write, x))})"
+            else:
+                return repr(str(x))
+
+        lines = [
+            f"version={CACHE_VERSION}",
+            f"stmt={write((constype, name, loops, expr, level))}",
+        ]
+
+        for var in sorted(names):
+            value = compiler.memory[var]
+            if value is not None:
+                lines.append(f"{var}={self.write(value)}")
+
+        lines.append(f"tseitin={compiler.env.get(TSEITIN)}")
+        lines.append(f"prec={Number.prec()}")
+
+        return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+    def write(self, value: SatType) -> str:
+        """Canonical string of a value in memory."""
+        if isinstance(value, Array):
+            if id(value) not in self.arrays:
+                self.arrays[id(value)] = (value, self.write_array(value))
+            return self.arrays[id(value)][1]
+        else:
+            return Expr.canonical(value, lambda x: (self.write(x) if isinstance(x, Array) else repr(x)))
+
+    def write_array(self, array: Array) -> str:
+        """Array name, shape and explicitly assigned entries. Subarrays are created on access, so they are only written through their entries."""
+        items = []
+
+        stack = [((), array)]
+
+        while stack:
+            index, a = stack.pop()
+            for i, x in a.array.items():
+                if isinstance(x, Array):
+                    stack.append(((*index, i), x))
+                else:
+                    items.append((*index, i, self.write(x)))
+
+        shape = ",".join(map(repr, array.shape))
+
+        return f"Array({array.var!r},({shape}),{sorted(items)!r})"
+
+
+__all__ = ["ConstraintCache"]
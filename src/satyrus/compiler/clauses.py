@@ -0,0 +1,120 @@
+"""
+Clause sets
+-----------
+
+Normal forms as sets of clauses, each one a frozenset of signed literal ids: `+k` for the k-th atom and `-k` for its negation. The same simplification rules hold both for the conjunctions of a D.N.F. and for the disjunctions of a C.N.F.:
+
+    1. Clauses with complementary literals are dropped, since they are always false (D.N.F.) or always true (C.N.F.);
+    2. Repeated clauses are merged;
+    3. Clauses that contain some other clause are dropped, since they are absorbed by it.
+"""
+# Future Imports
+from __future__ import annotations
+
+# Local
+from ..symbols import T_AND, T_OR, T_NOT
+from ..types import Expr, Number, SatType
+
+
+class Clauses(object):
+    """Set of clauses over literal ids."""
+
+    def __init__(self, outer: str, inner: str):
+        ## D.N.F. is (T_OR, T_AND) and C.N.F. is (T_AND, T_OR)
+        self.outer = outer
+        self.inner = inner
+
+        self.atoms: list[SatType] = []
+        self.ids: dict[SatType, int] = {}
+
+        self.clauses: set[frozenset[int]] = set()
+
+    @classmethod
+    def dnf(cls, expr: SatType) -> Clauses | None:
+        """Clause set of `expr`, if it is in D.N.F."""
+        return cls.parse(expr, T_OR, T_AND)
+
+    @classmethod
+    def cnf(cls, expr: SatType) -> Clauses | None:
+        """Clause set of `expr`, if it is in C.N.F."""
+        return cls.parse(expr, T_AND, T_OR)
+
+    @classmethod
+    def parse(cls, expr: SatType, outer: str, inner: str) -> Clauses | None:
+        clauses = cls(outer, inner)
+
+        for x in (expr.tail if (expr.is_expr and expr.head == outer) else (expr,)):
+            clause = set()
+            for y in (x.tail if (x.is_expr and x.head == inner) else (x,)):
+                literal = clauses.literal(y)
+                if literal is None:
+                    return None
+                clause.add(literal)
+            clauses.clauses.add(frozenset(clause))
+
+        return clauses
+
+    def literal(self, x: SatType) -> int | None:
+        """Signed id of literal `x`, with negations stripped."""
+        s = 1
+        while x.is_expr and x.head == T_NOT:
+            s = -s
+            (x,) = x.tail
+
+        if x.is_number or (x.is_expr and x.head in {T_AND, T_OR}):
+            return None
+
+        if x not in self.ids:
+            self.atoms.append(x)
+            self.ids[x] = len(self.atoms)
+
+        return s * self.ids[x]
+
+    def simplify(self) -> Clauses:
+        """Drops complementary, repeated and subsumed clauses, in place."""
+        clauses = sorted(
+            (c for c in self.clauses if not any(-k in c for k in c)),
+            key=len,
+        )
+
+        ## Kept clauses, indexed by one of their literals
+        index: dict[int, list[frozenset[int]]] = {}
+
+        self.clauses = set()
+
+        for c in clauses:
+            if c in self.clauses:
+                continue
+            elif any(d <= c for k in c for d in index.get(k, ())):
+                continue
+            else:
+                self.clauses.add(c)
+                if c:
+                    index.setdefault(min(c), []).append(c)
+
+        return self
+
+    def __len__(self) -> int:
+        return len(self.clauses)
+
+    def expr(self) -> SatType:
+        """Rebuilds the normal form expression."""
+        tail = []
+
+        for c in self.clauses:
+            literals = [
+                (self.atoms[k - 1] if k > 0 else Expr(T_NOT, self.atoms[-k - 1]))
+                for k in sorted(c, key=abs)
+            ]
+            tail.append(literals[0] if len(literals) == 1 else Expr(self.inner, *literals))
+
+        if not tail:
+            ## False disjunction or true conjunction
+            return Number("0") if self.outer == T_OR else Number("1")
+        elif len(tail) == 1:
+            return tail[0]
+        else:
+            return Expr(self.outer, *tail)
+
+
+__all__ = ["Clauses"]
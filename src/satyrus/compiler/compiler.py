@@ -7,8 +7,9 @@ from __future__ import annotations
 from cstream import stderr, stdlog, stdwar
 
 # Local
+from .graph import DependencyGraph, Replay
 from .memory import Memory
-from ..satlib import Source, Stack, Posiform, Timing
+from ..satlib import Source, Stack, Posiform, CompactPosiform, Timing
 from ..parser import SatParser
 from ..parser.legacy import SatLegacyParser
 from ..error import (
@@ -19,7 +20,7 @@ from ..error import (
     SatWarning,
 )
 from ..types import Expr, SatType, Number, Var, Array
-from ..symbols import OPT, CMD_INIT, CMD_SCRIPT
+from ..symbols import OPT, CMD_INIT, CMD_SCRIPT, DEF_CONSTRAINT, RUN_SCRIPT
 from ..symbols import CONS_INT, CONS_OPT
 
 class SatCompiler:
@@ -51,7 +52,7 @@ class SatCompiler:
             self.parser = parser
 
         # -*- Flags -*-
-        self.__flags__ = {"slow": False}
+        self.__flags__ = {"slow": False, "compact": False}
 
         # Source Code
         self.source: Source = None
@@ -78,10 +79,21 @@ class SatCompiler:
         # Errors
         self.error_stack = Stack()
 
+        # Parallel constraint compilation (ConstraintPool), and part (k, n) of the outermost loop to be expanded
+        self.pool = None
+        self.shard = None
+
+        # Constraint energies from previous compilations (ConstraintCache)
+        self.cache = None
+
+        # Statements executed in the last compilation, and the ones being replayed by `SatCompiler.rerun`
+        self.graph: DependencyGraph = None
+        self.replay: Replay = None
+
     def __enter__(self, *args, **kwargs):
         ## Instantiate subcompiler
         subcomp = self.__class__(self.instructions, self.parser)
-        subcomp.memory = self.memory.copy
+        subcomp.memory = self.memory.copy()
         subcomp.env = self.env.copy()
         return subcomp
 
@@ -162,7 +174,17 @@ class SatCompiler:
             BYTECODE = self.parse(source)
 
             ## Adds special instructions RUN_INIT, RUN_SCRIPT in both ends
-            self.execute([CMD_INIT, *BYTECODE, CMD_SCRIPT])
+            self.graph = DependencyGraph([CMD_INIT, *BYTECODE, CMD_SCRIPT])
+            self.graph.initial = (self.memory.copy(), dict(self.env), {k: list(v) for k, v in self.constraints.items()}, dict(self.penalties))
+
+            self.execute(self.graph.bytecode)
+
+            if stdlog[3]:
+                info = Expr.calculate_info()
+                stdlog[3] << f"Expr.calculate cache: {info['hits']} hits, {info['misses']} misses, size {info['size']}/{info['maxsize']}"
+                if self.cache is not None:
+                    info = self.cache.info()
+                    stdlog[3] << f"Constraint cache: {info['hits']} hits, {info['misses']} misses, size {info['size']}/{info['maxsize']}, {info['bytes']}/{info['maxbytes']} bytes"
         except SatExit as error:
             self.code = error.code
             self.energy = self.source = None
@@ -178,6 +200,41 @@ class SatCompiler:
             raise error
         else:
             return self.code
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+
+    def rerun(self, values: dict) -> int:
+        """Compiles the last source again with some constants changed. Only the statements that depend on them are executed, while the others are replayed from the dependency graph.
+
+        Parameters
+        ----------
+        values : dict
+                New values of constants, which replace every definition of them.
+
+        Returns
+        -------
+        int
+                Compiler exit code.
+        """
+        if self.graph is None or self.source is None:
+            raise ValueError("There is no successful compilation to run again.")
+
+        graph = self.graph
+
+        memory, env, constraints, penalties = graph.initial
+
+        self.memory = memory.copy()
+        self.env = dict(env)
+        self.constraints = {k: list(v) for k, v in constraints.items()}
+        self.penalties = dict(penalties)
+
+        self.replay = Replay(graph, values)
+
+        try:
+            return self.compile(self.source)
+        finally:
+            self.replay = None
 
     def parse(self, source: Source, load: bool = False) -> list:
         """Parses source into bytecode.
@@ -196,7 +253,7 @@ class SatCompiler:
         return self.parser.parse(source)
 
     def execute(self, bytecode: list):
-        """Executes bytecode sequentially.
+        """Executes bytecode sequentially. Constraint definitions go through `SatCompiler.define`.
 
         Parameters
         ----------
@@ -205,13 +262,96 @@ class SatCompiler:
         """
 
         for stmt in bytecode:
+            if self.replay is not None:
+                stmt = self.replay.override(stmt)
+
             stdlog[3] << "\n\t".join([f"CMD {stmt[0]}", *(f"{i} {x}" for i, x in enumerate(stmt[1:]))])
-            self.exec(stmt)
+
+            if self.pool is not None and stmt[0] == RUN_SCRIPT:
+                self.pool.gather(self)
+
+            if self.graph is None:
+                self.step(stmt)
+            else:
+                index = self.graph.enter(stmt)
+                try:
+                    if self.replay is None or not self.replay.reuse(self, index, stmt):
+                        self.step(stmt)
+                finally:
+                    self.graph.leave()
+
+            if self.pool is not None and stmt[0] != DEF_CONSTRAINT:
+                self.pool.invalidate()
         else:
             stdlog[3] << ""
 
         self.checkpoint()
 
+    def step(self, stmt: tuple):
+        """Executes a single statement. Constraint definitions go through `SatCompiler.define`."""
+        if stmt[0] == DEF_CONSTRAINT:
+            self.define(stmt)
+        else:
+            self.exec(stmt)
+
+    def define(self, stmt: tuple):
+        """Executes a constraint definition, unless its energy is cached. If a constraint pool is set, it is compiled there instead, and gathered before running the script.
+
+        Parameters
+        ----------
+        stmt : tuple
+                (DEF_CONSTRAINT, *args) instruction.
+        """
+        if self.cache is None:
+            key = None
+        else:
+            key = self.cache.key(self, stmt)
+
+        if self.graph is None:
+            index = None
+        else:
+            index = self.graph.current
+
+        def store(constraints: dict, cache: bool = True) -> dict:
+            if self.flag("compact"):
+                ## Array-backed energies are held while the remaining constraints are compiled
+                constraints = {
+                    constype: [(level, CompactPosiform(energy)) for level, energy in energies]
+                    for constype, energies in constraints.items()
+                }
+            if cache and key is not None:
+                self.cache[key] = constraints
+            if index is not None:
+                self.graph.keep(index, constraints)
+            return constraints
+
+        if (key is not None and key in self.cache) or self.pool is not None:
+            ## Not executed here, so names read are taken from the statement
+            if index is not None:
+                for name in DependencyGraph.names(stmt):
+                    self.graph.read(name)
+
+        if key is not None and key in self.cache:
+            self.cache.hits += 1
+            constraints = store(self.cache[key], cache=False)
+            if self.pool is None:
+                for constype, energies in constraints.items():
+                    self.constraints[constype].extend(energies)
+            else:
+                self.pool.put(constraints)
+        else:
+            if key is not None:
+                self.cache.misses += 1
+
+            if self.pool is None:
+                size = {constype: len(energies) for constype, energies in self.constraints.items()}
+                self.exec(stmt)
+                constraints = store({constype: energies[size[constype]:] for constype, energies in self.constraints.items()})
+                for constype, energies in constraints.items():
+                    self.constraints[constype][size[constype]:] = energies
+            else:
+                self.pool.submit(self, stmt, store)
+
     def exit(self, code: int = 0):
         """Exits compiler session with a given code.
 
@@ -240,7 +380,10 @@ class SatCompiler:
     def memset(self, name: Var, value: SatType):
         """ """
         try:
-            return self.memory.memset(name, value)
+            result = self.memory.memset(name, value)
+            if self.graph is not None and self.memory.depth == 1:
+                self.graph.write(name, value)
+            return result
         except SatTypeError as error:
             self << error
         finally:
@@ -255,7 +398,10 @@ class SatCompiler:
                 Internal Satyrus Object retrieved from compiler memory.
         """
         try:
-            return self.memory.memget(name)
+            value = self.memory.memget(name)
+            if self.graph is not None:
+                self.graph.read(name)
+            return value
         except SatReferenceError as error:
             self << error
         finally:
@@ -327,7 +473,10 @@ class SatCompiler:
             return item
         elif type(item) is Var:
             try:
-                return self.memory.memget(item)
+                value = self.memory.memget(item)
+                if self.graph is not None:
+                    self.graph.read(item)
+                return value
             except SatReferenceError as error:
                 if miss:
                     self << error
@@ -348,9 +497,10 @@ class SatCompiler:
         """
         self.memory.push()
 
+        ## Inner scopes aren't tracked by the dependency graph, and memory doesn't raise errors there
         if context is not None:
             for k, v in context.items():
-                self.memset(k, v)
+                self.memory.memset(k, v)
 
     def pop(self, depth: int = 1):
         """Removes a given number of layers from the memory stack. If removal goes beyond global scope, an exception is raised.
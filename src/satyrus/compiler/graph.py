@@ -0,0 +1,182 @@
+"""
+Dependency graph
+----------------
+
+Every statement executed by the compiler is a node, along with the global names it reads (through `SatCompiler.memget` and `SatCompiler.evaluate`) and the ones it writes (through `SatCompiler.memset`, at global scope). A statement depends on the last statement that wrote each name it reads. Since environment options aren't tracked by name, system configuration statements (and `RUN_INIT`) are taken as read by every statement after them, and `RUN_SCRIPT` depends on everything before it.
+
+When constants change, only the statements downstream of their definitions have to be executed again (see `SatCompiler.rerun`). The others are replayed from the graph: names they wrote are set back to the same values, and constraint energies are reused.
+
+The graph isn't used for scheduling: constraint definitions don't write names, so the ones between two other statements are already independent and go to the pool together (see `parallel.py`). Neither does it invalidate the constraint cache, whose keys are the values a constraint reads (see `cache.py`).
+"""
+# Future Imports
+from __future__ import annotations
+
+# Local
+from ..satlib import Posiform
+from ..types import Var, SatType, Expr
+from ..symbols import SYS_CONFIG, RUN_INIT, RUN_SCRIPT, DEF_CONSTANT, DEF_ARRAY, DEF_CONSTRAINT
+
+
+class DependencyGraph(object):
+    """Statements executed by the compiler, with the global names each one reads and writes."""
+
+    def __init__(self, bytecode: list = None):
+        """
+        Parameters
+        ----------
+        bytecode : list (optional)
+            Top-level bytecode being executed.
+        """
+        self.bytecode = bytecode
+
+        self.stmts: list[tuple] = []
+        self.reads: list[set[Var]] = []
+        self.writes: list[dict[Var, SatType]] = []
+
+        ## Constraint energies of each statement, by constraint type
+        self.results: list[dict[str, list[tuple[int, Posiform]]] | None] = []
+
+        ## Statements being executed (`?load` nests them)
+        self.stack: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.stmts)
+
+    # -*- Recording -*-
+    @property
+    def current(self) -> int | None:
+        return self.stack[-1] if self.stack else None
+
+    def enter(self, stmt: tuple) -> int:
+        index = len(self.stmts)
+
+        self.stmts.append(stmt)
+        self.reads.append(set())
+        self.writes.append({})
+        self.results.append(None)
+
+        self.stack.append(index)
+
+        return index
+
+    def leave(self):
+        self.stack.pop()
+
+    def read(self, name: Var):
+        if self.stack:
+            self.reads[self.stack[-1]].add(name)
+
+    def write(self, name: Var, value: SatType):
+        if self.stack:
+            self.writes[self.stack[-1]][name] = value
+
+    def keep(self, index: int, constraints: dict[str, list[tuple[int, Posiform]]]):
+        self.results[index] = constraints
+
+    @staticmethod
+    def names(stmt: tuple) -> set[Var]:
+        """Names that appear in the arguments of `stmt`."""
+        names = set()
+
+        stack = list(stmt[1:])
+
+        while stack:
+            x = stack.pop()
+            if isinstance(x, SatType):
+                names.update(y for y in Expr.traverse(x) if y.is_var)
+            elif isinstance(x, (tuple, list)):
+                stack.extend(x)
+
+        return names
+
+    # -*- Structure -*-
+    def parents(self) -> list[set[int]]:
+        """Statements each statement depends on."""
+        parents = []
+
+        ## Last writer of each name, and configuration statements so far
+        writer: dict[Var, int] = {}
+        barrier: set[int] = set()
+
+        for j, stmt in enumerate(self.stmts):
+            if stmt[0] == RUN_SCRIPT:
+                parents.append(set(range(j)))
+            else:
+                parents.append({writer[name] for name in self.reads[j] if name in writer} | barrier)
+
+            for name in self.writes[j]:
+                writer[name] = j
+
+            if stmt[0] == SYS_CONFIG or stmt[0] == RUN_INIT:
+                barrier.add(j)
+
+        return parents
+
+    def children(self) -> list[set[int]]:
+        """Statements depending on each statement."""
+        children = [set() for _ in self.stmts]
+
+        for j, parents in enumerate(self.parents()):
+            for i in parents:
+                children[i].add(j)
+
+        return children
+
+    def affected(self, names: set[Var]) -> list[int]:
+        """Statements that write any of `names`, and those downstream of them, in execution order."""
+        children = self.children()
+
+        stack = [j for j in range(len(self.stmts)) if not names.isdisjoint(self.writes[j])]
+        affected = set(stack)
+
+        while stack:
+            for j in children[stack.pop()]:
+                if j not in affected:
+                    affected.add(j)
+                    stack.append(j)
+
+        return sorted(affected)
+
+
+class Replay(object):
+    """Executes bytecode again with some constants changed, reusing the results of statements that don't depend on them."""
+
+    def __init__(self, graph: DependencyGraph, values: dict[Var, SatType]):
+        self.graph = graph
+        self.values = values
+        self.affected = set(graph.affected(set(values)))
+
+    def override(self, stmt: tuple) -> tuple:
+        """Constant definitions of changed names take their new values."""
+        if stmt[0] == DEF_CONSTANT and stmt[1] in self.values:
+            return (DEF_CONSTANT, stmt[1], self.values[stmt[1]])
+        else:
+            return stmt
+
+    def reuse(self, compiler, index: int, stmt: tuple) -> bool:
+        """Replays statement `index` from the previous execution, if it isn't affected. Returns False if it must be executed."""
+        graph = self.graph
+
+        if index in self.affected or index >= len(graph) or graph.stmts[index][0] != stmt[0]:
+            return False
+        elif stmt[0] == DEF_CONSTANT or stmt[0] == DEF_ARRAY:
+            for name in graph.reads[index]:
+                compiler.graph.read(name)
+            for name, value in graph.writes[index].items():
+                compiler.memset(name, value)
+            return True
+        elif stmt[0] == DEF_CONSTRAINT and graph.results[index] is not None:
+            for name in graph.reads[index]:
+                compiler.graph.read(name)
+            compiler.graph.keep(index, graph.results[index])
+            if compiler.pool is None:
+                for constype, energies in graph.results[index].items():
+                    compiler.constraints[constype].extend(energies)
+            else:
+                compiler.pool.put(graph.results[index])
+            return True
+        else:
+            return False
+
+
+__all__ = ["DependencyGraph", "Replay"]
@@ -11,7 +11,11 @@ from typing import Callable
 from cstream import stdlog
 
 ## Local
+from ..clauses import Clauses
 from ..compiler import SatCompiler
+from ..loops import LoopDomain
+from ..template import Template
+from ..tseitin import Tseitin
 from ...satlib import arange, Stack, Posiform
 from ...error import (
     SatIndexError,
@@ -20,7 +24,7 @@ from ...error import (
     SatExprError,
     SatWarning,
 )
-from ...symbols import CONS_INT, CONS_OPT
+from ...symbols import CONS_INT, CONS_OPT, TSEITIN
 from ...symbols import T_EXISTS, T_UNIQUE, T_FORALL
 from ...symbols import T_AND, T_OR, T_NOT, T_NE, T_ADD, T_NEG, T_MUL, T_XOR, T_POW
 from ...types import Expr, Var, String, Number, SatType
@@ -251,9 +255,12 @@ def build(
                     R,
                     S,
                     level + 1,
-                    Expr(
-                        T_NOT, Expr(T_AND, expr, Expr.sub(expr, item["var"], var))
-                    ).dnf,
+                    normal(
+                        compiler,
+                        Expr(
+                            T_NOT, Expr(T_AND, expr, Expr.sub(expr, item["var"], var))
+                        ),
+                    ),
                 )
             elif item["type"] == T_FORALL:
                 B.push({**item, "type": T_EXISTS})
@@ -314,33 +321,70 @@ def build(
         else:
             raise ValueError(f"Invalid constraint type '{constype}'")
     else:
+        tseitin = None
+
         if constype == CONS_INT:
             expr = Expr.calculate(~expr)
+            # Here I'm supposing that everything that is not an 'Expr' is in the C.N.F.
+            # (Also in any other normal form, such as D.N.F.)
             if expr.is_expr:
-                energy = unstack(compiler, B, expr.dnf, {})
-            else:
-                # Here I'm supposing that everything that is not an 'Expr' is in the C.N.F.
-                # (Also in any other normal form, such as D.N.F.)
-                energy = unstack(compiler, B, expr, {})
+                if Tseitin.size(expr) > compiler.env[TSEITIN]:
+                    # -*- Auxiliary Variables instead of D.N.F. expansion -*-
+                    tseitin = Tseitin()
+                else:
+                    expr = expr.dnf
+
+                    # -*- Drop contradictory, repeated and subsumed conjunctions -*-
+                    clauses = Clauses.dnf(expr)
+
+                    if clauses is not None:
+                        expr = clauses.simplify().expr()
         elif constype == CONS_OPT:
             if expr.is_expr:
-                energy = unstack(compiler, B, expr.dnf, {})
-            else:
-                energy = unstack(compiler, B, expr, {})
+                expr = expr.dnf
         else:
             raise ValueError(f"Invalid constraint type '{constype}'")
 
+        # -*- Expression Template & Admissible Loop Indices -*-
+        if tseitin is None:
+            template = Template.compile(expr, {item["var"] for item in B})
+        else:
+            template = None
+
+        domain = LoopDomain.compile(list(reversed(B)))
+
+        energy = unstack(compiler, B, expr, {}, template, domain, tseitin, compiler.shard)
+
+        if tseitin is not None:
+            definitions = tseitin.definitions
+        else:
+            definitions = []
+
         if level is None:
             level = 0
 
-        if stdlog[3]:
-            stdlog[3] << energy
+        if compiler.shard is not None:
+            ## Partial energy over a part of the outermost loop, completed by `merge`
+            compiler.constraints[constype].append((int(level), energy, B.top["type"], definitions))
+        else:
+            if definitions:
+                energy += Posiform.sum(H(compiler, x) for x in definitions)
+
+            if stdlog[3]:
+                stdlog[3] << energy
 
-        compiler.constraints[constype].append((int(level), energy))
+            compiler.constraints[constype].append((int(level), energy))
 
 
 def unstack(
-    compiler: SatCompiler, stack: Stack, expr: Expr, context: dict
+    compiler: SatCompiler,
+    stack: Stack,
+    expr: Expr,
+    context: dict,
+    template: Template = None,
+    domain: LoopDomain = None,
+    tseitin: Tseitin = None,
+    shard: tuple[int, int] = None,
 ) -> tuple[int, Posiform]:
     """"""
 
@@ -348,29 +392,10 @@ def unstack(
         # -*- Retrieve Innermost Quatifier -*-
         item = stack.pop()
 
-        var: Var = item["var"]
-
         if item["type"] == T_FORALL:
-            energy = Posiform(1.0)
-            for i in arange(*item["bounds"]):
-                context[var] = i
-                if item["cond"] is None or compiler.evaluate(
-                    item["cond"], miss=False, context=context
-                ):
-                    energy *= unstack(compiler, stack, expr, context)
-
-            del context[var]
-
+            energy = Posiform.prod(replicate(compiler, stack, expr, context, item, template, domain, tseitin, shard))
         elif item["type"] == T_EXISTS:
-            energy = Posiform(0.0)
-            for i in arange(*item["bounds"]):
-                context[var] = i
-                if item["cond"] is None or compiler.evaluate(
-                    item["cond"], miss=False, context=context
-                ):
-                    energy += unstack(compiler, stack, expr, context)
-
-            del context[var]
+            energy = Posiform.sum(replicate(compiler, stack, expr, context, item, template, domain, tseitin, shard))
         else:
             raise ValueError(f"Invalid Quantifier '{item['type']}'")
 
@@ -379,43 +404,162 @@ def unstack(
 
         return energy
     else:
-        return H(compiler, compiler.evaluate(expr, miss=False, context=context))
+        if template is not None:
+            energy = template(context)
+            if energy is not None:
+                return energy
+
+        x = compiler.evaluate(expr, miss=False, context=context)
+
+        if tseitin is not None:
+            x = tseitin(x)
+
+        return H(compiler, x)
+
+
+def replicate(
+    compiler: SatCompiler,
+    stack: Stack,
+    expr: Expr,
+    context: dict,
+    item: dict,
+    template: Template = None,
+    domain: LoopDomain = None,
+    tseitin: Tseitin = None,
+    shard: tuple[int, int] = None,
+):
+    """Yields the energy of every iteration of the quantifier loop in `item`, or only of the `k`-th of `n` contiguous parts of them if `shard` is `(k, n)`."""
+    var: Var = item["var"]
+
+    if domain is not None:
+        ## Conditions were already checked over the whole index grid
+        for i in domain(var, shard):
+            context[var] = i
+            yield unstack(compiler, stack, expr, context, template, domain, tseitin)
+    elif shard is not None:
+        indices = []
+        for i in arange(*item["bounds"]):
+            context[var] = i
+            if item["cond"] is None or compiler.evaluate(
+                item["cond"], miss=False, context=context
+            ):
+                indices.append(i)
+
+        k, n = shard
+
+        for i in indices[len(indices) * k // n : len(indices) * (k + 1) // n]:
+            context[var] = i
+            yield unstack(compiler, stack, expr, context, template, None, tseitin)
+    else:
+        for i in arange(*item["bounds"]):
+            context[var] = i
+            if item["cond"] is None or compiler.evaluate(
+                item["cond"], miss=False, context=context
+            ):
+                yield unstack(compiler, stack, expr, context, template, None, tseitin)
+
+    context.pop(var, None)
+
+
+def outer_size(compiler: SatCompiler, loops: list) -> int:
+    """Number of iterations of the outermost loop in `loops`, regardless of its condition. Zero if there are no loops or if its bounds are not plain numbers."""
+    if not loops:
+        return 0
+
+    (_, _, bounds, _) = loops[0]
+
+    start, stop, step = (
+        compiler.evaluate(x, miss=False, calc=True, null=True) for x in bounds
+    )
+
+    if not all(type(x) is Number for x in (start, stop)):
+        return 0
+    elif step is None:
+        return int(abs(stop - start)) + 1
+    elif type(step) is not Number or step == Number("0") or (stop - start) * step < 0:
+        return 0
+    else:
+        return int((stop - start) / step) + 1
+
+
+def merge(compiler: SatCompiler, parts: list[tuple]) -> tuple[int, Posiform]:
+    """Completes a constraint energy from its parts, as built by every shard of the outermost loop.
+
+    Partial energies are merged pairwise (tree reduction), and then auxiliary variable definitions are added, each one once and in order of appearance, as in a serial build.
+    """
+    level, _, quantifier, _ = parts[0]
+
+    energies = [energy for _, energy, _, _ in parts]
+
+    while len(energies) > 1:
+        if quantifier == T_FORALL:
+            energies = [
+                (energies[i] * energies[i + 1] if i + 1 < len(energies) else energies[i])
+                for i in range(0, len(energies), 2)
+            ]
+        else:
+            energies = [
+                (energies[i] + energies[i + 1] if i + 1 < len(energies) else energies[i])
+                for i in range(0, len(energies), 2)
+            ]
+
+    (energy,) = energies
+
+    definitions = list(dict.fromkeys(x for _, _, _, d in parts for x in d))
+
+    if definitions:
+        energy += Posiform.sum(H(compiler, x) for x in definitions)
+
+    return (level, energy)
+
+
+def normal(compiler: SatCompiler, x: Expr) -> SatType:
+    """D.N.F. of `x`, unless it is too large, in which case `build` encodes it with auxiliary variables instead."""
+    if Tseitin.size(x) > compiler.env[TSEITIN]:
+        return x
+    else:
+        return x.dnf
 
 
 def H(compiler: SatCompiler, x: SatType) -> Posiform:
     """Energy Equation Mapping"""
+    return Expr.fold(
+        x,
+        lambda y, t: H_node(compiler, y, t),
+        lambda y: H_xor(*y.tail) if (y.is_expr and y.head == T_XOR) else y,
+    )
+
+
+def H_xor(a: SatType, b: SatType) -> SatType:
+    return (a & ~b) | (~a & b)
+
+
+def H_node(compiler: SatCompiler, x: SatType, t: list[Posiform] | None) -> Posiform:
+    """Energy of node `x`, given the energies `t` of its operands."""
 
     if x.is_expr:
         if x.head == T_NOT:
-            return 1.0 - H(compiler, x[1])
+            return 1.0 - t[0]
         elif x.head == T_AND or x.head == T_MUL:
-            e = Posiform(1.0)
-            for y in x.tail:
-                e *= H(compiler, y)
-            return e
+            return Posiform.prod(t)
         elif x.head == T_POW:
-            a, b = x.tail
+            a, b = t
             try:
-                return H(compiler, a) ** H(compiler, b)
+                return a ** b
             except TypeError:
                 compiler << SatValueError(
-                    f"Can't compute power to non-integer '{b}'", target=b
+                    f"Can't compute power to non-integer '{x[2]}'", target=x[2]
                 )
         elif x.head == T_OR or x.head == T_ADD:
-            e = Posiform(0.0)
-            for y in x.tail:
-                e += H(compiler, y)
-            return e
-        elif x.head == T_XOR:
-            a, b = x.tail
-            return H(compiler, (a & ~b) | (~a & b))
+            return Posiform.sum(t)
         elif x.head == T_NEG:
-            if len(x.tail) == 1:
-                (a,) = x.tail
-                return -H(compiler, a)
-            elif len(x.tail) == 2:
-                a, b = x.tail
-                return H(compiler, a) - H(compiler, b)
+            if len(t) == 1:
+                (a,) = t
+                return -a
+            elif len(t) == 2:
+                e, b = t
+                e -= b
+                return e
             else:
                 raise ValueError(
                     f"Unable to map '{x.head}({len(x.tail)})' into energy equation"
@@ -3,7 +3,7 @@
 
 from ..compiler import SatCompiler
 from ...types import Number
-from ...symbols import PREC, OPT, EPSILON, ALPHA
+from ...symbols import PREC, OPT, EPSILON, ALPHA, TSEITIN
 
 
 def run_init(compiler: SatCompiler, *args: tuple):
@@ -15,6 +15,8 @@ def run_init(compiler: SatCompiler, *args: tuple):
         (OPT, 0),
         (ALPHA, Number("1.0")),
         (EPSILON, Number("1E-4")),
+        ## Largest D.N.F. size of integrity constraints before using auxiliary variables
+        (TSEITIN, 1024),
     ]
 
     for key, val in default_env:
@@ -9,6 +9,7 @@ from cstream import stdlog
 
 # Local
 from ..compiler import SatCompiler
+from ...satlib import CompactPosiform
 from ...error import SatValueError, SatCompilerError, SatWarning
 from ...types import Number
 from ...symbols import CONS_INT, CONS_OPT, PREC, EPSILON, ALPHA
@@ -117,10 +118,28 @@ def run_script_penalties(compiler: SatCompiler):
 
 def run_script_energy(compiler: SatCompiler):
     """"""
+    if compiler.flag("compact"):
+        return run_script_energy_compact(compiler)
+
     # Integrity
     Ei = sum((compiler.penalties[level] * energy for level, energy in compiler.constraints[CONS_INT]), 0.0)
 
     # Optimality
     Eo = sum((compiler.penalties[level] * energy for level, energy in compiler.constraints[CONS_OPT]), 0.0)
 
-    compiler.energy = Ei + Eo
\ No newline at end of file
+    compiler.energy = Ei + Eo
+
+
+def run_script_energy_compact(compiler: SatCompiler):
+    """Builds the energy equation using the array-backed 'CompactPosiform', merging all terms at once. Constraint energies are released from 'compiler.constraints' as they are added up."""
+
+    def weighted():
+        for constype in (CONS_INT, CONS_OPT):
+            constraints = compiler.constraints[constype]
+            ## Pops in source order
+            constraints.reverse()
+            while constraints:
+                level, energy = constraints.pop()
+                yield compiler.penalties[level] * CompactPosiform(energy)
+
+    compiler.energy = CompactPosiform.sum(weighted())
@@ -10,7 +10,7 @@ from pathlib import Path
 ## Local
 from ..compiler import SatCompiler
 from ...satlib import Source
-from ...symbols import PREC, DIR, LOAD, OUT, EPSILON, ALPHA, EXIT
+from ...symbols import PREC, DIR, LOAD, OUT, EPSILON, ALPHA, EXIT, TSEITIN
 from ...types import SatType, String, Number, Var, Array
 from ...error import SatValueError, SatTypeError, SatFileError, SatWarning
 
@@ -113,6 +113,30 @@ def sys_config_alpha(compiler, name: Var, argc: int, argv: list):
     compiler.checkpoint()
 
 
+def sys_config_tseitin(compiler, name: Var, argc: int, argv: list):
+    """Largest D.N.F. size of integrity constraints before they are encoded with auxiliary variables."""
+    if argc != 1:
+        if argc == 0:
+            compiler << SatValueError(
+                f"`?tseitin` expected 1 argument, got none.", target=name
+            )
+        else:
+            compiler << SatValueError(
+                f"`?tseitin` expected 1 argument, got {argc}.", target=argv[1]
+            )
+    elif type(argv[0]) is not Number:
+        compiler << SatTypeError(
+            f"The D.N.F. size threshold must be a non-negative integer.", target=argv[0]
+        )
+    elif not argv[0].is_int or int(argv[0]) < 0:
+        compiler << SatValueError(
+            f"The D.N.F. size threshold must be a non-negative integer.", target=argv[0]
+        )
+    else:
+        compiler.env[TSEITIN] = int(argv[0])
+    compiler.checkpoint()
+
+
 def sys_config_exit(compiler, name: Var, argc: int, argv: list):
     """Exits program, for debug purposes."""
     if argc != 1:
@@ -146,5 +170,6 @@ sys_config_options = {
     LOAD: sys_config_load,
     EPSILON: sys_config_epsilon,
     ALPHA: sys_config_alpha,
+    TSEITIN: sys_config_tseitin,
     ## OUT : sys_config_out,
 }
@@ -0,0 +1,216 @@
+"""
+Quantifier loop domains
+-----------------------
+
+Loop conditions over integer loop indices and constants are evaluated at once over the whole index grid, level by level: the admissible index tuples of the outermost `k + 1` loops are the admissible tuples of the outermost `k` loops times the range of loop `k + 1`, filtered by its condition.
+
+Tuples at each level are grouped by their prefix, so that iterating over the admissible values of a loop given the outer ones is just a slice.
+"""
+# Future Imports
+from __future__ import annotations
+
+# Standard Library
+from typing import Callable
+
+# Third-Party
+import numpy as np
+
+# Local
+from ..satlib import arange
+from ..symbols import T_AND, T_OR, T_NOT, T_ADD, T_MUL, T_NEG
+from ..symbols import T_EQ, T_NE, T_LT, T_LE, T_GT, T_GE
+from ..types import Number, SatType
+
+## Largest number of index tuples evaluated at once
+GRID_SIZE = 1 << 24
+
+COMPARISONS = {
+    T_EQ: np.equal,
+    T_NE: np.not_equal,
+    T_LT: np.less,
+    T_LE: np.less_equal,
+    T_GT: np.greater,
+    T_GE: np.greater_equal,
+}
+
+
+class LoopDomain(object):
+    """Admissible values of nested quantifier loops."""
+
+    def __init__(self):
+        self.level: dict[str, int] = {}
+
+        ## Loop values, as well as each admissible tuple at every level, given by its last value (column) and grouped by prefix (offset)
+        ## Levels without condition keep every tuple, so both are left as None: tuple `r` has column `r % n` and prefix `r // n`
+        self.values: list[list[Number]] = []
+        self.column: list[np.ndarray | None] = []
+        self.offset: list[np.ndarray | None] = []
+
+        ## Current tuple at each level
+        self.row: list[int] = [0]
+
+    @classmethod
+    def compile(cls, loops: list[dict]) -> LoopDomain | None:
+        """
+        Parameters
+        ----------
+        loops : list[dict]
+            Quantifier loops, from outermost to innermost.
+
+        Returns
+        -------
+        LoopDomain or None
+            None if some loop is not over integers, or some condition is not made of loop indices and numeric constants, or if the grid is too large.
+        """
+        domain = cls()
+
+        arrays: list[np.ndarray] = []
+        size = 1
+
+        for k, item in enumerate(loops):
+            values = list(arange(*item["bounds"]))
+
+            if not all(type(i) is Number and i.is_int for i in values):
+                return None
+
+            n = len(values)
+
+            if size * n > GRID_SIZE:
+                return None
+
+            arrays.append(np.array([int(i) for i in values], dtype=np.int64))
+
+            if item["cond"] is None:
+                column = offset = None
+                size = size * n
+            else:
+                predicate = cls.predicate(item["cond"], {loop["var"] for loop in loops[: k + 1]})
+
+                if predicate is None:
+                    return None
+
+                parent = np.repeat(np.arange(size), n)
+                column = np.tile(np.arange(n), size)
+
+                grid = domain.grid(loops, arrays, parent)
+                grid[item["var"]] = arrays[k][column]
+
+                mask = np.broadcast_to(predicate(grid) != 0, parent.shape)
+
+                parent = parent[mask]
+                column = column[mask]
+                offset = np.searchsorted(parent, np.arange(size + 1))
+                size = len(parent)
+
+            domain.level[item["var"]] = k
+            domain.values.append(values)
+            domain.column.append(column)
+            domain.offset.append(offset)
+            domain.row.append(0)
+
+        return domain
+
+    def grid(self, loops: list[dict], arrays: list[np.ndarray], rows: np.ndarray) -> dict[str, np.ndarray]:
+        """Values of the compiled loops at each of the given tuples of the innermost compiled level."""
+        grid = {}
+
+        for k in reversed(range(len(self.values))):
+            n = len(arrays[k])
+
+            if self.column[k] is None:
+                grid[loops[k]["var"]] = arrays[k][rows % n]
+                rows = rows // n
+            else:
+                grid[loops[k]["var"]] = arrays[k][self.column[k][rows]]
+                rows = np.searchsorted(self.offset[k], rows, side="right") - 1
+
+        return grid
+
+    def __call__(self, var: str, shard: tuple[int, int] = None):
+        """Yields the admissible values for loop `var`, given the current values of the outer ones. If `shard` is `(k, n)`, only the `k`-th of `n` contiguous parts of them."""
+        k = self.level[var]
+        p = self.row[k]
+
+        values = self.values[k]
+        column = self.column[k]
+        offset = self.offset[k]
+
+        if offset is None:
+            start, stop = p * len(values), (p + 1) * len(values)
+        else:
+            start, stop = int(offset[p]), int(offset[p + 1])
+
+        if shard is not None:
+            i, n = shard
+            start, stop = start + (stop - start) * i // n, start + (stop - start) * (i + 1) // n
+
+        if column is None:
+            columns = range(start - p * len(values), stop - p * len(values))
+        else:
+            columns = column[start:stop].tolist()
+
+        for r, c in enumerate(columns, start):
+            self.row[k + 1] = r
+            yield values[c]
+
+    @classmethod
+    def predicate(cls, x: SatType, loops: set) -> Callable[[dict], np.ndarray] | None:
+        """Compiles condition `x` into a vectorized function of the loop index columns, following `Number` semantics."""
+        if x.is_number:
+            if x.is_int:
+                i = int(x)
+                return lambda grid: np.int64(i)
+            else:
+                return None
+        elif x.is_var:
+            if x in loops:
+                return lambda grid: grid[x]
+            else:
+                return None
+        elif x.is_expr:
+            tail = [cls.predicate(y, loops) for y in x.tail]
+
+            if None in tail:
+                return None
+            elif x.head in COMPARISONS and len(tail) == 2:
+                f, g = tail
+                op = COMPARISONS[x.head]
+                return lambda grid: op(f(grid), g(grid)).astype(np.int64)
+            elif x.head == T_AND or x.head == T_MUL:
+                def product(grid: dict) -> np.ndarray:
+                    p = np.int64(1)
+                    for f in tail:
+                        p = p * f(grid)
+                    return p
+                return product
+            elif x.head == T_OR:
+                def disjunction(grid: dict) -> np.ndarray:
+                    p = np.int64(0)
+                    for f in tail:
+                        q = f(grid)
+                        p = p + q - p * q
+                    return p
+                return disjunction
+            elif x.head == T_ADD:
+                def addition(grid: dict) -> np.ndarray:
+                    p = np.int64(0)
+                    for f in tail:
+                        p = p + f(grid)
+                    return p
+                return addition
+            elif x.head == T_NOT and len(tail) == 1:
+                (f,) = tail
+                return lambda grid: 1 - f(grid)
+            elif x.head == T_NEG and len(tail) == 1:
+                (f,) = tail
+                return lambda grid: -f(grid)
+            elif x.head == T_NEG and len(tail) == 2:
+                f, g = tail
+                return lambda grid: f(grid) - g(grid)
+            else:
+                return None
+        else:
+            return None
+
+
+__all__ = ["LoopDomain"]
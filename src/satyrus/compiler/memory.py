@@ -1,80 +1,137 @@
 """
 satyrus/compiler/memory.py
 --------------------------
+
+Names visible from the current scope are kept in a single flat table, so lookups don't depend on scope depth. Every inner scope keeps an undo log with the values it has shadowed, which are restored when it is removed.
+
+Snapshots (`Memory.copy`) don't copy the table: it is frozen into a layer shared by both copies, and each of them writes into a new table on top of it. Layer chains are merged once they grow past `LAYERS`, so lookups take at most that many steps. That merge is linear in the number of names, so snapshots take amortized O(n / LAYERS) time rather than constant time. Pickling a snapshot writes every layer once, however many copies refer to it.
 """
 
 ## Local
 from ..error import SatReferenceError
 from ..types import Var, SatType
 
+## Longest chain of frozen layers
+LAYERS = 8
+
+## Lookup sentinel for names not in a table
+MISSING = object()
+
+class Layer(object):
+	""" Frozen memory table, shared between snapshots.
+	"""
+	__slots__ = ("table", "parent", "depth")
+
+	def __init__(self, table: dict, parent: "Layer"=None):
+		if parent is not None and parent.depth >= LAYERS:
+			table = {**parent.flatten(), **table}
+			parent = None
+
+		self.table = table
+		self.parent = parent
+		self.depth = 1 if parent is None else parent.depth + 1
+
+	def get(self, key):
+		layer = self
+		while layer is not None:
+			value = layer.table.get(key, MISSING)
+			if value is not MISSING:
+				return value
+			layer = layer.parent
+		else:
+			return None
+
+	def flatten(self) -> dict:
+		table = {} if self.parent is None else self.parent.flatten()
+		table.update(self.table)
+		return table
+
 class Memory(object):
 	""" Satyrus Compiler Memory
 	"""
 	def __init__(self, defaults: dict=None):
-		self.__memory = [{} if defaults is None else defaults]
+		self.__memory = {} if defaults is None else defaults
+		self.__undo = []
+		self.__base = None
 
 	def __str__(self):
-		return ">\n".join("\n".join(f"{key}:\t{val}" for key, val in layer.items()) for layer in self.__memory)
+		return "\n".join(f"{key}:\t{val}" for key, val in self.items())
 
 	def __iter__(self):
-		i = len(self.__memory) - 1
-		found = set()
-		while i >= 0:
-			for key in self.__memory[i]:
-				if key not in found:
-					yield self.__memory[i][key]
-					found.add(key)
-				else:
-					continue
-			else:
-				i -= 1
+		return iter([val for _, val in self.items()])
 
 	def __getitem__(self, key):
-		i = len(self.__memory) - 1
-		while i >= 0:
-			try:
-				return self.__memory[i][key]
-			except KeyError:
-				i -= 1
+		value = self.__memory.get(key, MISSING)
+		if value is not MISSING:
+			return value
+		elif self.__base is not None:
+			return self.__base.get(key)
 		else:
 			return None
 
 	def __contains__(self, item):
 		return self[item] is not None
 
+	def items(self) -> list:
+		table = {} if self.__base is None else self.__base.flatten()
+		table.update(self.__memory)
+		## Undefined names are kept as None over frozen layers
+		return [(key, val) for key, val in table.items() if val is not None]
+
 	@property
-	def copy(self):
+	def depth(self) -> int:
+		"""Number of scopes, the global one included."""
+		return len(self.__undo) + 1
+
+	def copy(self) -> "Memory":
+		""" Snapshot of this memory. Both keep writing on their own, without affecting each other.
+
+		Freezing the current table takes constant time, plus the undo logs of inner scopes, which are copied. Every `LAYERS` snapshots the frozen layers are merged into one, which takes time linear in the number of names, so the cost is amortized O(n / LAYERS).
+		"""
+		if self.__memory:
+			## Frozen tables are never written again
+			self.__base = Layer(self.__memory, self.__base)
+			self.__memory = {}
+
 		new_mem = self.__class__()
-		new_mem.__memory = [layer.copy() for layer in self.__memory]
+		new_mem.__base = self.__base
+		new_mem.__undo = [undo.copy() for undo in self.__undo]
 		return new_mem
 
 	def push(self):
 		"""
 		"""
-		self.__memory.append({})
+		self.__undo.append({})
 
 	def pop(self, n: int=1):
 		"""
 		"""
 		for _ in range(n):
-			if len(self.__memory) > 1:
-				self.__memory.pop()
+			if self.__undo:
+				for key, val in self.__undo.pop().items():
+					if val is None and (self.__base is None or self.__base.get(key) is None):
+						self.__memory.pop(key, None)
+					else:
+						self.__memory[key] = val
 			else:
 				raise ValueError("Can't remove global scope.")
 
 	def clear(self):
 		"""
 		"""
-		# Clear list
-		del self.__memory[:]
-		
-		# Add global scope
-		self.__memory.append({})
+		self.__memory = {}
+		self.__undo = []
+		self.__base = None
 
 	def memset(self, name: Var, value: SatType):
 		"""
 		"""
-		self.__memory[-1][name] = value
+		if self.__undo:
+			## Only the value from before this scope is restored
+			undo = self.__undo[-1]
+			if name not in undo:
+				undo[name] = self[name]
+		self.__memory[name] = value
 
 	def memget(self, name: Var):
 		"""
@@ -83,4 +140,4 @@ class Memory(object):
 		if value is None:
 			raise SatReferenceError(f"Undefined variable `{name}`.", target=name)
 		else:
-			return value
\ No newline at end of file
+			return value
@@ -0,0 +1,212 @@
+"""
+Parallel constraint compilation
+-------------------------------
+
+Constraint definitions only read the compiler memory and environment, and append their energy to `compiler.constraints`. In parallel mode they are sent to a process pool along with a snapshot of memory and environment, taken at the point where they appear in the source, and their energies are merged back in source order before `RUN_SCRIPT`.
+
+Snapshots are pickled once and shared by all the constraints between two other statements. Workers keep the last one they have unpickled.
+
+Constraints are also split along their outermost loop into contiguous parts (shards), one for each worker, or one for each iteration if there are fewer of them. Every shard builds a partial energy, and those are merged pairwise (see `def_constraint.merge`), which matches the serial result up to floating point rounding.
+"""
+# Future Imports
+from __future__ import annotations
+
+# Standard Library
+import itertools as it
+import os
+import pickle
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable
+
+# Third-Party
+from cstream import stderr
+
+# Local
+from .compiler import SatCompiler
+from .instructions.def_constraint import merge, outer_size
+from ..satlib import Stack
+from ..error import SatError, SatExit
+from ..types import Number
+from ..symbols import CONS_INT, CONS_OPT
+
+
+class WorkerCompiler(SatCompiler):
+    """Compiles single constraints, collecting error messages instead of printing them."""
+
+    def __init__(self, *args, **kwargs):
+        SatCompiler.__init__(self, *args, **kwargs)
+
+        self.errors: list[str] = []
+
+        ## Last snapshot loaded
+        self.snapshot: int = None
+        self.state: dict = None
+
+    def interrupt(self):
+        while self.error_stack:
+            self.errors.append(str(self.error_stack.popleft()))
+        else:
+            self.exit(1)
+
+    def load(self, key: int, snapshot: bytes):
+        if self.snapshot != key:
+            self.state = pickle.loads(snapshot)
+            self.snapshot = key
+
+        self.memory = self.state["memory"].copy()
+        self.env = dict(self.state["env"])
+        self.source = self.state["source"]
+        self.__flags__ = dict(self.state["flags"])
+
+        Number.prec(self.state["prec"])
+
+        self.constraints = {CONS_INT: [], CONS_OPT: []}
+        self.error_stack = Stack()
+        self.errors = []
+
+    def run(self, stmt: tuple, shard: tuple[int, int] = None) -> tuple[int, dict, list[str]]:
+        self.shard = shard
+        try:
+            self.exec(stmt)
+            self.checkpoint()
+        except SatExit as error:
+            return (error.code, None, self.errors)
+        except SatError as error:
+            return (error.code, None, [str(error)])
+        else:
+            return (0, self.constraints, [])
+        finally:
+            self.shard = None
+
+
+## Compiler instance of each worker process
+WORKER: WorkerCompiler = None
+
+
+def init_worker(instructions: dict, parser: type):
+    global WORKER
+    WORKER = WorkerCompiler(instructions, parser())
+
+
+def run_worker(key: int, snapshot: bytes, stmt: tuple, shard: tuple[int, int] = None) -> tuple[int, dict, list[str]]:
+    WORKER.load(key, snapshot)
+    return WORKER.run(stmt, shard)
+
+
+class ConstraintPool(object):
+    """Process pool where constraint definitions are compiled."""
+
+    def __init__(self, workers: int = None):
+        """
+        Parameters
+        ----------
+        workers : int (optional)
+            Number of worker processes, defaults to the number of CPUs.
+        """
+        if workers is None:
+            self.workers = os.cpu_count() or 1
+        elif not isinstance(workers, int) or workers <= 0:
+            raise ValueError("'workers' must be a positive integer (int).")
+        else:
+            self.workers = workers
+
+        self.executor: ProcessPoolExecutor = None
+
+        self.count = 0
+        self.snapshot: tuple[int, bytes] = None
+        ## Futures for the shards of every constraint, along with a callback storing its energy
+        self.futures: list[tuple[list[Future], Callable[[dict], dict]]] = []
+
+    def submit(self, compiler: SatCompiler, stmt: tuple, store: Callable[[dict], dict] = None):
+        """Sends constraint definition `stmt` to the pool, along with the current compiler state. Its energy is passed to `store` once gathered, which returns the energy to be kept."""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(compiler.instructions, type(compiler.parser)),
+            )
+
+        if self.snapshot is None:
+            self.count += 1
+            self.snapshot = (
+                self.count,
+                pickle.dumps(
+                    {
+                        "memory": compiler.memory,
+                        "env": compiler.env,
+                        "source": compiler.source,
+                        "flags": compiler.__flags__,
+                        "prec": Number.prec(),
+                    },
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                ),
+            )
+
+        n = min(self.workers, outer_size(compiler, stmt[3]))
+
+        if n <= 1:
+            self.futures.append(([self.executor.submit(run_worker, *self.snapshot, stmt)], store))
+        else:
+            self.futures.append(
+                ([self.executor.submit(run_worker, *self.snapshot, stmt, (k, n)) for k in range(n)], store)
+            )
+
+    def put(self, constraints: dict):
+        """Queues energies that are already known, to be gathered in order."""
+        future = Future()
+        future.set_result((0, constraints, []))
+        self.futures.append(([future], None))
+
+    def invalidate(self):
+        """Discards the current snapshot, after the compiler state has changed."""
+        self.snapshot = None
+
+    def gather(self, compiler: SatCompiler):
+        """Appends constraint energies to `compiler.constraints` in submission order, interrupting at the first failure."""
+        futures, self.futures = self.futures, []
+
+        for shards, store in futures:
+            results = [future.result() for future in shards]
+
+            for code, _, errors in results:
+                if code:
+                    for future in it.chain(*(shards for shards, _ in futures)):
+                        future.cancel()
+
+                    for error in errors:
+                        stderr[0] << error
+
+                    compiler.exit(code)
+
+            if len(results) == 1:
+                (_, constraints, _) = results[0]
+            else:
+                constraints = {
+                    constype: [
+                        merge(compiler, list(parts))
+                        for parts in zip(*(shard[constype] for _, shard, _ in results))
+                    ]
+                    for constype in compiler.constraints
+                }
+
+            if store is not None:
+                constraints = store(constraints)
+
+            for constype, energies in constraints.items():
+                compiler.constraints[constype].extend(energies)
+
+    def shutdown(self):
+        ## Pending futures are cancelled here, since 'cancel_futures' needs Python 3.9
+        for shards, _ in self.futures:
+            for future in shards:
+                future.cancel()
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+        self.snapshot = None
+        self.futures = []
+
+
+__all__ = ["ConstraintPool"]
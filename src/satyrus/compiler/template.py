@@ -0,0 +1,349 @@
+"""
+Quantifier expansion templates
+------------------------------
+
+A constraint body is mapped into its energy once, with placeholder variables standing for the indexed atoms (`x[i][j]`, `c[i][k + 1]`, `i`, ...). Every iteration of the quantifier loops then just resolves the atoms for the current loop indices, with plain integer arithmetic, and substitutes them into the placeholder terms.
+
+Substitution agrees with `Expr.calculate` followed by `H` since both are ring homomorphisms over boolean variables, except for two rules:
+
+    1. Disjunctions drop repeated operands and absorb constants;
+    2. Negated conjunctions and disjunctions follow De Morgan's laws.
+
+Bodies where (2) may apply are not compiled at all, while the iterations where (1) would apply, as well as those where some atom is not well-defined, fall back to regular evaluation.
+"""
+# Future Imports
+from __future__ import annotations
+
+# Standard Library
+from typing import Callable
+
+# Local
+from ..error import SatError
+from ..satlib import Posiform
+from ..symbols import T_IDX, T_AND, T_OR, T_NOT, T_ADD, T_MUL, T_NEG, T_POW
+from ..types import Array, Number, Var, SatType
+
+
+class Template(object):
+    """Constraint body energy with placeholder atoms, instantiated for each combination of loop indices."""
+
+    def __init__(self, loops: set):
+        self.loops = loops
+
+        ## Placeholder resolution: atoms[k] maps loop indices into a name or a number
+        self.atoms: list[Callable[[dict], str | Number | None]] = []
+        self.names: dict[object, str] = {}
+
+        ## Resolved array entries
+        self.cache: dict[int, dict[tuple, str | Number | None]] = {}
+
+        ## Disjunctions: each operand as a tuple of (polarity, placeholder) literals
+        self.guards: list[list[tuple[tuple[bool, int], ...]]] = []
+
+        self.terms: list[tuple[tuple[int, ...], float]] = []
+
+    @classmethod
+    def compile(cls, expr: SatType, loops: set) -> Template | None:
+        """
+        Parameters
+        ----------
+        expr : SatType
+            Constraint body, as passed on to `unstack`.
+        loops : set
+            Loop variables.
+
+        Returns
+        -------
+        Template or None
+            None if the body has constructs for which substitution might disagree with regular evaluation.
+        """
+        template = cls(loops)
+
+        energy = template.__expand(expr)
+
+        if energy is None:
+            return None
+
+        template.terms = [
+            (() if k is None else tuple(sorted(int(x[1:]) for x in k)), v)
+            for k, v in energy.items()
+        ]
+
+        return template
+
+    def __call__(self, context: dict) -> Posiform | None:
+        """
+        Parameters
+        ----------
+        context : dict
+            Loop variable values.
+
+        Returns
+        -------
+        Posiform or None
+            None if the current iteration requires regular evaluation.
+        """
+        env = {}
+
+        for var, i in context.items():
+            if type(i) is Number and i.is_int:
+                env[var] = int(i)
+            else:
+                return None
+
+        values = [atom(env) for atom in self.atoms]
+
+        if None in values:
+            return None
+
+        for guard in self.guards:
+            keys = set()
+            for operand in guard:
+                key = []
+                for s, k in operand:
+                    if type(values[k]) is not str:
+                        return None
+                    key.append((s, values[k]))
+                key = frozenset(key)
+                if key in keys:
+                    return None
+                keys.add(key)
+
+        posiform = Posiform()
+
+        for atoms, cons in self.terms:
+            term = set()
+            for k in atoms:
+                if type(values[k]) is str:
+                    term.add(values[k])
+                else:
+                    cons *= float(values[k])
+
+            term = frozenset(term) if term else None
+
+            if term in posiform:
+                cons += posiform[term]
+
+            posiform[term] = cons
+
+        for term in [term for term, cons in posiform.items() if cons == 0.0]:
+            del posiform[term]
+
+        return posiform
+
+    # -*- Placeholders -*-
+    def __placeholder(self, atom: Callable, key: object = None) -> Posiform:
+        """Placeholders sharing a key are the same boolean variable, while unique ones (`key = None`) may also become numbers."""
+        if key is None or key not in self.names:
+            name = f"#{len(self.atoms)}"
+            self.atoms.append(atom)
+            if key is not None:
+                self.names[key] = name
+        else:
+            name = self.names[key]
+
+        return Posiform({(name,): 1.0})
+
+    def __loop(self, var: Var) -> Posiform:
+        return self.__placeholder(lambda env: Number(env[var]))
+
+    def __entry(self, x: SatType) -> Posiform | None:
+        """Array entry `a[i]...[k]` whose indices are integer expressions on loop variables."""
+        array, *index = x.tail
+
+        if type(array) is not Array:
+            return None
+
+        index = [self.__index(i) for i in index]
+
+        if None in index:
+            return None
+
+        cache = self.cache.setdefault(id(array), {})
+
+        def atom(env: dict) -> str | Number | None:
+            key = tuple(i(env) for i in index)
+
+            if key not in cache:
+                try:
+                    y = array._IDX_(tuple(map(Number, key)))
+                except SatError:
+                    y = None
+
+                if type(y) is Var:
+                    cache[key] = str(y)
+                elif type(y) is Number:
+                    cache[key] = y
+                else:
+                    cache[key] = None
+
+            return cache[key]
+
+        if self.numeric(array):
+            return self.__placeholder(atom)
+        else:
+            return self.__placeholder(atom, (id(array), tuple(index_key(i) for i in x.tail[1:])))
+
+    def __index(self, x: SatType) -> Callable[[dict], int] | None:
+        """Compiles an index expression into plain integer arithmetic."""
+        if x.is_number:
+            if x.is_int:
+                i = int(x)
+                return lambda env: i
+            else:
+                return None
+        elif x.is_var:
+            if x in self.loops:
+                return lambda env: env[x]
+            else:
+                return None
+        elif x.is_expr:
+            tail = [self.__index(y) for y in x.tail]
+
+            if None in tail:
+                return None
+            elif x.head == T_ADD:
+                return lambda env: sum(f(env) for f in tail)
+            elif x.head == T_MUL:
+                def product(env: dict) -> int:
+                    p = 1
+                    for f in tail:
+                        p *= f(env)
+                    return p
+                return product
+            elif x.head == T_NEG and len(tail) == 1:
+                (f,) = tail
+                return lambda env: -f(env)
+            else:
+                return None
+        else:
+            return None
+
+    @classmethod
+    def numeric(cls, array: Array) -> bool:
+        """Tells if any entry of `array` holds a number."""
+        return any(cls.numeric(y) if type(y) is Array else True for y in array.array.values())
+
+    # -*- Energy Mapping -*-
+    @staticmethod
+    def polarity(x: SatType) -> tuple[bool, SatType]:
+        """Strips negations from `x`, telling if their number is even."""
+        s = True
+        while x.is_expr and x.head == T_NOT:
+            s = not s
+            (x,) = x.tail
+        return s, x
+
+    def __literal(self, x: SatType) -> Posiform | None:
+        """Literal operands, i.e. (negated) array entries or constants."""
+        s, x = self.polarity(x)
+
+        if x.is_expr and x.head == T_IDX:
+            energy = self.__entry(x)
+        elif x.is_number:
+            energy = Posiform(x)
+        elif x.is_var and x in self.loops:
+            energy = self.__loop(x)
+        else:
+            return None
+
+        if energy is None or s:
+            return energy
+        else:
+            return 1.0 - energy
+
+    def __expand(self, x: SatType) -> Posiform | None:
+        """Same as `H` from `def_constraint`, over placeholders."""
+        if x.is_expr:
+            if x.head == T_IDX:
+                return self.__entry(x)
+            elif x.head == T_NOT:
+                (y,) = x.tail
+                if y.is_expr and y.head in {T_AND, T_OR}:
+                    return None
+                energy = self.__expand(y)
+                return None if energy is None else 1.0 - energy
+            elif x.head == T_AND:
+                literals = [self.__literal(y) for y in x.tail]
+                return None if None in literals else Posiform.prod(literals)
+            elif x.head == T_OR:
+                return self.__disjunction(x)
+            elif x.head == T_MUL:
+                tail = [self.__expand(y) for y in x.tail]
+                return None if None in tail else Posiform.prod(tail)
+            elif x.head == T_ADD:
+                tail = [self.__expand(y) for y in x.tail]
+                return None if None in tail else Posiform.sum(tail)
+            elif x.head == T_NEG and len(x.tail) == 1:
+                (y,) = x.tail
+                energy = self.__expand(y)
+                return None if energy is None else -energy
+            elif x.head == T_POW:
+                return self.__power(x)
+            else:
+                return None
+        elif x.is_number:
+            return Posiform(x)
+        elif x.is_var and x in self.loops:
+            return self.__loop(x)
+        else:
+            return None
+
+    def __disjunction(self, x: SatType) -> Posiform | None:
+        """Operands must be conjunctions of literals, whose atoms are checked for repetitions on every iteration."""
+        guard = []
+        tail = []
+
+        for y in x.tail:
+            operand = y.tail if (y.is_expr and y.head == T_AND) else (y,)
+            literals = []
+            energies = []
+            for z in operand:
+                s, atom = self.polarity(z)
+                if not (atom.is_expr and atom.head == T_IDX):
+                    return None
+                energy = self.__entry(atom)
+                if energy is None:
+                    return None
+                ((name,),) = energy.keys()
+                literals.append((s, int(name[1:])))
+                energies.append(energy if s else 1.0 - energy)
+            guard.append(tuple(literals))
+            tail.append(Posiform.prod(energies))
+
+        self.guards.append(guard)
+
+        return Posiform.sum(tail)
+
+    def __power(self, x: SatType) -> Posiform | None:
+        """Powers of boolean placeholders only, since placeholders are taken as idempotent."""
+        a, b = x.tail
+
+        if not b.is_number:
+            return None
+
+        energy = self.__expand(a)
+
+        if energy is None:
+            return None
+
+        shared = set(self.names.values())
+
+        if any(name not in shared for name in energy.variables):
+            return None
+
+        try:
+            return energy ** Posiform(b)
+        except TypeError:
+            return None
+
+
+def index_key(x: SatType) -> object:
+    """Hashable key for index expressions."""
+    if x.is_expr:
+        return (x.head, *map(index_key, x.tail))
+    else:
+        return (type(x).__name__, str(x))
+
+
+__all__ = ["Template"]
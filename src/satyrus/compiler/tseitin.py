@@ -0,0 +1,92 @@
+"""
+Auxiliary variable encoding
+---------------------------
+
+Integrity constraints are penalized through the energy of the D.N.F. of their negation, whose size is exponential on the nesting of the formula. Above a given D.N.F. size (`?tseitin` option), formulas are instead taken into negation normal form, and every disjunction `s` that is an operand of a conjunction is replaced by an auxiliary variable `z` (Plaisted-Greenbaum encoding). Its definition is added to the constraint as `~z & s`, whose energy `(1 - z) H(s)` forces `z` up whenever `s` holds.
+
+Auxiliary variables are named after the structure of their disjunction, so that the same subformula gets the same variable in every constraint, regardless of the order (or process) in which constraints are compiled.
+
+Since energies are monotone on auxiliary variables, the encoded energy is zero for some choice of them if and only if the original one is zero, and at least one otherwise.
+"""
+# Future Imports
+from __future__ import annotations
+
+# Standard Library
+import hashlib
+
+# Local
+from ..symbols import T_AND, T_OR
+from ..types import Expr, Var, SatType
+
+
+class Tseitin(object):
+    """Replaces nested disjunctions of a formula by auxiliary variables."""
+
+    PREFIX = "$t"
+
+    def __init__(self):
+        ## Auxiliary variable of each disjunction, and their definitions
+        self.names: dict[Expr, Var] = {}
+        self.definitions: list[Expr] = []
+
+    @staticmethod
+    def nnf(x: SatType) -> SatType:
+        """Negation normal form of `x`, as in `Expr.dnf`."""
+        return Expr.apply(
+            x, lambda e: Expr._move_not_inwards(Expr._remove_implications(e))
+        )
+
+    @classmethod
+    def size(cls, x: SatType) -> int:
+        """Number of conjunctions in the D.N.F. of `x`."""
+
+        def size(y: SatType, t: list | None) -> int:
+            if t is None or not y.is_expr:
+                return 1
+            elif y.head == T_OR:
+                return sum(t)
+            elif y.head == T_AND:
+                p = 1
+                for n in t:
+                    p *= n
+                return p
+            else:
+                return 1
+
+        return Expr.fold(cls.nnf(x), size)
+
+    def __call__(self, x: SatType) -> SatType:
+        """Encodes formula `x`, adding the definitions of its new auxiliary variables to `self.definitions`."""
+
+        def encode(y: SatType, t: list | None) -> SatType:
+            if t is None or not y.is_expr:
+                return y
+            elif y.head == T_AND:
+                return Expr(
+                    T_AND,
+                    *((self.auxiliary(z) if (z.is_expr and z.head == T_OR) else z) for z in t),
+                )
+            elif y.head == T_OR:
+                return Expr(T_OR, *t)
+            else:
+                return y
+
+        return Expr.fold(self.nnf(x), encode)
+
+    @classmethod
+    def name(cls, s: Expr) -> str:
+        """Auxiliary variable name for disjunction `s`, independent of operand order."""
+        digest = hashlib.blake2b(Expr.canonical(s).encode("utf-8"), digest_size=8)
+
+        return f"{cls.PREFIX}{digest.hexdigest()}"
+
+    def auxiliary(self, s: Expr) -> Var:
+        if s not in self.names:
+            z = Var(self.name(s))
+            self.names[s] = z
+            self.definitions.append(Expr(T_AND, ~z, s))
+
+        return self.names[s]
+
+
+__all__ = ["Tseitin"]
@@ -0,0 +1,38 @@
+"""
+"""
+# Future Imports
+from __future__ import annotations
+
+# Standard Library
+import io
+
+# -*- Satyrus -*-
+from satyrus import SatAPI, Posiform
+
+
+class binary(SatAPI):
+    """"""
+
+    ext: str = "satb"
+
+    mode: str = "b"
+
+    def solve(self, energy: Posiform, **params: dict) -> bytes:
+        """
+        Parameters
+        ----------
+        energy : Posiform
+            Input Expression
+
+        Returns
+        -------
+        bytes
+            Energy in the binary format read by 'Posiform.loadBinary' and 'CompactPosiform.loadBinary', also accepted as Satyrus input.
+        """
+        file = io.BytesIO()
+        energy.dumpBinary(file)
+        return file.getvalue()
+
+    def stream(self, energy: Posiform, file, **params: dict):
+        """"""
+        energy.dumpBinary(file)
@@ -24,15 +24,33 @@ class dwave(SatAPI):
 
         sampler = neal.SimulatedAnnealingSampler()
 
-        x, Q, c = energy.qubo()
+        x, (I, J, V), c = energy.qubo(sparse=True)
 
-        sampleset = sampler.sample_qubo(Q, num_reads=num_reads, num_sweeps=num_sweeps)
+        Q = {(i, j): q for i, j, q in zip(I.tolist(), J.tolist(), V.tolist())}
 
-        y, e, *_ = sampleset.record[0]
+        if self.target() is None:
+            sampleset = sampler.sample_qubo(Q, num_reads=num_reads, num_sweeps=num_sweeps)
+
+            y, e = sampleset.first.sample, sampleset.first.energy
+        else:
+            ## Sample in batches, stopping as soon as the lower bound is reached
+            y, e = None, None
+
+            batch = max(1, num_reads // 10)
+
+            for k in range(0, num_reads, batch):
+                sampleset = sampler.sample_qubo(Q, num_reads=min(batch, num_reads - k), num_sweeps=num_sweeps)
+
+                if e is None or sampleset.first.energy < e:
+                    y, e = sampleset.first.sample, sampleset.first.energy
+
+                if self.reached(float(e) + c):
+                    self.log(f"Dwave early stop after {k + min(batch, num_reads - k)} reads")
+                    break
 
         s = {k: int(y[i]) for k, i in x.items()}
 
-        return (s, e + c)
+        return (s, float(e) + c)
 
     def check_params(self, **params: dict):
         if "num_reads" in params:
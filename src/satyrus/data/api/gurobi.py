@@ -15,7 +15,7 @@ class gurobi(SatAPI):
         """"""
         
         # Retrieve QUBO
-        x, Q, c = energy.qubo()
+        x, (I, J, V), c = energy.qubo(sparse=True)
 
         try:
             # pylint: disable=no-member
@@ -23,16 +23,25 @@ class gurobi(SatAPI):
             # Create a new model
             model = gp.Model("MIP")
 
-            X = model.addMVar(len(x), vtype=gp.GRB.BINARY, name="")
+            X = model.addVars(len(x), vtype=gp.GRB.BINARY, name="")
 
-            model.setMObjective(Q, None, 0.0, X, X, None, sense=gp.GRB.MINIMIZE)
+            # Linear terms lie along the diagonal
+            L = I == J
+
+            objective = gp.QuadExpr()
+            objective.addTerms(V[~L].tolist(), [X[i] for i in I[~L].tolist()], [X[j] for j in J[~L].tolist()])
+            objective.addTerms(V[L].tolist(), [X[i] for i in I[L].tolist()])
+
+            model.setObjective(objective, sense=gp.GRB.MINIMIZE)
+
+            if self.target() is not None:
+                ## Stop once the lower bound is reached
+                model.Params.BestObjStop = self.target() - c
 
             with devnull:
                 model.optimize()
 
-            y = list(model.getVars())
-
-            s = {k: int(y[i].x) for k, i in x.items()}
+            s = {k: int(round(X[i].x)) for k, i in x.items()}
             e = model.objVal
         except gp.GurobiError as exc:
             self.error(f"(Gurobi code {exc.errno}) {exc}")
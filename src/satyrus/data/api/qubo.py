@@ -15,13 +15,27 @@ class qubo(SatAPI):
 
     ext: str = "qubo.json"
 
-    def solve(self, energy: Posiform, indent: int | None = None, **params: dict) -> str:
-        """"""
-        x, Q, c = energy.qubo()
-
-        self.check_params(indent=indent)
-
-        return json.dumps({"x": x, "Q": [list(q) for q in Q], "c": c}, indent=indent)
+    def solve(self, energy: Posiform, indent: int | None = None, sparse: bool = True, **params: dict) -> str:
+        """
+        Parameters
+        ----------
+        energy : Posiform
+            Input Expression
+        params : dict (optional)
+            indent : int | None = None
+            sparse : bool = True
+                If True, 'Q' is written as a list of upper-triangular [i, j, q] entries instead of a dense matrix.
+        """
+        self.check_params(indent=indent, sparse=sparse)
+
+        if sparse:
+            x, (I, J, V), c = energy.qubo(sparse=True)
+
+            return json.dumps({"x": x, "Q": [[i, j, q] for i, j, q in zip(I.tolist(), J.tolist(), V.tolist())], "c": c}, indent=indent)
+        else:
+            x, Q, c = energy.qubo()
+
+            return json.dumps({"x": x, "Q": [list(q) for q in Q], "c": c}, indent=indent)
 
     def check_params(self, **params):
         """"""
@@ -29,4 +43,8 @@ class qubo(SatAPI):
             if params["indent"] is None:
                 return
             elif not isinstance(params["indent"], int) or (params["indent"] < 0):
-                self.error("Parameter 'indent' must be a non-negative integer")
\ No newline at end of file
+                self.error("Parameter 'indent' must be a non-negative integer")
+
+        if "sparse" in params:
+            if not isinstance(params["sparse"], bool):
+                self.error("Parameter 'sparse' must be a boolean")
\ No newline at end of file
@@ -1,7 +1,8 @@
+from .compact import CompactPosiform, VarTable
 from .main import arange, log, prompt
 from .package import package_path
 from .performance import Timing
-from .posiform import Posiform
+from .posiform import Posiform, IndexedPosiform
 from .pythonshell import PythonShell, PythonError
 from .source import Source
 from .stack import Queue, Stack
@@ -13,6 +14,9 @@ __all__ = [
     "package_path",
     "Timing",
     "Posiform",
+    "IndexedPosiform",
+    "CompactPosiform",
+    "VarTable",
     "PythonShell",
     "PythonError",
     "Source",
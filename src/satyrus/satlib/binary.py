@@ -0,0 +1,152 @@
+"""
+Binary energy file format
+-------------------------
+
+All values are little-endian and every section starts at a multiple of 8 bytes.
+
+    ┌──────────────────────────────────────────────────────────────┐
+    │header  : magic 'SATB', version, #variables, #terms, #entries,│
+    │          name table size (in bytes)                          │
+    ├──────────────────────────────────────────────────────────────┤
+    │names   : UTF-8 variable names, separated by '\\0'             │
+    ├──────────────────────────────────────────────────────────────┤
+    │offset  : int64[#terms + 1], where each term begins in 'index'│
+    ├──────────────────────────────────────────────────────────────┤
+    │index   : int32[#entries], variable positions in 'names'      │
+    ├──────────────────────────────────────────────────────────────┤
+    │cons    : float64[#terms], term coefficients                  │
+    └──────────────────────────────────────────────────────────────┘
+
+Terms are canonical: variables within each term are sorted, and terms are sorted lexicographically, longer terms coming first among those sharing a prefix (the constant term, if any, is the last one). This is the order kept by `CompactPosiform`, so that its arrays can be mapped straight from disk.
+"""
+# Future
+from __future__ import annotations
+
+# Standard Library
+from pathlib import Path
+
+# Third-Party
+import numpy as np
+
+MAGIC = b"SATB"
+VERSION = 1
+
+HEADER = np.dtype(
+    [
+        ("magic", "S4"),
+        ("version", "<u4"),
+        ("variables", "<u8"),
+        ("terms", "<u8"),
+        ("entries", "<u8"),
+        ("names", "<u8"),
+    ]
+)
+
+
+def align(n: int) -> int:
+    return (n + 7) // 8 * 8
+
+
+def write_binary(file, names: list[str], offset: np.ndarray, index: np.ndarray, cons: np.ndarray):
+    """
+    Parameters
+    ----------
+    file : BinaryIO
+        Writable binary file object.
+    names : list[str]
+        Variable names, addressed by the entries of `index`.
+    offset, index, cons : np.ndarray
+        Canonical CSR term arrays.
+    """
+    table = "\0".join(names).encode("utf-8")
+
+    header = np.zeros(1, dtype=HEADER)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["variables"] = len(names)
+    header["terms"] = len(cons)
+    header["entries"] = len(index)
+    header["names"] = len(table)
+
+    def section(data: bytes, size: int):
+        file.write(data)
+        file.write(bytes(align(size) - size))
+
+    section(header.tobytes(), HEADER.itemsize)
+    section(table, len(table))
+    section(np.ascontiguousarray(offset, dtype="<i8").tobytes(), 8 * len(offset))
+    section(np.ascontiguousarray(index, dtype="<i4").tobytes(), 4 * len(index))
+    section(np.ascontiguousarray(cons, dtype="<f8").tobytes(), 8 * len(cons))
+
+
+def read_binary(path: str | Path, mmap: bool = True, validate: bool = False) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Only the header, name table and both ends of `offset` are checked by default, so that mapped term arrays aren't read.
+
+    Parameters
+    ----------
+    path : str, Path
+        Energy file path.
+    mmap : bool (optional)
+        If True (default), term arrays are copy-on-write memory maps instead of being read into memory.
+    validate : bool (optional)
+        If True, also checks that offsets don't decrease and that every index entry addresses a name, reading both arrays in full.
+
+    Returns
+    -------
+    names : list[str]
+    offset, index, cons : np.ndarray
+    """
+    path = Path(path)
+
+    with path.open(mode="rb") as file:
+        data = file.read(HEADER.itemsize)
+
+        if len(data) < HEADER.itemsize:
+            raise ValueError(f"Truncated energy file '{path}'")
+
+        header = np.frombuffer(data, dtype=HEADER)[0]
+
+        if header["magic"] != MAGIC:
+            raise ValueError(f"'{path}' is not a binary energy file")
+        elif header["version"] != VERSION:
+            raise ValueError(f"Unsupported binary energy file version {header['version']}")
+
+        n, m, k, t = (int(header[key]) for key in ("variables", "terms", "entries", "names"))
+
+        file.seek(align(HEADER.itemsize))
+        table = file.read(t).decode("utf-8")
+
+    names = table.split("\0") if n > 0 else []
+
+    if len(names) != n:
+        raise ValueError(f"Inconsistent name table in energy file '{path}'")
+
+    start = align(HEADER.itemsize) + align(t)
+    sizes = [(np.dtype("<i8"), m + 1), (np.dtype("<i4"), k), (np.dtype("<f8"), m)]
+
+    if path.stat().st_size < start + sum(align(dtype.itemsize * count) for dtype, count in sizes):
+        raise ValueError(f"Truncated energy file '{path}'")
+
+    arrays = []
+
+    for dtype, count in sizes:
+        if count == 0:
+            arrays.append(np.zeros(0, dtype=dtype))
+        elif mmap:
+            arrays.append(np.memmap(path, dtype=dtype, mode="c", offset=start, shape=(count,)))
+        else:
+            arrays.append(np.fromfile(path, dtype=dtype, count=count, offset=start))
+        start += align(dtype.itemsize * count)
+
+    offset, index, cons = arrays
+
+    if offset[0] != 0 or offset[-1] != k:
+        raise ValueError(f"Inconsistent term index in energy file '{path}'")
+    elif validate and (np.any(np.diff(offset) < 0) or (k > 0 and not (0 <= index.min() and index.max() < n))):
+        raise ValueError(f"Inconsistent term index in energy file '{path}'")
+
+    return names, offset, index, cons
+
+
+__all__ = ["write_binary", "read_binary"]
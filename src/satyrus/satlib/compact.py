@@ -0,0 +1,670 @@
+"""
+"""
+# Future
+from __future__ import annotations
+
+# Standard Library
+import json
+import numbers
+from pathlib import Path
+
+# Third-Party
+import numpy as np
+
+# Local
+from .binary import write_binary, read_binary
+from .posiform import Posiform, evaluate_terms, write_terms
+
+
+class VarTable(object):
+    """
+    Interning table between variable names and integer ids. A single instance is shared by every `CompactPosiform`, so that terms coming from distinct equations can be compared and merged using their ids only.
+    """
+
+    def __init__(self):
+        self.__ids: dict[str, int] = {}
+        self.__names: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__ids
+
+    def id(self, name: str) -> int:
+        """Retrieves the id for `name`, registering it if needed."""
+        try:
+            return self.__ids[name]
+        except KeyError:
+            i = self.__ids[name] = len(self.__names)
+            self.__names.append(str(name))
+            return i
+
+    def get(self, name: str) -> int | None:
+        """Retrieves the id for `name` without registering it."""
+        return self.__ids.get(name)
+
+    def name(self, i: int) -> str:
+        return self.__names[i]
+
+    def names(self, ids: np.ndarray) -> list[str]:
+        return [self.__names[i] for i in ids]
+
+
+class CompactPosiform(object):
+    r"""
+    Array-backed alternative to `Posiform`. Terms are stored in CSR fashion: `index` holds the sorted variable ids of every term, one after another, `offset` marks where each term begins and `cons` keeps the respective coefficients. Variable names are interned by the class-wide `VarTable`.
+
+    Assumptions
+    -----------
+    1. Every variable is boolean (i.e. $x \in \{0, 1\}$)
+    2. CompactPosiform is a mutable type.
+    3. Terms are unique, sorted and have non-zero coefficients.
+    """
+
+    table = VarTable()
+
+    FILL = np.iinfo(np.int32).max
+
+    def __init__(self, buffer: dict | float | Posiform = None):
+        """\
+        Parameters
+        ----------
+        buffer : dict, float, Posiform
+            Dictionary containing pairs (variables, constant), just as in `Posiform`.
+        """
+        if isinstance(buffer, CompactPosiform):
+            self.__set(buffer.index, buffer.offset, buffer.cons)
+        else:
+            if not isinstance(buffer, Posiform):
+                buffer = Posiform(buffer)
+
+            cons = np.fromiter((v for _, v in buffer), dtype=np.float64, count=len(buffer))
+            terms = [() if k is None else sorted(map(self.table.id, k)) for k, _ in buffer]
+
+            lengths = np.fromiter(map(len, terms), dtype=np.int64, count=len(terms))
+            index = np.fromiter((i for t in terms for i in t), dtype=np.int32, count=int(lengths.sum()))
+
+            self.__setrows(self.__torows(index, self.__offsets(lengths)), cons)
+
+    # -*- Internal Representation -*-
+    def __set(self, index: np.ndarray, offset: np.ndarray, cons: np.ndarray):
+        self.index: np.ndarray = index
+        self.offset: np.ndarray = offset
+        self.cons: np.ndarray = cons
+
+    def __setrows(self, rows: np.ndarray, cons: np.ndarray):
+        self.__set(*self.__canonical(rows, cons))
+
+    @staticmethod
+    def __offsets(lengths: np.ndarray) -> np.ndarray:
+        offset = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offset[1:])
+        return offset
+
+    @classmethod
+    def __torows(cls, index: np.ndarray, offset: np.ndarray) -> np.ndarray:
+        """Expands CSR terms into a (terms x degree) matrix padded with `FILL`."""
+        lengths = np.diff(offset)
+        m = len(lengths)
+        d = int(lengths.max()) if m > 0 else 0
+
+        rows = np.full((m, d), cls.FILL, dtype=np.int32)
+
+        if len(index) > 0:
+            r = np.repeat(np.arange(m), lengths)
+            c = np.arange(len(index)) - np.repeat(offset[:-1], lengths)
+            rows[r, c] = index
+
+        return rows
+
+    @classmethod
+    def __canonical(cls, rows: np.ndarray, cons: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sorts variables within terms, removes repeated variables (x² = x), merges equal terms and drops vanishing ones."""
+        if rows.shape[1] > 1:
+            rows = np.sort(rows, axis=1)
+            rep = rows[:, 1:] == rows[:, :-1]
+            if rep.any():
+                rows[:, 1:][rep] = cls.FILL
+                rows.sort(axis=1)
+
+        if rows.shape[1] > 0:
+            rows = rows[:, : int((rows != cls.FILL).any(axis=0).sum())]
+
+        if rows.shape[0] == 0:
+            terms, sums = rows, cons
+        elif rows.shape[1] == 0:
+            terms, sums = rows[:1], np.array([cons.sum()], dtype=np.float64)
+        else:
+            ## Lexicographic sort, then merge runs of equal terms
+            order = np.lexsort(rows.T[::-1])
+            rows = rows[order]
+            head = np.ones(len(rows), dtype=bool)
+            head[1:] = (rows[1:] != rows[:-1]).any(axis=1)
+            terms = rows[head]
+            sums = np.bincount(np.cumsum(head) - 1, weights=cons[order], minlength=len(terms))
+
+        keep = sums != 0.0
+        terms = terms[keep]
+        sums = np.ascontiguousarray(sums[keep], dtype=np.float64)
+
+        mask = terms != cls.FILL
+
+        return (terms[mask].astype(np.int32), cls.__offsets(mask.sum(axis=1)), sums)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Terms as a (terms x degree) matrix padded with `FILL`."""
+        return self.__torows(self.index, self.offset)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offset)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the term arrays."""
+        return self.index.nbytes + self.offset.nbytes + self.cons.nbytes
+
+    @classmethod
+    def __join(cls, *rows: np.ndarray) -> np.ndarray:
+        """Stacks term matrices of distinct degrees."""
+        d = max(r.shape[1] for r in rows)
+        return np.vstack([np.pad(r, ((0, 0), (0, d - r.shape[1])), constant_values=cls.FILL) for r in rows])
+
+    @classmethod
+    def __cast(cls, other: object) -> CompactPosiform | None:
+        """Casts operand into `CompactPosiform`, if possible."""
+        if isinstance(other, cls):
+            return other
+        elif isinstance(other, dict):
+            try:
+                return cls(other)
+            except TypeError as type_error:
+                raise TypeError("Unable to cast operand to CompactPosiform type.") from type_error
+        elif isinstance(other, numbers.Real):
+            return cls(float(other))
+        else:
+            return None
+
+    # -*- Conversion -*-
+    @classmethod
+    def fromPosiform(cls, posiform: Posiform) -> CompactPosiform:
+        return cls(posiform)
+
+    def toPosiform(self) -> Posiform:
+        return Posiform({k: v for k, v in self})
+
+    @classmethod
+    def sum(cls, posiforms: object) -> CompactPosiform:
+        """Adds up many posiforms at once, merging terms a single time. Only their term arrays are kept until then, so posiforms consumed from an iterator can be released one at a time."""
+        rows, cons = [], []
+
+        for p in posiforms:
+            p = cls.__cast(p)
+            if p is None:
+                raise TypeError("Unable to cast operand to CompactPosiform type.")
+            rows.append(p.rows)
+            cons.append(p.cons)
+
+        compact = cls()
+
+        if rows:
+            compact.__setrows(cls.__join(*rows), np.concatenate(cons))
+
+        return compact
+
+    # -*- Container -*-
+    def __len__(self) -> int:
+        return len(self.cons)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self):
+        names = self.table.names(self.index)
+        offset = self.offset.tolist()
+        for t, v in enumerate(self.cons.tolist()):
+            i, j = offset[t], offset[t + 1]
+            yield (None if i == j else frozenset(names[i:j])), v
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (CompactPosiform, dict)):
+            return dict(iter(self)) == dict(iter(other if isinstance(other, CompactPosiform) else Posiform(other)))
+        else:
+            return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __str__(self) -> str:
+        return str(self.toPosiform())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict.__repr__({k if k is None else tuple(sorted(k)) : v for k, v in self})})"
+
+    def __float__(self) -> float:
+        if len(self) == 0:
+            return 0.0
+        elif len(self) == 1 and len(self.index) == 0:
+            return float(self.cons[0])
+        else:
+            raise TypeError("Can't cast 'CompactPosiform' to 'float' due to non-constant terms")
+
+    def __getstate__(self) -> dict:
+        # Variable ids are only meaningful within the current process table
+        ids, index = np.unique(self.index, return_inverse=True)
+        return {"names": self.table.names(ids), "index": index.astype(np.int32), "offset": self.offset, "cons": self.cons}
+
+    def __setstate__(self, state: dict):
+        ids = np.fromiter(map(self.table.id, state["names"]), dtype=np.int32, count=len(state["names"]))
+        self.__setrows(self.__torows(ids[state["index"]], state["offset"]), state["cons"])
+
+    def copy(self) -> CompactPosiform:
+        """Deep CompactPosiform copy."""
+        compact = self.__class__()
+        compact.__set(self.index.copy(), self.offset.copy(), self.cons.copy())
+        return compact
+
+    # -*- Arithmetic -*-
+    def __call__(self, point: dict) -> CompactPosiform:
+        """"""
+        if not isinstance(point, dict):
+            raise TypeError(f"Can't evaluate CompactPosiform at non-mapping {point} of type {type(point)}")
+
+        for x, c in point.items():
+            if not isinstance(x, str):
+                raise TypeError(f"Variables must be of type 'str', not '{type(x)}'")
+            elif isinstance(c, str):
+                self.table.id(c)
+            elif not isinstance(c, numbers.Real):
+                raise TypeError(f"Evaluation point coordinates must be either real numbers ('int', 'float') or variables ('str'), not '{type(c)}'")
+
+        n = len(self.table)
+
+        ## Position 'n' stands for 'FILL'
+        value = np.ones(n + 1, dtype=np.float64)
+        fixed = np.zeros(n + 1, dtype=bool)
+        rename = np.arange(n + 1, dtype=np.int32)
+        rename[n] = self.FILL
+
+        for x, c in point.items():
+            i = self.table.get(x)
+            if i is None:
+                continue
+            elif isinstance(c, str):
+                rename[i] = self.table.id(c)
+            else:
+                fixed[i] = True
+                value[i] = float(c)
+
+        rows = self.rows
+        rows = np.where(rows == self.FILL, n, rows)
+
+        compact = self.__class__()
+        compact.__setrows(np.where(fixed[rows], self.FILL, rename[rows]), self.cons * value[rows].prod(axis=1))
+        return compact
+
+    def fix(self, point: dict) -> CompactPosiform:
+        """Partial evaluation, in place."""
+        compact = self(point)
+        self.__set(compact.index, compact.offset, compact.cons)
+        return self
+
+    def evaluate_batch(self, samples: np.ndarray, variables: dict[str, int] = None) -> np.ndarray:
+        """
+        Evaluates the posiform at many points at once.
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            (m x n) array whose rows are 0/1 assignments.
+        variables : dict[str, int] (optional)
+            Mapping between variables and respective sample columns. Defaults to the `CompactPosiform.variables` order, as in `CompactPosiform.qubo`.
+
+        Returns
+        -------
+        np.ndarray
+            The m energy values.
+        """
+        if variables is None:
+            variables = {v: i for i, v in enumerate(self.variables)}
+
+        samples = np.asarray(samples, dtype=float)
+
+        if samples.ndim != 2:
+            raise ValueError(f"Samples must be a 2-dimensional array, not {samples.ndim}-dimensional")
+
+        n = samples.shape[1]
+
+        ## Maps variable ids into sample columns
+        ids = np.unique(self.index)
+        column = np.empty(len(ids), dtype=np.int64)
+
+        for k, x in enumerate(self.table.names(ids)):
+            if x not in variables:
+                raise ValueError(f"Variable '{x}' is missing from the sample columns")
+            column[k] = variables[x]
+
+        lengths = self.lengths
+        rows = self.rows[lengths > 0]
+
+        if len(rows) > 0:
+            ## Column 'n' stands for a constant 1.0, used as padding
+            pad = rows == self.FILL
+            cols = np.where(pad, n, column[np.searchsorted(ids, np.where(pad, ids[0], rows))])
+        else:
+            cols = rows.astype(np.int64)
+
+        return evaluate_terms(samples, cols, self.cons[lengths > 0], self.cons[lengths == 0].sum())
+
+    def __add__(self, other) -> CompactPosiform:
+        compact = self.copy()
+        compact = compact.__iadd__(other)
+        return compact
+
+    def __iadd__(self, other) -> CompactPosiform:
+        if isinstance(other, complex):
+            return NotImplemented
+
+        other = self.__cast(other)
+
+        if other is None:
+            return NotImplemented
+        else:
+            self.__setrows(self.__join(self.rows, other.rows), np.concatenate([self.cons, other.cons]))
+            return self
+
+    def __neg__(self) -> CompactPosiform:
+        compact = self.copy()
+        compact.cons *= -1.0
+        return compact
+
+    def __rsub__(self, other) -> CompactPosiform:
+        return self.__sub__(other).__neg__()
+
+    def __sub__(self, other) -> CompactPosiform:
+        compact = self.copy()
+        compact = compact.__isub__(other)
+        return compact
+
+    def __isub__(self, other) -> CompactPosiform:
+        if isinstance(other, complex):
+            return NotImplemented
+
+        other = self.__cast(other)
+
+        if other is None:
+            return NotImplemented
+        else:
+            return self.__iadd__(-other)
+
+    def __truediv__(self, other) -> CompactPosiform:
+        compact = self.copy()
+        compact = compact.__itruediv__(other)
+        return compact
+
+    def __itruediv__(self, other) -> CompactPosiform:
+        if isinstance(other, numbers.Number):
+            c = float(other)
+            if c != 0.0:
+                self.cons /= c
+                return self
+            else:
+                raise ZeroDivisionError("division by zero")
+        else:
+            return NotImplemented
+
+    def __pow__(self, other) -> CompactPosiform:
+        compact = self.copy()
+        compact = compact.__ipow__(other)
+        return compact
+
+    def __ipow__(self, other) -> CompactPosiform:
+        if isinstance(other, (dict, CompactPosiform)) or isinstance(other, numbers.Real):
+            try:
+                other = float(other if not isinstance(other, dict) else Posiform(other))
+            except TypeError as type_error:
+                raise TypeError("Unable to cast operand to 'float' type") from type_error
+
+            if not other.is_integer() or other < 0:
+                raise TypeError("Can't raise 'CompactPosiform' to non-integer power")
+            else:
+                other = int(other)
+
+            compact = self.__class__(1.0)
+            while other > 0:
+                compact *= self
+                other -= 1
+            return compact
+        else:
+            return NotImplemented
+
+    def __mul__(self, other) -> CompactPosiform:
+        compact = self.copy()
+        compact = compact.__imul__(other)
+        return compact
+
+    def __imul__(self, other) -> CompactPosiform:
+        if isinstance(other, numbers.Real):
+            w = float(other)
+            if w == 0.0:
+                self.__set(*self.__canonical(self.rows[:0], self.cons[:0]))
+            else:
+                self.cons *= w
+            return self
+        elif isinstance(other, (dict, CompactPosiform)):
+            other = self.__cast(other)
+
+            x, y = self.rows, other.rows
+            m, n = len(x), len(y)
+
+            rows = np.hstack([np.repeat(x, n, axis=0), np.tile(y, (m, 1))])
+            cons = np.outer(self.cons, other.cons).ravel()
+
+            self.__setrows(rows, cons)
+            return self
+        else:
+            return NotImplemented
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+    # -*- Degree Reduction -*-
+    def reduce_degree(self, strategy: str = Posiform.SELECTION) -> CompactPosiform:
+        """Keeps linear and quadratic terms as they are, reducing only the higher-degree ones through `Posiform.reduce_degree`."""
+        high = self.lengths > 2
+
+        if not high.any():
+            return self.copy()
+
+        rows = self.rows
+        names = self.table.names
+
+        posiform = Posiform({tuple(names(r[r != self.FILL])): float(v) for r, v in zip(rows[high], self.cons[high])})
+
+        compact = self.__class__(posiform.reduce_degree(strategy))
+        compact += self.__fromrows(rows[~high], self.cons[~high])
+        return compact
+
+    def preprocess(self, strategy: str = Posiform.SELECTION) -> tuple[CompactPosiform, dict[str, int]]:
+        """Roof duality preprocessing, through `Posiform.preprocess`."""
+        posiform, fixed = self.toPosiform().preprocess(strategy)
+        return self.__class__(posiform), fixed
+
+    def lower_bound(self, strategy: str = Posiform.SELECTION) -> float:
+        """Lower bound on the minimum value, through `Posiform.lower_bound`."""
+        return self.toPosiform().lower_bound(strategy)
+
+    @classmethod
+    def __fromrows(cls, rows: np.ndarray, cons: np.ndarray) -> CompactPosiform:
+        compact = cls()
+        compact.__setrows(rows, cons)
+        return compact
+
+    @property
+    def variables(self) -> list:
+        return sorted(self.table.names(np.unique(self.index)))
+
+    @property
+    def degree(self) -> int:
+        return int(self.lengths.max()) if len(self) > 0 else 0
+
+    def qubo(self, sparse: bool = False, strategy: str = Posiform.SELECTION) -> tuple[dict[str, int], np.ndarray | tuple[np.ndarray, np.ndarray, np.ndarray], float]:
+        """
+        Parameters
+        ----------
+        sparse : bool
+            If True, the QUBO matrix is returned as upper-triangular COO triplets instead of a dense array.
+        strategy : str
+            Degree reduction strategy, see `Posiform.reduce_degree`.
+
+        Returns
+        -------
+        dict[str, int]
+            Mapping between variables and respective indexes.
+        np.ndarray | tuple[np.ndarray, np.ndarray, np.ndarray]
+            Symmetric Matrix representing QUBO instance or, if `sparse`, the (row, col, data) triplets of its upper triangle, with linear terms along the diagonal.
+        float
+            Ground state energy.
+        """
+        x, (I, J, V), c = self.reduce_degree(strategy).__triplets()
+
+        if sparse:
+            return x, (I, J, V), c
+
+        n = len(x)
+
+        Q = np.zeros((n, n), dtype=float)
+
+        L = I == J
+        Q[I[L], I[L]] = V[L]
+        Q[I[~L], J[~L]] = V[~L] / 2.0
+        Q[J[~L], I[~L]] = V[~L] / 2.0
+
+        return x, Q, c
+
+    def ising(self, sparse: bool = False, strategy: str = Posiform.SELECTION) -> tuple[dict[str, int], np.ndarray | tuple[np.ndarray, np.ndarray, np.ndarray], float]:
+        """
+        Parameters
+        ----------
+        sparse : bool
+            If True, the matrix is returned as upper-triangular COO triplets instead of a dense array.
+        strategy : str
+            Degree reduction strategy, see `Posiform.reduce_degree`.
+
+        Returns
+        -------
+        dict[str, int]
+            Mapping between variables and respective indexes.
+        np.ndarray | tuple[np.ndarray, np.ndarray, np.ndarray]
+            Symmetric Matrix representing QUBO instance or, if `sparse`, the (row, col, data) triplets of its upper triangle, with linear terms along the diagonal.
+        float
+            Ground state energy.
+        """
+        if sparse:
+            return self.reduce_degree(strategy).__triplets()
+        else:
+            return self.toPosiform().ising(strategy=strategy)
+
+    def __triplets(self) -> tuple[dict[str, int], tuple[np.ndarray, np.ndarray, np.ndarray], float]:
+        """Variable positions, upper-triangular COO triplets and constant of a quadratic posiform."""
+        lengths = self.lengths
+
+        if (lengths > 2).any():
+            raise RuntimeError("Degree reduction failed.")
+
+        ids = np.unique(self.index)
+        names = self.table.names(ids)
+        order = sorted(range(len(ids)), key=names.__getitem__)
+
+        x = {names[k]: i for i, k in enumerate(order)}
+
+        ## Maps variable ids into matrix positions
+        pos = np.empty(len(ids), dtype=np.int64)
+        pos[order] = np.arange(len(ids))
+
+        ## First variable of each term, and the last one for quadratic terms
+        head = self.offset[:-1][lengths > 0]
+        tail = self.offset[1:][lengths > 0] - 1
+
+        i = pos[np.searchsorted(ids, self.index[head])]
+        j = pos[np.searchsorted(ids, self.index[tail])]
+
+        I, J = np.minimum(i, j), np.maximum(i, j)
+        V = self.cons[lengths > 0]
+
+        ## Terms are unique, and so are their (i, j) entries
+        order = np.lexsort((J, I))
+
+        return x, (I[order], J[order], V[order]), float(self.cons[lengths == 0].sum())
+
+    # -*- Serialization -*-
+    def toMiniJSON(self) -> str:
+        ## Same output as 'Posiform.toMiniJSON', without building one
+        return json.dumps({("" if k is None else " ".join(sorted(k))): v for k, v in self})
+
+    @classmethod
+    def fromMiniJSON(cls, data: str) -> CompactPosiform:
+        return cls(Posiform.fromMiniJSON(data))
+
+    def toJSON(self, indent: int = None) -> str:
+        return self.toPosiform().toJSON(indent=indent)
+
+    @classmethod
+    def fromJSON(cls, data: str) -> CompactPosiform:
+        return cls(Posiform.fromJSON(data))
+
+    def dumpJSON(self, file, indent: int = None):
+        """Streaming counterpart of `toJSON`, writing terms straight from the arrays."""
+        write_terms(self, file, indent=indent)
+
+    @classmethod
+    def loadJSON(cls, file) -> CompactPosiform:
+        return cls(Posiform.loadJSON(file))
+
+    def dumpBinary(self, file):
+        """Writes the term arrays in the binary energy format (see `satlib.binary`)."""
+        ## Monotone renumbering keeps terms in canonical order
+        ids = np.unique(self.index)
+        write_binary(file, self.table.names(ids), self.offset, np.searchsorted(ids, self.index).astype(np.int32), self.cons)
+
+    @classmethod
+    def loadBinary(cls, path: str | Path, mmap: bool = True, validate: bool = False) -> CompactPosiform:
+        """
+        Opens a binary energy file (see `satlib.binary`).
+
+        Variable ids in the file are positions in its name table. When they match the first entries of the `VarTable`, as in a fresh process or for files written in it, the arrays are used as they are: with `mmap`, no term data is read until it is used. Otherwise every index entry is remapped, which reads and copies the whole index (`ids[index]`), and terms are sorted again if the new ids change their order.
+
+        Parameters
+        ----------
+        path : str, Path
+            Energy file path.
+        mmap : bool (optional)
+            If True (default), the arrays are copy-on-write memory maps of the file.
+        validate : bool (optional)
+            If True, checks every offset and index entry first (see `satlib.binary.read_binary`), reading both arrays in full. Otherwise, inconsistent files may only fail once their terms are used.
+        """
+        names, offset, index, cons = read_binary(path, mmap=mmap, validate=validate)
+
+        ids = np.fromiter(map(cls.table.id, names), dtype=np.int32, count=len(names))
+
+        compact = cls()
+
+        if np.array_equal(ids, np.arange(len(ids))):
+            compact.__set(index, offset, cons)
+        elif len(index) > 0 and not (0 <= index.min() and index.max() < len(ids)):
+            ## Remapping reads every entry anyway
+            raise ValueError(f"Inconsistent term index in energy file '{path}'")
+        elif np.all(ids[1:] > ids[:-1]):
+            compact.__set(ids[index], offset, cons)
+        else:
+            compact.__setrows(cls.__torows(ids[index], offset), cons)
+
+        return compact
+
+
+__all__ = ["CompactPosiform", "VarTable"]
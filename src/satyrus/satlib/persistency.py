@@ -0,0 +1,199 @@
+"""
+Roof duality for quadratic pseudo-boolean functions
+---------------------------------------------------
+
+The quadratic posiform is rewritten with non-negative coefficients over literals (x and its complement x̄ = 1 - x),
+
+    f = a₀ + Σ aᵤ u + Σ aᵤᵥ u v,    aᵤ, aᵤᵥ > 0
+
+which is mapped into the implication network with a node for each literal, plus the source x₀ (the constant 1) and the sink x̄₀. Every term `a u v` yields the arcs u → v̄ and v → ū, both with capacity a / 2, while linear terms are taken as `a u x₀`. Then
+
+    1. a₀ plus the maximum flow value is the roof dual, a lower bound on min f;
+    2. after symmetrizing the maximum flow, every literal reachable from the source in the residual network is true in all minimizers of f (strong persistency).
+
+See Boros & Hammer, "Pseudo-Boolean optimization", Discrete Applied Mathematics 123 (2002).
+"""
+# Future
+from __future__ import annotations
+
+# Standard Library
+from collections import deque
+
+SOURCE = 0
+SINK = 1
+
+
+class FlowNetwork(object):
+    """Residual network with Dinic's maximum flow algorithm. Arcs are added in mirror pairs (`a → b`, `b̄ → ā`), where the mirror of node `k` is `k ^ 1`."""
+
+    def __init__(self, n: int):
+        """\
+        Parameters
+        ----------
+        n : int
+            Number of nodes.
+        """
+        self.n = n
+        self.head: list[list[int]] = [[] for _ in range(n)]
+        self.to: list[int] = []
+        self.cap: list[float] = []
+        self.base: list[float] = []
+
+    def add(self, a: int, b: int, c: float):
+        """Adds arcs `a → b` and `b̄ → ā`, each with capacity `c`, along with their residual reverses."""
+        for u, v in ((a, b), (b ^ 1, a ^ 1)):
+            self.head[u].append(len(self.to))
+            self.to.append(v)
+            self.cap.append(c)
+            self.base.append(c)
+            self.head[v].append(len(self.to))
+            self.to.append(u)
+            self.cap.append(0.0)
+            self.base.append(0.0)
+
+    def __levels(self, s: int, eps: float) -> list[int]:
+        level = [-1] * self.n
+        level[s] = 0
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            for e in self.head[u]:
+                v = self.to[e]
+                if level[v] < 0 and self.cap[e] > eps:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        return level
+
+    def max_flow(self, s: int, t: int, eps: float = 1e-12) -> float:
+        """"""
+        flow = 0.0
+
+        while True:
+            level = self.__levels(s, eps)
+
+            if level[t] < 0:
+                return flow
+
+            ## Blocking flow through iterative depth-first search
+            pointer = [0] * self.n
+
+            while True:
+                path: list[int] = []
+                u = s
+                while u != t:
+                    edges = self.head[u]
+                    while pointer[u] < len(edges):
+                        e = edges[pointer[u]]
+                        if self.cap[e] > eps and level[self.to[e]] == level[u] + 1:
+                            break
+                        pointer[u] += 1
+                    else:
+                        if u == s:
+                            break
+                        ## Dead end: prune it and retreat
+                        level[u] = -1
+                        u = self.to[path.pop() ^ 1]
+                        pointer[u] += 1
+                        continue
+                    path.append(e)
+                    u = self.to[e]
+
+                if u != t:
+                    break
+
+                push = min(self.cap[e] for e in path)
+                for e in path:
+                    self.cap[e] -= push
+                    self.cap[e ^ 1] += push
+                flow += push
+
+    def symmetrize(self):
+        """Averages the flow with its mirror image, which is also a maximum flow."""
+        ## Arcs are stored as [a → b, reverse, b̄ → ā, reverse]
+        for e in range(0, len(self.to), 4):
+            f = 0.5 * ((self.base[e] - self.cap[e]) + (self.base[e + 2] - self.cap[e + 2]))
+            self.cap[e] = self.cap[e + 2] = self.base[e] - f
+            self.cap[e + 1] = self.cap[e + 3] = f
+
+    def reachable(self, s: int, eps: float = 1e-12) -> list[bool]:
+        """"""
+        return [level >= 0 for level in self.__levels(s, eps)]
+
+
+def roof_duality(terms) -> tuple[float, dict[str, int]]:
+    """
+    Parameters
+    ----------
+    terms : Iterable[tuple[frozenset | None, float]]
+        Terms of a quadratic posiform.
+
+    Returns
+    -------
+    bound : float
+        Roof dual lower bound.
+    fixed : dict[str, int]
+        Strongly persistent assignments.
+    """
+    const = 0.0
+    linear: dict[str, float] = {}
+    quadratic: list[tuple[str, str, float]] = []
+
+    for k, v in terms:
+        if k is None:
+            const += v
+        elif len(k) == 1:
+            (x,) = k
+            linear[x] = linear.get(x, 0.0) + v
+        elif len(k) == 2:
+            x, y = sorted(k)
+            quadratic.append((x, y, v))
+        else:
+            raise ValueError("Roof duality requires a quadratic posiform")
+
+    names = sorted({*linear, *(x for x, _, _ in quadratic), *(y for _, y, _ in quadratic)})
+    ids = {x: i for i, x in enumerate(names)}
+
+    ## Literal nodes: x ~ 2 + 2 i, x̄ ~ 3 + 2 i
+    network = FlowNetwork(2 * len(names) + 2)
+
+    scale = max([abs(v) for _, v in linear.items()] + [abs(v) for *_, v in quadratic] + [1.0])
+    eps = 1e-12 * scale
+
+    for x, y, b in quadratic:
+        u, v = 2 + 2 * ids[x], 2 + 2 * ids[y]
+        if b > 0.0:
+            ## b x y
+            network.add(u, v ^ 1, 0.5 * b)
+        elif b < 0.0:
+            ## b x y = b x - b x ȳ
+            linear[x] = linear.get(x, 0.0) + b
+            network.add(u, v, -0.5 * b)
+
+    for x, a in linear.items():
+        u = 2 + 2 * ids[x]
+        if a > 0.0:
+            ## a x = a x x₀
+            network.add(u, SINK, 0.5 * a)
+        elif a < 0.0:
+            ## a x = a - a x̄
+            const += a
+            network.add(u ^ 1, SINK, -0.5 * a)
+
+    bound = const + network.max_flow(SOURCE, SINK, eps=eps)
+
+    network.symmetrize()
+
+    reach = network.reachable(SOURCE, eps=eps)
+
+    fixed = {}
+
+    for x, i in ids.items():
+        if reach[2 + 2 * i]:
+            fixed[x] = 1
+        elif reach[3 + 2 * i]:
+            fixed[x] = 0
+
+    return bound, fixed
+
+
+__all__ = ["roof_duality"]
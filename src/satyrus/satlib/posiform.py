@@ -3,12 +3,19 @@
 from __future__ import annotations
 
 # Standard Library
+import heapq
+import itertools as it
 import json
 import numbers
+from pathlib import Path
 
 # Third-Party
 import numpy as np
 
+# Local
+from .binary import write_binary, read_binary
+from .persistency import roof_duality
+
 
 class Posiform(dict):
     r"""
@@ -88,7 +95,10 @@ class Posiform(dict):
 
     def copy(self) -> Posiform:
         """Deep Posiform copy."""
-        return Posiform({k: v for k, v in self})
+        ## Keys are immutable and values are floats, so there is no need to validate them again
+        posiform = self.__class__()
+        posiform.update(self)
+        return posiform
 
     def __float__(self) -> float:
         if len(self) == 0:
@@ -101,53 +111,117 @@ class Posiform(dict):
 
     def __call__(self, point: dict) -> Posiform:
         """"""
+        return self.copy().fix(point)
 
-        if isinstance(point, dict):
+    def fix(self, point: dict) -> Posiform:
+        """
+        Partial evaluation, in place. Only the terms containing some variable of `point` are visited.
 
-            posiform = Posiform()
+        Parameters
+        ----------
+        point : dict[str, float | str]
+            Maps variables either to values or to other variables.
 
-            term: frozenset | None
-            cons: float
+        Returns
+        -------
+        Posiform
+            The posiform itself.
+        """
+        point = self._point(point)
 
-            for term, cons in self:
-                if term is None:
-                    if None in posiform:
-                        posiform[None] += cons
-                    else:
-                        posiform[term] = cons
-                    continue
-                
-                for x in point:
-                    if not isinstance(x, str):
-                        raise TypeError(f"Variables must be of type 'str', not '{type(x)}'")
-
-                    c = point[x]
-
-                    if isinstance(c, str):
-                        if x in term:
-                            term -= {x}
-                            term |= {c}
-                    elif isinstance(c, numbers.Real):
-                        if x in term:
-                            term -= {x}
-                            cons *= c
-                    else:
-                        raise TypeError(f"Evaluation point coordinates must be either real numbers ('int', 'float') or variables ('str'), not '{type(c)}'")
+        for term in self._affected(point):
+            cons = self.pop(term)
+            term, cons = self._substitute(term, cons, point)
 
-                if not term:
-                    if None in posiform:
-                        posiform[None] += cons
-                    else:
-                        posiform[None] = cons
-                elif term in posiform:
-                    posiform[term] += cons
+            if term in self:
+                cons += self[term]
+                if cons == 0.0:
+                    del self[term]
                 else:
-                    posiform[term] = cons
+                    self[term] = cons
+            elif cons != 0.0:
+                self[term] = cons
 
-            return posiform
-        else:
+        return self
+
+    @classmethod
+    def _point(cls, point: dict) -> dict:
+        """"""
+        if not isinstance(point, dict):
             raise TypeError(f"Can't evaluate Posiform at non-mapping {point} of type {type(point)}")
 
+        for x, c in point.items():
+            if not isinstance(x, str):
+                raise TypeError(f"Variables must be of type 'str', not '{type(x)}'")
+            elif not isinstance(c, (str, numbers.Real)):
+                raise TypeError(f"Evaluation point coordinates must be either real numbers ('int', 'float') or variables ('str'), not '{type(c)}'")
+
+        return point
+
+    def _affected(self, point: dict) -> list[frozenset]:
+        """Terms containing at least one variable of `point`."""
+        return [k for k in self.keys() if k is not None and any(x in point for x in k)]
+
+    @classmethod
+    def _substitute(cls, term: frozenset, cons: float, point: dict) -> tuple[frozenset | None, float]:
+        """Simultaneous substitution of `point` into a single term."""
+        keep = []
+        for x in term:
+            if x in point:
+                c = point[x]
+                if isinstance(c, str):
+                    keep.append(c)
+                else:
+                    cons *= c
+            else:
+                keep.append(x)
+
+        return (frozenset(keep) if keep else None), float(cons)
+
+    def indexed(self) -> IndexedPosiform:
+        """Copy of this posiform that keeps an inverted index from variables to terms."""
+        return IndexedPosiform(self)
+
+    def evaluate_batch(self, samples: np.ndarray, variables: dict[str, int] = None) -> np.ndarray:
+        """
+        Evaluates the posiform at many points at once.
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            (m x n) array whose rows are 0/1 assignments.
+        variables : dict[str, int] (optional)
+            Mapping between variables and respective sample columns. Defaults to the `Posiform.variables` order, as in `Posiform.qubo`.
+
+        Returns
+        -------
+        np.ndarray
+            The m energy values.
+        """
+        if variables is None:
+            variables = {v: i for i, v in enumerate(self.variables)}
+
+        samples = np.asarray(samples, dtype=float)
+
+        if samples.ndim != 2:
+            raise ValueError(f"Samples must be a 2-dimensional array, not {samples.ndim}-dimensional")
+
+        n = samples.shape[1]
+
+        terms = [k for k in self.keys() if k is not None]
+
+        ## Column 'n' stands for a constant 1.0, used as padding
+        cols = np.full((len(terms), max(map(len, terms), default=0)), n, dtype=np.int64)
+        cons = np.fromiter((self[k] for k in terms), dtype=float, count=len(terms))
+
+        for t, k in enumerate(terms):
+            for s, x in enumerate(k):
+                if x not in variables:
+                    raise ValueError(f"Variable '{x}' is missing from the sample columns")
+                cols[t, s] = variables[x]
+
+        return evaluate_terms(samples, cols, cons, self.get(None, 0.0))
+
     def __add__(self, other) -> Posiform:
         posiform = self.copy()
         posiform = posiform.__iadd__(other)
@@ -186,7 +260,9 @@ class Posiform(dict):
         return posiform
 
     def __rsub__(self, other) -> Posiform:
-        return self.__sub__(other).__neg__()
+        posiform = self.__neg__()
+        posiform = posiform.__iadd__(other)
+        return posiform
 
     def __sub__(self, other) -> Posiform:
         posiform = self.copy()
@@ -237,11 +313,19 @@ class Posiform(dict):
             return NotImplemented
 
     def __pow__(self, other) -> Posiform:
-        posiform = self.copy()
-        posiform = posiform.__ipow__(other)
-        return posiform
+        n = self.__exponent(other)
+        if n is None:
+            return NotImplemented
+        return self.__power(n)
 
     def __ipow__(self, other) -> Posiform:
+        n = self.__exponent(other)
+        if n is None:
+            return NotImplemented
+        return self.__replace(self.__power(n))
+
+    def __exponent(self, other) -> int | None:
+        """"""
         if isinstance(other, dict):
             try:
                 other = self.__class__(other)
@@ -256,60 +340,157 @@ class Posiform(dict):
             if not other.is_integer() or other < 0:
                 raise TypeError("Can't raise 'Posiform' to non-integer power")
             else:
-                other = int(other)
-
-            posiform = Posiform(1.0)
-            while other > 0:
-                posiform *= self
-                other -= 1
-            return posiform
+                return int(other)
         else:
-            return NotImplemented
+            return None
 
-    def __mul__(self, other) -> Posiform:
+    def __power(self, n: int) -> Posiform:
+        """
+        Exponentiation along a greedy addition chain. Since x^2 = x for boolean variables, the number of terms in `self ** k` stops growing once every product of variables is already present. From then on, squaring is cheaper than multiplying by `self` again and again.
+        """
+        if n == 0:
+            return self.__class__(1.0)
+        elif len(self) == 1:
+            ## Single term: (a X)^n = a^n X
+            ((k, v),) = self
+            return self.__class__({k: v ** n})
+
+        ## Invariant: posiform == self ** k
         posiform = self.copy()
-        posiform = posiform.__imul__(other)
+        k = 1
+
+        while k < n:
+            if 2 * k <= n and len(posiform) <= k * len(self):
+                square = posiform.__product(posiform)
+                if k == 1 and square == posiform:
+                    ## self^2 = self implies self^n = self
+                    break
+                posiform = square
+                k *= 2
+            else:
+                posiform = posiform.__product(self)
+                k += 1
+
         return posiform
 
-    def __imul__(self, other):
+    def __mul__(self, other) -> Posiform:
         if isinstance(other, dict):
             try:
                 other = self.__class__(other)
             except TypeError as type_error:
                 raise TypeError("Unable to cast operand to Posiform type") from type_error
         if isinstance(other, type(self)):
-            posiform = Posiform()
-            for kx, vx in self:
-                for ky, vy in other:
-                    if kx is None:
-                        k = ky
-                    elif ky is None:
-                        k = kx
-                    else:
-                        k = frozenset({*kx, *ky})
-
-                    v = vx * vy
-
-                    if k in posiform:
-                        w = posiform[k] + v
-                        if w == 0.0:
-                            del posiform[k]
-                        else:
-                            posiform[k] = w
-                    else:
-                        posiform[k] = v
+            return self.__product(other)
+        else:
+            posiform = self.copy()
+            posiform = posiform.__imul__(other)
             return posiform
+
+    def __imul__(self, other):
+        if isinstance(other, dict):
+            try:
+                other = self.__class__(other)
+            except TypeError as type_error:
+                raise TypeError("Unable to cast operand to Posiform type") from type_error
+        if isinstance(other, type(self)):
+            if len(other) <= 1 and (not other or None in other):
+                ## Constant factor
+                return self.__imul__(other.get(None, 0.0))
+            elif len(self) <= 1 and (not self or None in self):
+                return self.__replace(other.__mul__(self.get(None, 0.0)))
+            else:
+                return self.__replace(self.__product(other))
         elif isinstance(other, numbers.Real):
             w = float(other)
             if w == 0.0:
                 self.clear()
-            else:
+            elif w != 1.0:
                 for k, v in self:
                     self[k] = w * v
             return self
         else:
             return NotImplemented
 
+    def __product(self, other: Posiform) -> Posiform:
+        """"""
+        posiform = self.__class__()
+        for kx, vx in self:
+            for ky, vy in other:
+                if kx is None:
+                    k = ky
+                elif ky is None:
+                    k = kx
+                else:
+                    k = kx | ky
+
+                v = vx * vy
+
+                if k in posiform:
+                    w = posiform[k] + v
+                    if w == 0.0:
+                        del posiform[k]
+                    else:
+                        posiform[k] = w
+                else:
+                    posiform[k] = v
+        return posiform
+
+    def __replace(self, other: Posiform) -> Posiform:
+        """"""
+        if other is not self:
+            self.clear()
+            self.update(other)
+        return self
+
+    # -*- Accumulators -*-
+    @classmethod
+    def sum(cls, posiforms) -> Posiform:
+        """
+        Adds up many posiforms into a single accumulator.
+
+        Parameters
+        ----------
+        posiforms : Iterable[Posiform | float]
+            Operands, which are consumed: the first posiform is reused as the accumulator.
+
+        Returns
+        -------
+        Posiform
+        """
+        posiform = None
+        for p in posiforms:
+            if posiform is None and isinstance(p, cls):
+                posiform = p
+            elif posiform is None:
+                posiform = cls(p)
+            else:
+                posiform += p
+        return cls() if posiform is None else posiform
+
+    @classmethod
+    def prod(cls, posiforms) -> Posiform:
+        """
+        Multiplies many posiforms into a single accumulator.
+
+        Parameters
+        ----------
+        posiforms : Iterable[Posiform | float]
+            Operands, which are consumed: the first posiform is reused as the accumulator.
+
+        Returns
+        -------
+        Posiform
+        """
+        posiform = None
+        for p in posiforms:
+            if posiform is None and isinstance(p, cls):
+                posiform = p
+            elif posiform is None:
+                posiform = cls(p)
+            else:
+                posiform *= p
+        return cls(1.0) if posiform is None else posiform
+
     __radd__ = __add__
     __rmul__ = __mul__
 
@@ -318,16 +499,237 @@ class Posiform(dict):
         self.__aux += 1
         return f"${self.__aux}"
 
-    def reduce_degree(self) -> Posiform:
-        """"""
+    # -*- Degree Reduction Strategies -*-
+    SELECTION = "selection"  # Term-wise Minimum Selection
+    SUBSTITUTION = "substitution"  # Shared Pair Substitution
+    ISHIKAWA = "ishikawa"  # Linear-ancilla Term-wise Reduction
+
+    def reduce_degree(self, strategy: str = SELECTION) -> Posiform:
+        """
+        Parameters
+        ----------
+        strategy : str
+            'selection' reduces every term independently by minimum selection. 'substitution' replaces the most frequent variable pairs by ancillary variables shared across all terms (Rosenberg). 'ishikawa' reduces every term independently using a single ancilla for negative terms (Freedman) and `(k - 1) // 2` for positive ones (Ishikawa).
+
+        Returns
+        -------
+        Posiform
+            Quadratic posiform whose minimum matches the original one. Its `reduce_stats` describe the reduction.
+        """
         ## Reset ancillary variable counter
         self.__aux = 0
 
+        if strategy == self.SELECTION:
+            posiform = Posiform()
+            for X, a in self:
+                posiform += self.__reduce_term(X, a)
+        elif strategy == self.SUBSTITUTION:
+            posiform = self.__pair_substitution()
+        elif strategy == self.ISHIKAWA:
+            posiform = self.__linear_ancilla()
+        else:
+            raise ValueError(f"Invalid degree reduction strategy '{strategy}'")
+
+        ## Only reduced posiforms carry stats, so others don't allocate them
+        posiform.__stats = {"strategy": strategy, "ancillas": self.__aux, "terms": len(posiform)}
+
+        return posiform
+
+    @property
+    def reduce_stats(self) -> dict:
+        """Strategy, number of ancillary variables and number of terms of the `reduce_degree` call that produced this posiform. Empty for posiforms built otherwise."""
+        return dict(getattr(self, "_Posiform__stats", {}))
+
+    def __linear_ancilla(self) -> Posiform:
+        """"""
+        buffer: dict[frozenset | None, float] = {}
+
+        def add(X: frozenset | None, a: float):
+            buffer[X] = buffer.get(X, 0.0) + a
+
+        for X, a in self:
+            if X is None or len(X) <= 2:
+                add(X, a)
+                continue
+
+            x = sorted(X)
+            k = len(x)
+
+            if a < 0:
+                ## if a < 0: a (x_1 ... x_k) => a w (S_1 - (k - 1))
+                w = self.aux
+                for xi in x:
+                    add(frozenset((xi, w)), a)
+                add(frozenset((w,)), -a * (k - 1))
+            else:
+                ## if a > 0: a (x_1 ... x_k) => a (S_2 + sum_i w_i (c_i (2 i - S_1) - 1)), with n = (k - 1) // 2 ancillas
+                ## where c_i = 1 if k is odd and i = n else 2
+                n = (k - 1) // 2
+                for xi, xj in it.combinations(x, 2):
+                    add(frozenset((xi, xj)), a)
+                for i in range(1, n + 1):
+                    w = self.aux
+                    c = 1.0 if (k % 2 == 1 and i == n) else 2.0
+                    for xi in x:
+                        add(frozenset((xi, w)), -a * c)
+                    add(frozenset((w,)), a * (2.0 * c * i - 1.0))
+
+        return Posiform({(None if X is None else tuple(X)): v for X, v in buffer.items() if v != 0.0})
+
+    def __pair_substitution(self) -> Posiform:
+        """
+        Greedy Rosenberg quadratization: the variable pair shared by most high-degree terms is replaced by an ancillary variable `w`, in all of them at once, until no term has degree above 2. Each `w` is then bound to `x y` through the penalty `M (x y - 2 x w - 2 y w + 3 w)`, where `M` exceeds the total weight of the terms depending on `w`.
+        """
         posiform = Posiform()
+
+        ## High-degree terms
+        terms: dict[frozenset, float] = {}
+
         for X, a in self:
-            posiform += self.__reduce_term(X, a)
+            if X is None or len(X) <= 2:
+                posiform[X] = a
+            else:
+                terms[X] = a
+
+        ## Pair frequencies, with a lazy max-heap over them
+        count: dict[tuple[str, str], int] = {}
+        where: dict[tuple[str, str], set[frozenset]] = {}
+
+        def pairs(X: frozenset):
+            return it.combinations(sorted(X), 2)
+
+        def track(X: frozenset, k: int):
+            for p in pairs(X):
+                count[p] = count.get(p, 0) + k
+                if k > 0:
+                    where.setdefault(p, set()).add(X)
+                else:
+                    where[p].discard(X)
+                heapq.heappush(heap, (-count[p], p))
+
+        heap = []
+
+        for X in terms:
+            track(X, 1)
+
+        ## Substitution table: ancilla -> pair, in order of creation
+        table: dict[str, tuple[str, str]] = {}
+
+        while heap:
+            k, p = heapq.heappop(heap)
+
+            if count.get(p, 0) != -k or k == 0:
+                continue
+
+            w = self.aux
+            table[w] = p
+
+            for X in list(where[p]):
+                a = terms.pop(X)
+                track(X, -1)
+
+                Y = (X - set(p)) | {w}
+
+                if len(Y) <= 2:
+                    terms[Y] = terms.get(Y, 0.0) + a
+                elif Y in terms:
+                    terms[Y] += a
+                else:
+                    terms[Y] = a
+                    track(Y, 1)
+
+        ## Penalty weights, computed backwards since later ancillas may depend on earlier ones
+        weight = {w: 0.0 for w in table}
+
+        for X, a in terms.items():
+            for x in X:
+                if x in weight:
+                    weight[x] += abs(a)
+
+        for w in reversed(table):
+            M = weight[w] = weight[w] + 1.0
+            for x in table[w]:
+                if x in weight:
+                    weight[x] += 3.0 * M
+
+        for X, a in terms.items():
+            posiform += {X: a}
+
+        for w, (x, y) in table.items():
+            posiform += weight[w] * self.__P(x, y, w)
+
         return posiform
 
+    # -*- Preprocessing -*-
+    def roof_dual(self) -> tuple[float, dict[str, int]]:
+        """
+        Roof duality for quadratic posiforms (see `satlib.persistency`).
+
+        Returns
+        -------
+        bound : float
+            Lower bound on the minimum value.
+        fixed : dict[str, int]
+            Variable values shared by every minimizer (strong persistencies).
+        """
+        return roof_duality(self)
+
+    def lower_bound(self, strategy: str = SELECTION) -> float:
+        """
+        Lower bound on the minimum value, the best among the constant term plus every negative coefficient and the roof dual (which matches the LP relaxation bound) of the quadratized posiform.
+
+        Parameters
+        ----------
+        strategy : str
+            Degree reduction strategy, see `Posiform.reduce_degree`.
+
+        Returns
+        -------
+        float
+        """
+        trivial = sum((v for k, v in self.items() if k is None or v < 0.0), 0.0)
+
+        if any(k is not None and len(k) > 2 for k in self.keys()):
+            bound, _ = self.reduce_degree(strategy).roof_dual()
+        else:
+            bound, _ = self.roof_dual()
+
+        return max(trivial, bound)
+
+    def preprocess(self, strategy: str = SELECTION) -> tuple[Posiform, dict[str, int]]:
+        """
+        Fixes every variable whose optimal value is known in advance through roof duality, reducing the degree beforehand if needed.
+
+        Parameters
+        ----------
+        strategy : str
+            Degree reduction strategy, see `Posiform.reduce_degree`.
+
+        Returns
+        -------
+        posiform : Posiform
+            Reduced posiform, with the same minimum value.
+        fixed : dict[str, int]
+            Values of the eliminated variables, to be merged back into solutions of the reduced posiform.
+        """
+        if any(k is not None and len(k) > 2 for k in self.keys()):
+            posiform = self.reduce_degree(strategy)
+        else:
+            posiform = self.copy()
+
+        fixed = {}
+
+        while True:
+            _, persistent = posiform.roof_dual()
+
+            if not persistent:
+                break
+
+            posiform.fix(persistent)
+            fixed.update(persistent)
+
+        return posiform, fixed
+
     __RED_NO = 0 # No Reduction
     __RED_MS = 1 # Minimum Selection
     __RED_SU = 2 # Substitution
@@ -406,7 +808,7 @@ class Posiform(dict):
 
     @property
     def degree(self) -> int:
-        return max(map(lambda k: 0 if k is None else len(k), self))
+        return max(map(lambda k: 0 if k is None else len(k), self.keys()), default=0)
 
     def toMiniJSON(self) -> str:
         return json.dumps({("" if k is None else " ".join(sorted(k))): v for k, v in self})
@@ -454,42 +856,132 @@ class Posiform(dict):
             raise json.decoder.JSONDecodeError("Data must be of Array type (Python list)", data, 0)
         
         for item in json_data:
-            if not isinstance(item, dict):
-                raise json.decoder.JSONDecodeError("Items must be of Object type (Python dict)", data, 0)
-            elif "term" not in item or "cons" not in item:
-                raise json.decoder.JSONDecodeError("Items must contain both 'term' and 'cons' keys", data, 0)
-            elif not isinstance(item["term"], list) and item["term"] is not None:
-                raise json.decoder.JSONDecodeError("Items 'term' value must be of Array type (Python list)", data, 0)
-            elif item["term"] is not None and not all(isinstance(var, str) for var in item["term"]):
-                raise json.decoder.JSONDecodeError("Items 'term' value must contain only entries of type String (Python str)", data, 0)
-            elif not isinstance(item["cons"], (int, float)):
-                raise json.decoder.JSONDecodeError("Items 'cons' value must be of Number type (Python float)", data, 0)
+            key, val = json_term(item, data, 0)
+            if key in buffer:
+                buffer[key] += val
             else:
-                key = tuple(item["term"]) if item["term"] is not None else None
-                val = float(item["cons"])
-                if key in buffer:
-                    buffer[key] += val
-                else:
-                    buffer[key] = val
+                buffer[key] = val
         return cls(buffer)
 
-    def qubo(self) -> tuple[dict[str, int], np.ndarray, float]:
+    def dumpJSON(self, file, indent: int = None):
+        """
+        Streaming counterpart of `toJSON`, writing one term at a time.
+
+        Parameters
+        ----------
+        file : TextIO
+            Writable text file object.
+        indent : int (optional)
+            JSON indentation, as in `toJSON`.
+        """
+        write_terms(self, file, indent=indent)
+
+    @classmethod
+    def loadJSON(cls, file) -> Posiform:
+        """
+        Streaming counterpart of `fromJSON`, parsing one term at a time.
+
+        Parameters
+        ----------
+        file : TextIO
+            Readable text file object.
         """
+        posiform = cls()
+        for key, val in read_terms(file):
+            if key in posiform:
+                w = posiform[key] + val
+                if w == 0.0:
+                    del posiform[key]
+                else:
+                    posiform[key] = w
+            elif val != 0.0:
+                posiform[key] = val
+        return posiform
+
+    def dumpBinary(self, file):
+        """
+        Writes the posiform in the binary energy format (see `satlib.binary`).
+
+        Parameters
+        ----------
+        file : BinaryIO
+            Writable binary file object.
+        """
+        names = self.variables
+        ids = {x: i for i, x in enumerate(names)}
+
+        fill = len(names)
+
+        m = len(self)
+        lengths = np.fromiter((0 if k is None else len(k) for k in self.keys()), dtype=np.int64, count=m)
+        index = np.fromiter((ids[x] for k in self.keys() if k is not None for x in k), dtype=np.int32, count=int(lengths.sum()))
+        cons = np.fromiter(self.values(), dtype=np.float64, count=m)
+
+        ## Canonical order: terms as rows padded with 'fill', sorted within and across
+        rows = np.full((m, int(lengths.max(initial=0))), fill, dtype=np.int32)
+        rows[np.arange(rows.shape[1]) < lengths[:, None]] = index
+        rows.sort(axis=1)
+        order = np.lexsort(rows.T[::-1]) if rows.shape[1] > 0 else np.arange(m)
+        rows = rows[order]
+
+        offset = np.zeros(m + 1, dtype=np.int64)
+        np.cumsum(lengths[order], out=offset[1:])
+
+        write_binary(file, names, offset, rows[rows != fill], cons[order])
+
+    @classmethod
+    def loadBinary(cls, path: str | Path) -> Posiform:
+        """
+        Reads a posiform from a binary energy file (see `satlib.binary`).
+
+        Parameters
+        ----------
+        path : str, Path
+            Energy file path.
+        """
+        ## Every term is read anyway
+        names, offset, index, cons = read_binary(path, mmap=False, validate=True)
+
+        index = index.tolist()
+        offset = offset.tolist()
+
+        posiform = cls()
+        for t, v in enumerate(cons.tolist()):
+            if offset[t] == offset[t + 1]:
+                k = None
+            else:
+                k = frozenset(names[i] for i in index[offset[t] : offset[t + 1]])
+            posiform[k] = v
+        return posiform
+
+    def qubo(self, sparse: bool = False, strategy: str = SELECTION) -> tuple[dict[str, int], np.ndarray | tuple[np.ndarray, np.ndarray, np.ndarray], float]:
+        """
+        Parameters
+        ----------
+        sparse : bool
+            If True, the QUBO matrix is returned as upper-triangular COO triplets instead of a dense array.
+        strategy : str
+            Degree reduction strategy, see `Posiform.reduce_degree`.
+
         Returns
         -------
         dict[str, int]
             Mapping between variables and respective indexes.
-        np.ndarray
-            Symmetric Matrix representing QUBO instance.
+        np.ndarray | tuple[np.ndarray, np.ndarray, np.ndarray]
+            Symmetric Matrix representing QUBO instance or, if `sparse`, the (row, col, data) triplets of its upper triangle, with linear terms along the diagonal.
         float
             Ground state energy.
         """
-        reduced = self.reduce_degree()
+        reduced = self.reduce_degree(strategy)
         variables = reduced.variables
 
         n = len(variables)
 
         x = {v: i for i, v in enumerate(variables)}
+
+        if sparse:
+            return (x, *reduced.__triplets(x))
+
         Q = np.zeros((n, n), dtype=float)
         c = 0.0
 
@@ -509,23 +1001,34 @@ class Posiform(dict):
                     raise RuntimeError("Degree reduction failed.")
         return x, Q, c
 
-    def ising(self) -> tuple[dict[str, int], np.ndarray, float]:
+    def ising(self, sparse: bool = False, strategy: str = SELECTION) -> tuple[dict[str, int], np.ndarray | tuple[np.ndarray, np.ndarray, np.ndarray], float]:
         """
+        Parameters
+        ----------
+        sparse : bool
+            If True, the matrix is returned as upper-triangular COO triplets instead of a dense array.
+        strategy : str
+            Degree reduction strategy, see `Posiform.reduce_degree`.
+
         Returns
         -------
         dict[str, int]
             Mapping between variables and respective indexes.
-        np.ndarray
-            Symmetric Matrix representing QUBO instance.
+        np.ndarray | tuple[np.ndarray, np.ndarray, np.ndarray]
+            Symmetric Matrix representing QUBO instance or, if `sparse`, the (row, col, data) triplets of its upper triangle, with linear terms along the diagonal.
         float
             Ground state energy.
         """
-        reduced = self.reduce_degree()
+        reduced = self.reduce_degree(strategy)
         variables = reduced.variables
 
         n = len(variables)
 
         x = {v: i for i, v in enumerate(variables)}
+
+        if sparse:
+            return (x, *reduced.__triplets(x))
+
         J = np.zeros((n, n), dtype=float)
         c = 0.0
 
@@ -540,5 +1043,298 @@ class Posiform(dict):
                     raise RuntimeError("Degree reduction failed.")
         return x, J, c
 
+    def __triplets(self, x: dict[str, int]) -> tuple[tuple[np.ndarray, np.ndarray, np.ndarray], float]:
+        """Upper-triangular COO triplets for a quadratic posiform, without ever allocating the dense matrix."""
+        n = len(self)
+
+        I = np.empty(n, dtype=np.int64)
+        J = np.empty(n, dtype=np.int64)
+        V = np.empty(n, dtype=float)
+        c = 0.0
+
+        m = 0
+        for k, a in self:
+            if k is None:
+                c = a
+                continue
+            elif len(k) == 1:
+                i = j = x[next(iter(k))]
+            elif len(k) == 2:
+                i, j = sorted(map(x.get, k))
+            else:
+                raise RuntimeError("Degree reduction failed.")
+            I[m], J[m], V[m] = i, j, a
+            m += 1
+
+        ## Terms are unique, and so are their (i, j) entries
+        order = np.lexsort((J[:m], I[:m]))
+
+        return (I[order], J[order], V[order]), c
+
+
+BATCH_SIZE = 2 ** 22
+
+
+class IndexedPosiform(Posiform):
+    """
+    Posiform that keeps an inverted index from each variable to the terms containing it, so that `fix` only visits the affected terms. Every write pays for the index, so it is meant for energies that are fixed repeatedly (e.g. warm starts), not for compilation.
+    """
+
+    def __init__(self, buffer: dict | float = None):
+        """"""
+        if isinstance(buffer, Posiform):
+            ## Already validated
+            Posiform.__init__(self)
+            dict.update(self, buffer)
+        else:
+            Posiform.__init__(self, buffer)
+
+        self.__index: dict[str, set[frozenset]] = {}
+        for k in self.keys():
+            self.__link(k)
+
+    def __link(self, k: frozenset | None):
+        if k is not None:
+            for x in k:
+                if x in self.__index:
+                    self.__index[x].add(k)
+                else:
+                    self.__index[x] = {k}
+
+    def __unlink(self, k: frozenset | None):
+        if k is not None:
+            for x in k:
+                terms = self.__index[x]
+                terms.discard(k)
+                if not terms:
+                    del self.__index[x]
+
+    # -*- Index Maintenance -*-
+    def __setitem__(self, k: frozenset | None, v: float):
+        if k not in self:
+            self.__link(k)
+        dict.__setitem__(self, k, v)
+
+    def __delitem__(self, k: frozenset | None):
+        dict.__delitem__(self, k)
+        self.__unlink(k)
+
+    def pop(self, k: frozenset | None, *default):
+        if k in self:
+            self.__unlink(k)
+        return dict.pop(self, k, *default)
+
+    def popitem(self) -> tuple[frozenset | None, float]:
+        k, v = dict.popitem(self)
+        self.__unlink(k)
+        return (k, v)
+
+    def setdefault(self, k: frozenset | None, v: float = None) -> float:
+        if k not in self:
+            self[k] = v
+        return self[k]
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def clear(self):
+        dict.clear(self)
+        self.__index.clear()
+
+    def copy(self) -> IndexedPosiform:
+        """Deep IndexedPosiform copy."""
+        posiform = self.__class__()
+        dict.update(posiform, self)
+        posiform.__index = {x: set(terms) for x, terms in self.__index.items()}
+        return posiform
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def _affected(self, point: dict) -> set[frozenset]:
+        """"""
+        return set().union(*(self.__index[x] for x in point if x in self.__index))
+
+    @property
+    def variables(self) -> list:
+        return sorted(self.__index)
+
+
+CHUNK_SIZE = 2 ** 16
+
+
+def json_term(item: object, doc: str, pos: int) -> tuple[frozenset | None, float]:
+    """Validates a single `{"term": [...], "cons": ...}` item."""
+    if not isinstance(item, dict):
+        raise json.decoder.JSONDecodeError("Items must be of Object type (Python dict)", doc, pos)
+    elif "term" not in item or "cons" not in item:
+        raise json.decoder.JSONDecodeError("Items must contain both 'term' and 'cons' keys", doc, pos)
+    elif not isinstance(item["term"], list) and item["term"] is not None:
+        raise json.decoder.JSONDecodeError("Items 'term' value must be of Array type (Python list)", doc, pos)
+    elif item["term"] is not None and not all(isinstance(var, str) for var in item["term"]):
+        raise json.decoder.JSONDecodeError("Items 'term' value must contain only entries of type String (Python str)", doc, pos)
+    elif not isinstance(item["cons"], (int, float)):
+        raise json.decoder.JSONDecodeError("Items 'cons' value must be of Number type (Python float)", doc, pos)
+    else:
+        return (frozenset(item["term"]) if item["term"] else None), float(item["cons"])
+
+
+def write_terms(terms, file, indent: int = None):
+    """
+    Writes `(term, cons)` pairs as the JSON array produced by `Posiform.toJSON`, without building it in memory.
+
+    Parameters
+    ----------
+    terms : Iterable[tuple[frozenset | None, float]]
+    file : TextIO
+    indent : int (optional)
+    """
+    ## Same output as 'json.dumps', formatted by hand for speed
+    string = json.encoder.encode_basestring_ascii
+    number = json.JSONEncoder().encode
+
+    if indent is None:
+        head, sep, tail = "[", ", ", "]"
+        item_head, item_sep, item_tail = '{"term": ', ', "cons": ', "}"
+        term_head, term_sep, term_tail = "[", ", ", "]"
+    else:
+        pad = ["\n" + " " * (indent * level) for level in range(4)]
+        head, sep, tail = "[" + pad[1], "," + pad[1], pad[0] + "]"
+        item_head, item_sep, item_tail = "{" + pad[2] + '"term": ', "," + pad[2] + '"cons": ', pad[1] + "}"
+        term_head, term_sep, term_tail = "[" + pad[3], "," + pad[3], pad[2] + "]"
+
+    chunk = []
+    size = 0
+    first = True
+
+    for k, v in terms:
+        if k is None:
+            term = "null"
+        elif k:
+            term = term_head + term_sep.join(map(string, sorted(k))) + term_tail
+        else:
+            term = "[]"
+        item = item_head + term + item_sep + (float.__repr__(v) if v == v and abs(v) != float("inf") else number(v)) + item_tail
+
+        if first:
+            chunk.append(head)
+            first = False
+        else:
+            chunk.append(sep)
+        chunk.append(item)
+        size += len(item)
+
+        if size >= CHUNK_SIZE:
+            file.write("".join(chunk))
+            chunk.clear()
+            size = 0
+
+    chunk.append("[]" if first else tail)
+    file.write("".join(chunk))
+
+
+def read_terms(file):
+    """
+    Incrementally parses the JSON array produced by `Posiform.toJSON`, yielding one `(term, cons)` pair at a time.
+
+    Parameters
+    ----------
+    file : TextIO
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+
+    def fill() -> bool:
+        nonlocal buffer, pos
+        data = file.read(CHUNK_SIZE)
+        buffer = buffer[pos:] + data
+        pos = 0
+        return bool(data)
+
+    def skip() -> str:
+        ## Next non-whitespace character, or "" at end of file
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            elif not fill():
+                return ""
+
+    if skip() != "[":
+        raise json.decoder.JSONDecodeError("Data must be of Array type (Python list)", buffer, pos)
+    pos += 1
+
+    if skip() == "]":
+        pos += 1
+    else:
+        while True:
+            skip()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.decoder.JSONDecodeError:
+                    if not fill():
+                        raise
+                else:
+                    break
+
+            yield json_term(item, buffer, pos)
+            pos = end
+
+            c = skip()
+            pos += 1
+            if c == "]":
+                break
+            elif c != ",":
+                raise json.decoder.JSONDecodeError("Expecting ',' delimiter", buffer, pos - 1)
+
+    if skip() != "":
+        raise json.decoder.JSONDecodeError("Extra data", buffer, pos)
+
+
+def evaluate_terms(samples: np.ndarray, cols: np.ndarray, cons: np.ndarray, const: float) -> np.ndarray:
+    """
+    Vectorized energy evaluation kernel.
+
+    Parameters
+    ----------
+    samples : np.ndarray
+        (m x n) array of assignments.
+    cols : np.ndarray
+        (terms x degree) sample columns of each term, padded with n.
+    cons : np.ndarray
+        Term coefficients.
+    const : float
+        Constant term.
+
+    Returns
+    -------
+    np.ndarray
+        The m energy values.
+    """
+    m, n = samples.shape
+
+    if np.any(cols > n) or np.any(cols < 0):
+        raise ValueError("Variable columns exceed the sample dimensions")
+
+    energy = np.full(m, float(const))
+
+    if cols.size == 0:
+        return energy
+
+    padded = np.hstack([samples, np.ones((m, 1), dtype=samples.dtype)])
+
+    ## Bounds the (samples x terms x degree) temporary
+    step = max(1, BATCH_SIZE // cols.size)
+
+    for i in range(0, m, step):
+        energy[i : i + step] += padded[i : i + step][:, cols].prod(axis=2) @ cons
+
+    return energy
+
 
-__all__ = ["Posiform"]
+__all__ = ["Posiform", "IndexedPosiform"]
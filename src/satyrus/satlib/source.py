@@ -5,6 +5,7 @@ from __future__ import annotations
 
 # Standard Library
 import itertools as it
+from bisect import bisect_right
 from pathlib import Path
 
 
@@ -15,6 +16,9 @@ class Source(str):
 
     LEXKEYS = {"lexpos", "chrpos", "lineno", "source"}
 
+    ## Shared by every object without a source position, so it is never updated in place
+    BLANK = {"chrpos": 0, "lineno": 0, "lexpos": 0, "source": None}
+
     def __new__(
         cls,
         *,
@@ -86,6 +90,15 @@ class Source(str):
     def __repr__(self):
         return f"{self.__class__.__name__}({self.fpath!r})"
 
+    def __reduce__(self):
+        return (self.__class__._restore, (str.__str__(self), self.fpath, self.offset, self.length))
+
+    @classmethod
+    def _restore(cls, buffer: str, fpath: Path | str, offset: int, length: int) -> Source:
+        source = cls(buffer=buffer, offset=offset, length=length)
+        source.fpath = fpath
+        return source
+
     def __bool__(self):
         """Truth-value for emptiness checking."""
         return self.__len__() > 0
@@ -101,9 +114,8 @@ class Source(str):
 
         lexpos = lexpos + self.offset + 1
 
-        lineno = 1
-        while lineno < len(self.table) and lexpos >= self.table[lineno]:
-            lineno += 1
+        ## First line ending after lexpos
+        lineno = bisect_right(self.table, lexpos, 1)
 
         if lineno == len(self.table):
             return self.eof.lexinfo
@@ -160,42 +172,28 @@ class Source(str):
         setattr(o, "lexinfo", self.getlex(lexpos))
 
         if not hasattr(o.__class__, "__lextrack__"):
-            setattr(
-                o.__class__, "chrpos", property(lambda this: this.lexinfo["chrpos"])
-            )
-            setattr(
-                o.__class__, "lineno", property(lambda this: this.lexinfo["lineno"])
-            )
-            setattr(
-                o.__class__, "lexpos", property(lambda this: this.lexinfo["lexpos"])
-            )
-            setattr(
-                o.__class__, "source", property(lambda this: this.lexinfo["source"])
-            )
-            setattr(o.__class__, "__lextrack__", None)
+            self.lextrack(o.__class__)
 
     @classmethod
     def blank(cls, o: object):
-        setattr(o, "lexinfo", {"chrpos": 0, "lineno": 0, "lexpos": 0, "source": None})
+        """Objects created during compilation share `Source.BLANK` instead of holding their own position info."""
+        o.lexinfo = cls.BLANK
 
         if not hasattr(o.__class__, "__lextrack__"):
-            setattr(
-                o.__class__, "chrpos", property(lambda this: this.lexinfo["chrpos"])
-            )
-            setattr(
-                o.__class__, "lineno", property(lambda this: this.lexinfo["lineno"])
-            )
-            setattr(
-                o.__class__, "lexpos", property(lambda this: this.lexinfo["lexpos"])
-            )
-            setattr(
-                o.__class__, "source", property(lambda this: this.lexinfo["source"])
-            )
-            setattr(o.__class__, "__lextrack__", None)
+            cls.lextrack(o.__class__)
+
+    @classmethod
+    def lextrack(cls, o_class: type):
+        """Adds position properties to a tracked class."""
+        setattr(o_class, "chrpos", property(lambda this: this.lexinfo["chrpos"]))
+        setattr(o_class, "lineno", property(lambda this: this.lexinfo["lineno"]))
+        setattr(o_class, "lexpos", property(lambda this: this.lexinfo["lexpos"]))
+        setattr(o_class, "source", property(lambda this: this.lexinfo["source"]))
+        setattr(o_class, "__lextrack__", None)
 
     def propagate(self, x: object, y: object, *, out: bool = False) -> object | None:
         if self.trackable(x, strict=True) and self.trackable(y):
-            y.lexinfo.update(x.lexinfo)
+            y.lexinfo = x.lexinfo
             if out:
                 return y
             else:
@@ -3,6 +3,8 @@ from __future__ import annotations
 
 # Standard Library
 import json
+import hashlib
+import shutil
 import importlib.resources as resources
 from pathlib import Path
 
@@ -11,8 +13,8 @@ from cstream import stderr
 
 # Local
 from ..error import SatRuntimeError, EXIT_SUCCESS, EXIT_FAILURE
-from ..satlib import Source, Posiform, package_path
-from ..compiler import SatCompiler
+from ..satlib import Source, Posiform, CompactPosiform, package_path
+from ..compiler import SatCompiler, ConstraintCache, ConstraintPool
 from ..compiler.instructions import INSTRUCTIONS
 from ..parser import SatParser
 from ..parser.legacy import SatLegacyParser
@@ -38,12 +40,21 @@ class Satyrus(object):
 
     __cache_path__ = None
 
-    def __init__(self, legacy: bool = False):
+    ## Directory of constraint energy caches, next to the cache file
+    __constraints__ = "constraints"
+
+    def __init__(self, legacy: bool = False, compact: bool = False, parallel: bool | int = False, constraint_cache: bool = True):
         """
         Parameters
         ----------
         legacy : bool (optional)
             If true, opts for the legacy parser and its syntax.
+        compact : bool (optional)
+            If true, energy equations are built as array-backed 'CompactPosiform' objects.
+        parallel : bool or int (optional)
+            If true, constraints are compiled in a pool of worker processes, one for each CPU. An integer sets the number of workers instead.
+        constraint_cache : bool (optional)
+            If true (default), energies of single constraints are cached in a file for each source, so that changed sources only compile their changed constraints again.
         """
 
         # Choose parser
@@ -54,10 +65,18 @@ class Satyrus(object):
 
         # Start Compiler Engine
         self.compiler = SatCompiler(INSTRUCTIONS, self.parser)
+        self.compiler.flag("compact", compact)
+
+        if parallel is True:
+            self.compiler.pool = ConstraintPool()
+        elif parallel:
+            self.compiler.pool = ConstraintPool(parallel)
 
         # Compilation Cache
         self.__cache__ = {}
 
+        self.constraint_cache = constraint_cache
+
     @staticmethod
     def _path(path: Path) -> str:
         """"""
@@ -73,14 +92,14 @@ class Satyrus(object):
         """"""
         return (Satyrus._path(path), Satyrus._stat(path))
 
-    def compile(self, *paths: str | Path) -> Posiform | None:
+    def compile(self, *paths: str | Path) -> Posiform | CompactPosiform | None:
         """"""
         if not all(isinstance(path, (str, Path)) for path in paths):
             raise TypeError("File paths must be of type 'str' or 'pathlib.Path'")
         else:
             return self.__compile(*paths)
 
-    def __compile(self, *paths: str) -> Posiform | None:
+    def __compile(self, *paths: str) -> Posiform | CompactPosiform | None:
         """"""
         if not paths:
             raise IOError("No input files provided")
@@ -91,6 +110,9 @@ class Satyrus(object):
             # Load Cache
             self.load_cache()
 
+            ## Constraint energies used to be kept in the cache file itself
+            self.__cache__.pop("$constraints", None)
+
             # Empty Energy Equation
             source_list: list[Path] = []
             energy_list: list[Path] = []
@@ -102,33 +124,63 @@ class Satyrus(object):
                     code |= EXIT_FAILURE
                 elif path.suffix == ".sat":
                     source_list.append(path)
-                elif path.suffix == ".json":
+                elif path.suffix in {".json", ".satb"}:
                     energy_list.append(path)
                 else:
                     stderr[0] << f"Error: Invalid file extension '{path.suffix}'"
                     code |= EXIT_FAILURE
 
-            total_energy = Posiform(None)
+            if self.compiler.flag("compact"):
+                total_energy = CompactPosiform()
+            else:
+                total_energy = Posiform(None)
 
             for energy_path in energy_list:
-                if not self.cached(energy_path):
+                ## Energy files are streamed or mapped, so caching a copy of them would be no faster
+                if energy_path.suffix == ".satb":
+                    try:
+                        if self.compiler.flag("compact"):
+                            ## Input files are checked up front, since their terms are all used next
+                            energy = CompactPosiform.loadBinary(energy_path, validate=True)
+                        else:
+                            energy = Posiform.loadBinary(energy_path)
+                    except ValueError:
+                        stderr[0] << f"Error: Inconsistent binary data for energy equation in '{energy_path}'"
+                        code |= EXIT_FAILURE
+                        continue
+                else:
                     with energy_path.open(mode="r") as energy_file:
                         try:
-                            energy = Posiform.fromJSON(energy_file.read())
+                            if self.compiler.flag("compact"):
+                                energy = CompactPosiform.loadJSON(energy_file)
+                            else:
+                                energy = Posiform.loadJSON(energy_file)
                         except json.decoder.JSONDecodeError:
                             stderr[0] << f"Error: Inconsistent JSON data for energy equation in '{energy_path}'"
                             code |= EXIT_FAILURE
-                        else:
-                            total_energy += self.cache(energy_path, energy)
+                            continue
+
+                if total_energy:
+                    total_energy += energy
                 else:
-                    total_energy += self.cache(energy_path)
+                    ## Keeps a memory-mapped energy as it is
+                    total_energy = energy
 
             for source_path in source_list:
                 if not self.cached(source_path):
-                    if self.compiler.compile(Source(fname=source_path)):
-                        code |= EXIT_FAILURE
-                    else:
-                        total_energy += self.cache(source_path, self.compiler.energy)
+                    ## Changed sources are still compiled incrementally, reusing the energies of unchanged constraints
+                    if self.constraint_cache:
+                        self.compiler.cache = self.load_constraints(source_path)
+
+                    try:
+                        if self.compiler.compile(Source(fname=source_path)):
+                            code |= EXIT_FAILURE
+                        else:
+                            total_energy += self.cache(source_path, self.compiler.energy)
+                    finally:
+                        if self.compiler.cache is not None:
+                            self.write_constraints(source_path, self.compiler.cache)
+                            self.compiler.cache = None
                 else:
                     total_energy += self.cache(source_path)
 
@@ -178,10 +230,44 @@ class Satyrus(object):
             else:
                 json.dump(None, file)
 
+    @classmethod
+    def constraints_path(cls, path: Path) -> Path:
+        key = hashlib.sha256(cls._path(path).encode("utf-8")).hexdigest()[:32]
+        return cls.cache_path().parent.joinpath(cls.__constraints__, f"{key}.json")
+
+    def load_constraints(self, path: Path) -> ConstraintCache:
+        constraints_path = self.constraints_path(path)
+
+        try:
+            with constraints_path.open(mode="r") as file:
+                entries = json.load(file)
+        except (OSError, json.decoder.JSONDecodeError):
+            entries = None
+
+        return ConstraintCache(entries if isinstance(entries, dict) else None)
+
+    def write_constraints(self, path: Path, cache: ConstraintCache):
+        if not cache.dirty:
+            return
+
+        constraints_path = self.constraints_path(path)
+
+        if cache.entries:
+            constraints_path.parent.mkdir(exist_ok=True)
+            with constraints_path.open(mode="w") as file:
+                json.dump(cache.entries, file)
+        else:
+            try:
+                constraints_path.unlink()
+            except FileNotFoundError:
+                pass
+
     @classmethod
     def clear_cache(cls):
         with cls.cache_path().open(mode="w") as file:
             json.dump({}, file)
 
+        shutil.rmtree(cls.cache_path().parent.joinpath(cls.__constraints__), ignore_errors=True)
+
 
 __all__ = ["Satyrus"]
@@ -122,6 +122,7 @@ ALPHA = intern("alpha")
 EPSILON = intern("epsilon")
 MAPPING = intern("mapping")
 INDEXER = intern("indexer")
+TSEITIN = intern("tseitin")
 
 ## Constraint Types
 CONS_INT = intern("int")
@@ -2,14 +2,19 @@
 from __future__ import annotations
 
 # Standard Library
+import io
+import itertools as it
 import json
+import pickle
 
 # Third-Party
 import numpy as np
 import pytest
 
 # Local
-from ..satlib import Posiform
+from ..satlib import Posiform, IndexedPosiform, CompactPosiform
+from ..satlib import posiform
+from ..satlib.binary import read_binary, write_binary
 
 
 class TestPosiform:
@@ -183,6 +188,54 @@ class TestPosiform:
                     assert Posiform.fromJSON(s) == t
                     assert r == t.toJSON(indent=0)
 
+    def test_stream_json(self, fix_json, fix_json_indent, monkeypatch):
+        ## Tiny chunks, so that items are split across reads
+        monkeypatch.setattr(posiform, "CHUNK_SIZE", 5)
+
+        for (s, t, r, exc), indent in [*((case, None) for case in fix_json), *((case, 0) for case in fix_json_indent)]:
+            if exc is None:
+                assert Posiform.loadJSON(io.StringIO(s)) == t
+                file = io.StringIO()
+                t.dumpJSON(file, indent=indent)
+                assert file.getvalue() == r
+            else:
+                with pytest.raises(exc):
+                    Posiform.loadJSON(io.StringIO(s))
+
+        for s in ["", "[", "[]]", '[{"term": null, "cons": 1.0} {"term": null, "cons": 1.0}]', '[{"term": null, "cons": 1.0},]']:
+            with pytest.raises(json.decoder.JSONDecodeError):
+                Posiform.loadJSON(io.StringIO(s))
+
+        p = Posiform({("x", "y"): 1.0, ("z",): -2.5, None: 3.0})
+        for indent in (None, 0, 4):
+            file = io.StringIO()
+            p.dumpJSON(file, indent=indent)
+            assert file.getvalue() == p.toJSON(indent=indent)
+            assert Posiform.loadJSON(io.StringIO(file.getvalue())) == p
+
+            file = io.StringIO()
+            CompactPosiform(p).dumpJSON(file, indent=indent)
+            assert CompactPosiform.loadJSON(io.StringIO(file.getvalue())) == CompactPosiform(p)
+
+        file = io.StringIO()
+        Posiform().dumpJSON(file, indent=4)
+        assert file.getvalue() == "[]"
+
+    def test_binary(self, tmp_path):
+        path = tmp_path / "energy.satb"
+        for p in [Posiform(), Posiform(2.0), Posiform({("x", "y"): 1.0, ("z",): -2.5, ("w", "x", "y"): 0.5, None: 3.0})]:
+            with path.open(mode="wb") as file:
+                p.dumpBinary(file)
+            assert Posiform.loadBinary(path) == p
+
+        path.write_bytes(b"SATA" + bytes(60))
+        with pytest.raises(ValueError):
+            Posiform.loadBinary(path)
+
+        path.write_bytes(b"SATB")
+        with pytest.raises(ValueError):
+            Posiform.loadBinary(path)
+
     def test_call(self, fix_call):
         for p, x, q, exc in fix_call:
             if exc is None:
@@ -191,6 +244,19 @@ class TestPosiform:
                 with pytest.raises(exc):
                     assert p(x) == q
 
+    def test_fix(self, fix_call):
+        for p, x, q, exc in fix_call:
+            if exc is None:
+                assert p.copy().fix(x) == q
+                assert p.indexed()(x) == q
+                assert p.indexed().fix(x) == q
+            else:
+                with pytest.raises(exc):
+                    p.indexed().fix(x)
+
+        ## Fixing to zero drops the term instead of leaving a null coefficient
+        assert Posiform({("x", "y"): 1.0, ("z",): 2.0}).fix({"x": 0}) == Posiform({("z",): 2.0})
+
     # -*- Tests -*-
     def test_init(self, fix_init):
         for a, exc in fix_init:
@@ -254,3 +320,320 @@ class TestPosiform:
             assert x == t_x
             assert np.all(Q == t_Q)
             assert c == t_c
+
+    @pytest.fixture
+    def fix_pow(self) -> list:
+        return [
+            (Posiform({("x", "y"): 1.0, ("z",): -2.0, None: 3.0}), 0, None),
+            (Posiform({("x", "y"): 1.0, ("z",): -2.0, None: 3.0}), 1, None),
+            (Posiform({("x", "y"): 1.0, ("z",): -2.0, None: 3.0}), 5, None),
+            (Posiform({("x", "y"): 1.0, ("y", "z"): -1.0}), 6, None),
+            (Posiform({("x",): 1.0, ("y",): -1.0, ("x", "y"): 2.0}), 7, None),
+            (Posiform({("x", "y"): -2.0}), 3, None),
+            (Posiform({("x", "y"): 1.0}), Posiform(2.0), None),
+            (Posiform({("x", "y"): 1.0}), 1.5, TypeError),
+            (Posiform({("x", "y"): 1.0}), -1, TypeError),
+            (Posiform({("x", "y"): 1.0}), Posiform({("x",): 1.0}), TypeError),
+        ]
+
+    def test_pow(self, fix_pow):
+        for p, n, exc in fix_pow:
+            if exc is None:
+                ## Reference: repeated multiplication
+                t = Posiform(1.0)
+                for _ in range(int(float(n))):
+                    t = t * p
+                q = p.copy()
+                q **= n
+                assert (p ** n) == t
+                assert q == t
+            else:
+                with pytest.raises(exc):
+                    p ** n
+
+    def test_accumulators(self):
+        p = [Posiform({("x",): 1.0, None: 1.0}), Posiform({("y",): -1.0}), 2.0]
+        assert Posiform.sum(x.copy() if isinstance(x, Posiform) else x for x in p) == p[0] + p[1] + p[2]
+        assert Posiform.prod(x.copy() if isinstance(x, Posiform) else x for x in p) == p[0] * p[1] * p[2]
+        assert Posiform.sum([]) == Posiform(0.0)
+        assert Posiform.prod([]) == Posiform(1.0)
+        assert Posiform.prod([2.0, p[0].copy()]) == 2.0 * p[0]
+
+        ## The first operand is reused as the accumulator
+        q = p[0].copy()
+        assert Posiform.sum([q, p[1]]) is q
+
+    @pytest.fixture
+    def fix_evaluate_batch(self) -> list:
+        return [
+            (Posiform({("x", "y"): 1.0, ("z",): -2.0, None: 3.0}), [[0, 0, 0], [1, 1, 0], [1, 1, 1], [0, 1, 1]], None, [3.0, 4.0, 2.0, 1.0], None),
+            (Posiform({("x", "y"): 1.0}), [[1, 1, 1]], {"x": 2, "y": 0}, [1.0], None),
+            (Posiform({("x", "y"): 1.0}), [[1, 1]], {"x": 0}, None, ValueError),
+            (Posiform({("x", "y"): 1.0}), [1, 1], None, None, ValueError),
+            (Posiform(), [[1], [0]], None, [0.0, 0.0], None),
+        ]
+
+    def test_evaluate_batch(self, fix_evaluate_batch):
+        for p, S, x, t_e, exc in fix_evaluate_batch:
+            if exc is None:
+                assert np.all(p.evaluate_batch(np.array(S), x) == np.array(t_e))
+            else:
+                with pytest.raises(exc):
+                    p.evaluate_batch(np.array(S), x)
+
+    @pytest.fixture
+    def fix_reduce_degree(self) -> list[Posiform]:
+        return [
+            Posiform({("x", "y"): 1.0, None: 2.0}),
+            Posiform({("x", "y", "z"): 1.0}),
+            Posiform({("x", "y", "z"): -2.0, ("w", "x", "y"): 1.0, ("w", "x", "y", "z"): -3.0, ("z",): 1.0}),
+            Posiform({("a", "b", "c"): 3.0, ("a", "b", "d"): -1.0, ("b", "c", "d"): -2.0, ("a", "b", "c", "d"): 1.0}),
+        ]
+
+    def test_reduce_degree(self, fix_reduce_degree):
+        for p in fix_reduce_degree:
+            x = p.variables
+            S = np.array(list(it.product((0, 1), repeat=len(x))))
+            for strategy in (Posiform.SELECTION, Posiform.SUBSTITUTION, Posiform.ISHIKAWA):
+                r = p.reduce_degree(strategy)
+                assert r.degree <= 2
+                assert r.reduce_stats["terms"] == len(r)
+
+                ## Minimizing over the ancillas must recover the original energy
+                a = [v for v in r.variables if v not in x]
+                A = np.array(list(it.product((0, 1), repeat=len(a))))
+                E = r.evaluate_batch(np.hstack([np.repeat(S, len(A), axis=0), np.tile(A, (len(S), 1))]), {v: i for i, v in enumerate(x + a)})
+                assert np.allclose(E.reshape(len(S), len(A)).min(axis=1), p.evaluate_batch(S, {v: i for i, v in enumerate(x)}))
+
+        with pytest.raises(ValueError):
+            Posiform({("x", "y", "z"): 1.0}).reduce_degree("unknown")
+
+    def test_reduce_stats(self):
+        p = Posiform({tuple(f"x{i}" for i in range(6)): 1.0, tuple(f"y{i}" for i in range(5)): -1.0})
+        r = p.reduce_degree(Posiform.ISHIKAWA)
+        assert r.reduce_stats == {"strategy": Posiform.ISHIKAWA, "ancillas": 3, "terms": len(r)}
+
+        ## Stats stay with the reduced posiform
+        assert p.reduce_stats == {} and (r + 1.0).reduce_stats == {}
+
+    @pytest.fixture
+    def fix_preprocess(self) -> list[Posiform]:
+        return [
+            Posiform(),
+            Posiform(2.0),
+            Posiform({("x",): 1.0, ("y",): -1.0}),
+            Posiform({("a",): 3.0, ("b",): -2.0, ("a", "b"): 1.0, ("c", "d"): -1.0, ("c",): 0.5, ("d",): 0.5, ("b", "e"): 1.0, ("e",): -0.5}),
+            Posiform({("x", "y"): -2.0, ("y", "z"): -2.0, ("x", "z"): 3.0, ("x",): 1.0, ("z",): 1.0, None: 1.0}),
+            Posiform({("x", "y", "z"): -3.0, ("x",): 1.0, ("w", "z"): 2.0, ("w",): -1.0}),
+        ]
+
+    def test_preprocess(self, fix_preprocess):
+        for p in fix_preprocess:
+            r, fixed = p.preprocess()
+            assert r.degree <= 2
+            assert not (set(fixed) & set(r.variables))
+
+            x = p.variables
+            S = np.array(list(it.product((0, 1), repeat=len(x))))
+            E = p.evaluate_batch(S)
+
+            if r.degree <= 2 and p.degree <= 2:
+                ## Strong persistencies hold for every minimizer
+                bound, _ = p.roof_dual()
+                assert bound <= E.min() + 1e-9
+                for v, b in fixed.items():
+                    assert np.all(S[np.isclose(E, E.min())][:, x.index(v)] == b)
+
+            ## The reduced posiform keeps the minimum value
+            y = r.variables
+            T = np.array(list(it.product((0, 1), repeat=len(y))))
+            assert np.isclose(r.evaluate_batch(T).min(), E.min())
+
+        assert Posiform({("a",): 3.0, ("b",): -2.0, ("a", "b"): 1.0}).preprocess()[1] == {"a": 0, "b": 1}
+
+        with pytest.raises(ValueError):
+            Posiform({("x", "y", "z"): 1.0}).roof_dual()
+
+    def test_lower_bound(self, fix_preprocess):
+        for p in fix_preprocess:
+            x = p.variables
+            S = np.array(list(it.product((0, 1), repeat=len(x))))
+            E = p.evaluate_batch(S)
+
+            for strategy in (Posiform.SELECTION, Posiform.ISHIKAWA):
+                assert p.lower_bound(strategy) <= E.min() + 1e-9
+
+        ## Tight bounds
+        assert Posiform().lower_bound() == 0.0
+        assert Posiform(2.0).lower_bound() == 2.0
+        assert np.isclose(Posiform({("x",): 1.0, ("y",): -1.0, None: 0.5}).lower_bound(), -0.5)
+        assert np.isclose(Posiform({("a",): 3.0, ("b",): -2.0, ("a", "b"): 1.0}).lower_bound(), -2.0)
+
+    def test_degree(self):
+        assert Posiform().degree == 0
+        assert Posiform(1.0).degree == 0
+        assert Posiform({("x", "y", "z"): 1.0, ("x",): 1.0}).degree == 3
+
+    @pytest.fixture
+    def fix_qubo_sparse(self) -> list[Posiform]:
+        return [
+            Posiform(),
+            Posiform({("x", "y", "z"): 1.0}),
+            Posiform({("x", "y"): 2.0, ("y",): -1.0, ("w", "x", "y", "z"): -3.0, None: 1.5}),
+        ]
+
+    def test_qubo_sparse(self, fix_qubo_sparse):
+        for p in fix_qubo_sparse:
+            t_x, t_Q, t_c = p.qubo()
+            x, (I, J, V), c = p.qubo(sparse=True)
+            assert x == t_x
+            assert c == t_c
+            assert np.all(I <= J)
+
+            Q = np.zeros_like(t_Q)
+            np.add.at(Q, (I, J), V / 2.0)
+            np.add.at(Q, (J, I), V / 2.0)
+            assert np.allclose(Q, t_Q)
+
+
+class TestIndexedPosiform:
+    @staticmethod
+    def index(p: IndexedPosiform) -> dict:
+        ## Reference index, rebuilt from scratch
+        index = {}
+        for k in p.keys():
+            if k is not None:
+                for x in k:
+                    index.setdefault(x, set()).add(k)
+        return index
+
+    def test_index(self):
+        p = Posiform({("x", "y"): 1.0, ("y", "z"): -2.0, ("w",): 1.0, None: 3.0}).indexed()
+        assert isinstance(p, IndexedPosiform)
+        assert p._affected({"y": 1}) == {frozenset({"x", "y"}), frozenset({"y", "z"})}
+        assert p._affected({"u": 1}) == set()
+
+        p += Posiform({("x", "y"): -1.0, ("u", "v"): 1.0})
+        p *= Posiform({("x",): 1.0, None: 1.0})
+        p -= 2.0
+        q = p.copy()
+        p.fix({"y": 0, "u": "w"})
+        assert p._affected({x: 1 for x in "uvwxyz"}) == {k for k in p.keys() if k is not None}
+        assert p.variables == sorted(self.index(p))
+        assert q.variables == sorted(self.index(q))
+
+        p.clear()
+        assert p.variables == []
+
+    def test_pickle(self):
+        p = Posiform({("x", "y"): 1.0, ("z",): -1.0}).indexed()
+        q = pickle.loads(pickle.dumps(p))
+        assert isinstance(q, IndexedPosiform)
+        assert q == p
+        assert q.fix({"x": 1}) == Posiform({("y",): 1.0, ("z",): -1.0})
+
+
+class TestCompactPosiform:
+    @pytest.fixture
+    def fix_posiforms(self) -> list[Posiform]:
+        return [
+            Posiform(),
+            Posiform(3.0),
+            Posiform({("x", "y"): 1.0, ("x", "z"): 2.0, None: 1.0}),
+            Posiform({("y", "z"): -1.0, ("x",): 3.0}),
+            Posiform({("x", "y", "z"): 1.0, ("w", "x"): -2.0, None: -1.0}),
+        ]
+
+    @pytest.fixture
+    def fix_call(self) -> list[tuple[Posiform, dict]]:
+        return [
+            (Posiform({("x", "y"): 1.0, ("z", "w"): -1.0}), {"x": 2.0, "w": 3.0}),
+            (Posiform({("x", "y"): 1.0, ("z", "w"): -1.0}), {"x": "u", "w": 3.0}),
+            (Posiform({("x", "w"): 1.0, ("y", "w"): 1.0, None: -1.0}), {"x": 2.0, "y": 3.0}),
+            (Posiform({("x",): 1.0, None: -1.0}), {"x": 1.0}),
+        ]
+
+    def test_init(self, fix_posiforms):
+        for p in fix_posiforms:
+            assert CompactPosiform(p) == p
+            assert CompactPosiform(p).toPosiform() == p
+
+        with pytest.raises(TypeError):
+            CompactPosiform({(1, 2): 1})
+
+    def test_arithmetic(self, fix_posiforms):
+        for p in fix_posiforms:
+            for q in fix_posiforms:
+                P, Q = CompactPosiform(p), CompactPosiform(q)
+                assert (P + Q) == (p + q)
+                assert (P - Q) == (p - q)
+                assert (P * Q) == (p * q)
+                assert (P + q) == (p + q)
+                assert (p * Q) == (p * q)
+            assert (-CompactPosiform(p)) == (-p)
+            assert (CompactPosiform(p) ** 2) == (p ** 2)
+            assert (3.0 * CompactPosiform(p) - 1.0) == (3.0 * p - 1.0)
+
+        with pytest.raises(TypeError):
+            CompactPosiform(1.0) + 3j
+
+    def test_sum(self, fix_posiforms):
+        assert CompactPosiform.sum(fix_posiforms) == sum(fix_posiforms, Posiform())
+
+    def test_call(self, fix_call):
+        for p, x in fix_call:
+            assert CompactPosiform(p)(x) == p(x)
+            assert CompactPosiform(p).fix(x) == p(x)
+
+        with pytest.raises(TypeError):
+            CompactPosiform(1.0)(5.0)
+
+    def test_binary(self, fix_posiforms, tmp_path):
+        path = tmp_path / "energy.satb"
+        for p in fix_posiforms:
+            c = CompactPosiform(p)
+            with path.open(mode="wb") as file:
+                c.dumpBinary(file)
+            assert CompactPosiform.loadBinary(path) == c
+            assert CompactPosiform.loadBinary(path, mmap=False) == c
+            assert Posiform.loadBinary(path) == p
+
+            ## Files written by 'Posiform' may number variables differently
+            with path.open(mode="wb") as file:
+                p.dumpBinary(file)
+            assert CompactPosiform.loadBinary(path) == c
+
+        ## Index entries are only checked on request
+        with path.open(mode="wb") as file:
+            write_binary(file, ["x"], np.array([0, 1, 2]), np.array([0, 1]), np.array([1.0, 2.0]))
+
+        read_binary(path)
+
+        with pytest.raises(ValueError):
+            read_binary(path, validate=True)
+        with pytest.raises(ValueError):
+            CompactPosiform.loadBinary(path, validate=True)
+        with pytest.raises(ValueError):
+            Posiform.loadBinary(path)
+
+    def test_lower_bound(self, fix_posiforms):
+        for p in fix_posiforms:
+            assert np.isclose(CompactPosiform(p).lower_bound(), p.lower_bound())
+
+    def test_qubo(self, fix_posiforms):
+        for p in fix_posiforms:
+            x, Q, c = CompactPosiform(p).qubo()
+            t_x, t_Q, t_c = p.qubo()
+            assert x == t_x
+            assert np.allclose(Q, t_Q)
+            assert c == t_c
+
+    def test_evaluate_batch(self, fix_posiforms):
+        S = np.array([[0, 0, 0, 0], [1, 1, 1, 1], [1, 0, 1, 0], [0, 1, 1, 1]])
+        x = {"w": 0, "x": 1, "y": 2, "z": 3}
+        for p in fix_posiforms:
+            assert np.allclose(CompactPosiform(p).evaluate_batch(S, x), p.evaluate_batch(S, x))
+
+    def test_pickle(self, fix_posiforms):
+        for p in fix_posiforms:
+            assert pickle.loads(pickle.dumps(CompactPosiform(p))) == p
@@ -1,6 +1,354 @@
+import itertools as it
+import pickle
+
+import pytest
+
 from ..satyrus import Satyrus
+from ..satlib import Source, Posiform, CompactPosiform
+from ..compiler import SatCompiler, ConstraintCache, ConstraintPool, DependencyGraph
+from ..compiler.clauses import Clauses
+from ..compiler.loops import LoopDomain
+from ..compiler.memory import Memory
+from ..compiler.template import Template
+from ..compiler.instructions import INSTRUCTIONS
+from ..parser import SatParser
+from ..symbols import CONS_INT, T_AND, T_OR, T_NOT
+from ..types import Expr, Var, Number
 
 class TestSatyrus:
 
     def test_problems(self):
-        pass
\ No newline at end of file
+        pass
+
+    @pytest.fixture
+    def fix_template(self) -> list[str]:
+        return [
+            """
+            n = 4;
+            x[n][n];
+            (int) row[1]: @{i = [1:n]} ${j = [1:n]} x[i][j];
+            (int) once[2]: @{i = [1:n]} @{j = [1:n]} @{k = [1:n], j != k} ~(x[i][j] & x[i][k]);
+            (int) sym[1]: @{i = [1:n]} @{j = [1:n]} x[i][j] | x[j][i];
+            (int) asym[1]: @{i = [1:n]} @{j = [1:n], i < j} x[i][j] -> ~x[j][i];
+            (opt) pick: ${i = [1:n]} ${j = [1:n]} (1 - x[i][j]) * i;
+            (opt) pair: ${i = [1:n]} ${j = [1:n]} x[i][j] | ~x[j][i] | x[i][i];
+            """,
+            """
+            n = 3;
+            x[n][n];
+            d[n][n] = {(1,2): 1.5, (2,3): 0.1, (1,3): 3.0, (3,3): 2.0};
+            (int) uniq[1]: @{i = [1:n]} $!{j = [1:n]} x[i][j];
+            (opt) cost: ${i = [1:n]} ${j = [1:n]} ${k = [1:n-1]} d[i][j] * x[i][k] * x[j][k + 1];
+            (opt) sq: ${i = [1:n]} (x[i][1] + x[1][i]) ** 2;
+            """,
+        ]
+
+    @staticmethod
+    def energy(buffer: str):
+        compiler = SatCompiler(INSTRUCTIONS, SatParser())
+        assert compiler.compile(Source(buffer=buffer)) == 0
+        return compiler.energy
+
+    def test_template(self, fix_template, monkeypatch):
+        for buffer in fix_template:
+            energy = self.energy(buffer)
+
+            with monkeypatch.context() as patch:
+                ## Evaluate every iteration in full
+                patch.setattr(Template, "compile", classmethod(lambda cls, expr, loops: None))
+                assert energy == self.energy(buffer)
+
+    def test_compact(self, fix_template):
+        for buffer in fix_template:
+            compiler = SatCompiler(INSTRUCTIONS, SatParser())
+            compiler.flag("compact", True)
+
+            assert compiler.compile(Source(buffer=buffer)) == 0
+            assert compiler.energy == CompactPosiform(self.energy(buffer))
+
+            ## Constraint energies are stored compact, and consumed by the energy equation
+            assert not any(compiler.constraints.values())
+            assert all(
+                isinstance(energy, CompactPosiform)
+                for results in compiler.graph.results
+                if results is not None
+                for energies in results.values()
+                for _, energy in energies
+            )
+
+    @pytest.fixture
+    def fix_loops(self) -> list[str]:
+        return [
+            """
+            n = 5;
+            x[n][n];
+            (int) even[1]: @{i = [1:n], i == 2 | i == 4} ${j = [1:n], (j != i) & ~(i + j > 7)} x[i][j];
+            (int) odd[1]: @{i = [n:1], ~(i == 2)} @{j = [1:n:2], j >= i - 2} ~x[i][j];
+            (opt) diag: ${i = [1:n]} ${j = [1:n], i - j == 1 | j - i == 1} x[i][j] * (i - j);
+            (opt) empty: ${i = [1:n]} ${j = [1:n], i * j < 0} x[i][j];
+            """,
+            """
+            n = 3;
+            x[n][n];
+            (int) uniq[1]: @{i = [1:n]} $!{j = [1:n], j != i} x[i][j];
+            (opt) neg: ${i = [-n:n], (i < 0) & (i != -2)} ${j = [1:n], j + i >= 0} x[j][1] * i;
+            """,
+        ]
+
+    def test_loops(self, fix_loops, monkeypatch):
+        for buffer in fix_loops:
+            energy = self.energy(buffer)
+
+            with monkeypatch.context() as patch:
+                ## Check loop conditions on every iteration
+                patch.setattr(LoopDomain, "compile", classmethod(lambda cls, loops: None))
+                assert energy == self.energy(buffer)
+
+    @pytest.fixture
+    def fix_tseitin(self) -> list[str]:
+        return [
+            """
+            x[3][3];
+            (opt) obj: x[1][1];
+            (int) cond[1]: (x[1][1] & x[1][2]) | (x[2][1] & ~x[2][2]) | (x[3][1] -> x[3][2]);
+            (int) nest[1]: @{i = [1:3]} ${j = [1:2]} (x[i][j] | x[j][i]) & ~(x[i][1] & x[1][j]);
+            (int) uniq[1]: $!{i = [1:3]} x[i][1] | x[i][2] & x[1][2];
+            """,
+        ]
+
+    @staticmethod
+    def penalty(buffer: str) -> Posiform:
+        compiler = SatCompiler(INSTRUCTIONS, SatParser())
+        assert compiler.compile(Source(buffer=buffer)) == 0
+        return Posiform.sum(energy for _, energy in compiler.constraints[CONS_INT])
+
+    @staticmethod
+    def value(energy: Posiform, x: dict) -> float:
+        return sum(c for k, c in energy if k is None or all(x[v] for v in k))
+
+    def test_tseitin(self, fix_tseitin):
+        for buffer in fix_tseitin:
+            penalty = self.penalty(buffer)
+            encoded = self.penalty(f"?tseitin: 0;\n{buffer}")
+
+            xvars = sorted({v for k, _ in penalty if k is not None for v in k})
+            zvars = sorted({v for k, _ in encoded if k is not None for v in k} - set(xvars))
+
+            assert zvars and all(v.startswith("$t") for v in zvars)
+
+            ## Constraints hold exactly when some choice of auxiliary variables zeroes their energy
+            for x in it.product((0, 1), repeat=len(xvars)):
+                x = dict(zip(xvars, x))
+                e = self.value(penalty, x)
+                z = min(
+                    self.value(encoded, {**x, **dict(zip(zvars, z))})
+                    for z in it.product((0, 1), repeat=len(zvars))
+                )
+                assert (e == 0.0 and z == 0.0) or (e >= 1.0 and z >= 1.0)
+
+    @pytest.fixture
+    def fix_parallel(self, fix_template, fix_tseitin) -> list[str]:
+        return [
+            *fix_template,
+            *(f"?tseitin: 0;\n{buffer}" for buffer in fix_tseitin),
+            """
+            n = 2;
+            x[3][3];
+            (int) low[1]: @{i = [1:n]} x[i][i];
+            n = 3;
+            (int) high[2]: @{i = [1:n]} ~x[i][1];
+            (int) some[1]: ${i = [1:n]} @{j = [1:n], j >= i} x[i][j];
+            (opt) cost: ${i = [1:n]} x[i][2] * 0.123456;
+            """,
+        ]
+
+    def test_parallel(self, fix_parallel):
+        for buffer in fix_parallel:
+            energy = self.energy(buffer)
+
+            ## Both whole and sharded outermost loops
+            for workers in (2, 3, 5):
+                compiler = SatCompiler(INSTRUCTIONS, SatParser())
+                compiler.pool = ConstraintPool(workers)
+
+                assert compiler.compile(Source(buffer=buffer)) == 0
+                assert compiler.energy == energy
+
+        compiler = SatCompiler(INSTRUCTIONS, SatParser())
+        compiler.pool = ConstraintPool(2)
+
+        assert compiler.compile(Source(buffer="x[2];\n(int) a[1]: x[1] & y;\n(opt) b: x[2];")) == 1
+        assert compiler.energy is None
+
+    @staticmethod
+    def cached(buffer: str, cache: ConstraintCache, pool: ConstraintPool = None) -> Posiform:
+        compiler = SatCompiler(INSTRUCTIONS, SatParser())
+        compiler.cache = cache
+        compiler.pool = pool
+        assert compiler.compile(Source(buffer=buffer)) == 0
+        return compiler.energy
+
+    def test_cache(self, fix_parallel):
+        cache = ConstraintCache()
+
+        for buffer in fix_parallel:
+            energy = self.energy(buffer)
+
+            assert self.cached(buffer, cache) == energy
+
+            hits, misses = cache.hits, cache.misses
+
+            assert self.cached(buffer, cache) == energy
+            assert self.cached(buffer, cache, ConstraintPool(2)) == energy
+            assert cache.misses == misses and cache.hits > hits
+
+        ## Only constraints whose statement or references changed are compiled again
+        buffer = """
+        n = 3;
+        m = 2;
+        x[n][n];
+        w[n] = {(1): 0.5, (2): 1.5};
+        (int) a[1]: @{i = [1:n]} x[i][1];
+        (int) b[1]: @{i = [1:m]} x[i][2];
+        (opt) c: ${i = [1:n]} x[i][3] * w[i];
+        """
+
+        self.cached(buffer, cache)
+
+        for old, new in [("m = 2", "m = 3"), ("(2): 1.5", "(3): 1.5"), ("x[i][1]", "~x[i][1]")]:
+            misses = cache.misses
+
+            buffer = buffer.replace(old, new)
+
+            assert self.cached(buffer, cache) == self.energy(buffer)
+            assert cache.misses == misses + 1
+
+        ## Bounded by the size of cached energies, dropping the least recently used ones
+        cache = ConstraintCache(maxbytes=100)
+
+        assert self.cached(buffer, cache) == self.energy(buffer)
+        assert len(cache) == 2 and cache.size == sum(map(cache.sizeof, cache.entries.values())) <= 100
+
+        assert ConstraintCache(dict(cache.entries), maxbytes=0).entries == {}
+
+    def test_graph(self, monkeypatch):
+        buffer = """
+        n = 3;
+        m = 2;
+        x[n][n];
+        w[n] = {(1): 0.5, (2): 1.5};
+        (int) a[1]: @{i = [1:n]} x[i][1];
+        (int) b[1]: @{i = [1:m]} x[i][2];
+        (opt) c: ${i = [1:n]} x[i][3] * w[i];
+        """
+
+        compiler = SatCompiler(INSTRUCTIONS, SatParser())
+        assert compiler.compile(Source(buffer=buffer)) == 0
+
+        graph: DependencyGraph = compiler.graph
+
+        ## RUN_INIT, n & m, x & w, a & b & c, RUN_SCRIPT
+        assert graph.parents() == [set(), {0}, {0}, {0, 1}, {0, 1}, {0, 1, 3}, {0, 2, 3}, {0, 1, 3, 4}, set(range(8))]
+        assert graph.affected({Var("m")}) == [2, 6, 8]
+
+        executed = []
+
+        with monkeypatch.context() as patch:
+            step = SatCompiler.step
+            patch.setattr(SatCompiler, "step", lambda self, stmt: (executed.append(stmt), step(self, stmt))[1])
+            assert compiler.rerun({Var("m"): Number("3")}) == 0
+
+        assert [stmt[0] for stmt in executed] == [graph.stmts[j][0] for j in (0, 2, 6, 8)]
+        assert compiler.energy == self.energy(buffer.replace("m = 2", "m = 3"))
+
+    def test_memory(self):
+        i, n = Var("i"), Var("n")
+
+        memory = Memory()
+        memory.memset(n, Number("3"))
+
+        memory.push()
+        memory.memset(i, Number("1"))
+        memory.memset(n, Number("4"))
+        memory.push()
+        memory.memset(n, Number("5"))
+        memory.memset(n, Number("6"))
+
+        assert memory.depth == 3 and memory[n] == Number("6")
+
+        copy = memory.copy()
+        memory.pop()
+
+        assert memory[n] == Number("4") and memory[i] == Number("1")
+
+        memory.pop()
+
+        assert memory[n] == Number("3") and i not in memory
+
+        with pytest.raises(ValueError):
+            memory.pop()
+
+        ## Copies keep their own scopes
+        copy.pop(2)
+        assert copy[n] == Number("3") and copy.depth == 1 and i not in copy
+
+        ## Snapshots share frozen layers, and writes don't leak between them
+        memory = Memory()
+        snapshots = []
+
+        for k in range(20):
+            memory.memset(n, Number(str(k)))
+            memory.push()
+            memory.memset(i, Number(str(k)))
+            snapshots.append(memory.copy())
+            memory.pop()
+
+        memory.memset(i, Number("-1"))
+
+        for k, snapshot in enumerate(snapshots):
+            assert snapshot[n] == Number(str(k)) and snapshot[i] == Number(str(k))
+            snapshot.pop()
+            assert i not in snapshot
+
+        snapshot = pickle.loads(pickle.dumps(memory))
+
+        assert snapshot[n] == Number("19") and snapshot[i] == Number("-1")
+
+    def test_clauses(self):
+        a, b, c = Var("a"), Var("b"), Var("c")
+
+        expr = Expr(
+            T_OR,
+            Expr(T_AND, a, b),
+            Expr(T_AND, a, Expr(T_NOT, Expr(T_NOT, b)), c),
+            Expr(T_AND, a, Expr(T_NOT, a)),
+            Expr(T_AND, b, c),
+            Expr(T_AND, c, b),
+        )
+
+        clauses = Clauses.dnf(expr).simplify()
+
+        assert len(clauses) == 2
+        assert clauses.expr() == Expr(T_OR, Expr(T_AND, a, b), Expr(T_AND, b, c))
+
+        assert Clauses.cnf(Expr(T_AND, Expr(T_OR, a, Expr(T_NOT, a)), a)).simplify().expr() == a
+        assert Clauses.cnf(Expr(T_OR, a, Expr(T_NOT, a))).simplify().expr() == Number("1")
+        assert Clauses.dnf(Expr(T_AND, b, Expr(T_NOT, b))).simplify().expr() == Number("0")
+        assert Clauses.dnf(Expr(T_AND, a, Expr(T_OR, b, c))) is None
+
+    def test_subsumption(self):
+        buffer = """
+        x[3][3];
+        (opt) obj: x[1][1];
+        (int) sub[1]: @{i = [1:3]} (x[i][1] | x[i][2]) & (x[i][1] | x[i][2] | x[i][3]) & (x[i][3] | ~x[i][3]);
+        """
+
+        penalty = self.penalty(buffer)
+
+        ## Only the first disjunction is left
+        assert len(penalty) == 1 + 3 * 3
+
+        for x in it.product((0, 1), repeat=9):
+            x = dict(zip((f"x_{i}_{j}" for i in range(1, 4) for j in range(1, 4)), x))
+            valid = all(x[f"x_{i}_1"] or x[f"x_{i}_2"] for i in range(1, 4))
+            assert (self.value(penalty, x) == 0.0) == valid
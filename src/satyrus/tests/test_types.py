@@ -0,0 +1,151 @@
+# Future Imports
+from __future__ import annotations
+
+# Standard Library
+import gc
+
+# Third-Party
+import pytest
+
+# Local
+from ..satlib import Source
+from ..symbols import T_ADD, T_MUL, T_AND, T_OR, T_NOT, T_NEG, T_IMP, T_RIMP, T_GE, T_LE
+from ..types import Expr, Var, Number
+
+
+class TestExpr:
+    @pytest.fixture
+    def fix_vars(self) -> tuple[Var, Var, Var]:
+        return Var("x"), Var("y"), Var("z")
+
+    def test_intern(self, fix_vars):
+        x, y, z = fix_vars
+
+        assert Expr(T_ADD, x, y) is Expr(T_ADD, y, x)
+        assert Expr(T_MUL, Expr(T_ADD, x, y), z) is Expr(T_MUL, z, Expr(T_ADD, y, x))
+        assert Expr(T_ADD, x, Expr(T_ADD, y, z)) is Expr(T_ADD, Expr(T_ADD, x, y), z)
+        assert Expr(T_NOT, Var("x")) is Expr(T_NOT, x)
+
+        ## Tracked nodes are distinct objects, but equal
+        source = Source(buffer="x + y")
+        expr = Expr(T_ADD, x, y, source=source, lexpos=0)
+
+        assert expr is not Expr(T_ADD, x, y)
+        assert expr == Expr(T_ADD, x, y)
+        assert hash(expr) == hash(Expr(T_ADD, x, y))
+
+    def test_lexinfo(self, fix_vars):
+        x, y, z = fix_vars
+
+        ## Nodes created outside the parser share a single blank position
+        assert x.lexinfo is y.lexinfo is Number("2").lexinfo is Source.BLANK
+
+        source = Source(buffer="x +\n  y\n\nz * 2")
+        expr = Expr(T_MUL, z, Number("2"), source=source, lexpos=len(source) - 5)
+
+        assert (expr.lineno, expr.chrpos) == (4, 0)
+
+        for lexpos in range(len(source) + 1):
+            lexinfo = source.getlex(lexpos)
+            lineno, chrpos = lexinfo["lineno"], lexinfo["chrpos"]
+            assert source[:lexpos].count("\n") + 1 == lineno
+            assert lexpos - (source.rfind("\n", 0, lexpos) + 1) == chrpos
+
+        ## Propagation doesn't touch the shared position
+        source.propagate(expr, Var("w"))
+
+        assert Source.BLANK == {"chrpos": 0, "lineno": 0, "lexpos": 0, "source": None}
+
+    def test_eq(self, fix_vars):
+        x, y, z = fix_vars
+
+        assert Expr(T_ADD, x, y) != Expr(T_MUL, x, y)
+        assert Expr(T_IMP, x, y) != Expr(T_IMP, y, x)
+        assert Expr(T_GE, x, y) != Expr(T_LE, x, y)
+        assert Expr(T_RIMP, x, y) != Expr(T_IMP, x, y)
+        assert Expr(T_ADD, x, y) != x
+        assert Expr(T_ADD, Number("1"), x) != Expr(T_ADD, Var("1"), x)
+
+    def test_collect(self, fix_vars):
+        x, y, z = fix_vars
+
+        size = len(Expr.INTERN)
+
+        Expr(T_MUL, Expr(T_ADD, x, Number("17")), Expr(T_ADD, y, Number("17")))
+
+        gc.collect()
+
+        assert len(Expr.INTERN) <= size
+
+    def test_calculate(self, fix_vars, monkeypatch):
+        x, y, z = fix_vars
+
+        monkeypatch.setattr(Expr, "CALC_CACHE", type(Expr.CALC_CACHE)())
+        monkeypatch.setattr(Expr, "CALC_CACHE_SIZE", 2)
+        monkeypatch.setattr(Expr, "CALC_HITS", 0)
+        monkeypatch.setattr(Expr, "CALC_MISSES", 0)
+
+        expr = Expr(T_ADD, x, x, Expr(T_MUL, Number("2"), y))
+
+        result = Expr.calculate(expr)
+
+        assert result == Expr(T_ADD, Expr(T_MUL, Number("2"), x), Expr(T_MUL, Number("2"), y))
+        assert Expr.calculate(expr) is result
+        assert Expr.calculate_info() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+
+        ## Least recently used entries are dropped
+        Expr.calculate(Expr(T_MUL, x, Number("1")))
+        Expr.calculate(Expr(T_MUL, y, Number("1")))
+        Expr.calculate(expr)
+
+        assert Expr.calculate_info() == {"hits": 1, "misses": 4, "size": 2, "maxsize": 2}
+
+        ## Results depend on precision
+        prec = Number.prec()
+        try:
+            Number.prec(4)
+            assert Expr.calculate(Expr(T_ADD, Number("1.23456"), z)) == Expr(T_ADD, Number("1.235"), z)
+            Number.prec(prec)
+            assert Expr.calculate(Expr(T_ADD, Number("1.23456"), z)) == Expr(T_ADD, Number("1.23456"), z)
+        finally:
+            Number.prec(prec)
+
+        Expr.calculate_clear()
+
+        assert Expr.calculate_info() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 2}
+
+    @pytest.fixture
+    def fix_deep(self) -> Expr:
+        ## Deeper than the recursion limit
+        expr = Var("x_0")
+        for k in range(1, 5_000):
+            expr = Expr(T_AND if k % 2 else T_OR, Var(f"x_{k}"), expr)
+        return expr
+
+    def test_deep(self, fix_deep):
+        expr = fix_deep
+
+        assert len(list(Expr.traverse(expr))) == 2 * 5_000 - 1
+        assert Expr.seek(expr, lambda x: x.is_var) == [Var(f"x_{k}") for k in [*range(4_999, 1, -1), 0, 1]]
+        assert Expr.tell(expr, all, lambda x: not x.is_number)
+        assert not Expr.tell(expr, any, lambda x: x.is_expr and x.head == T_NOT)
+
+        leaves = []
+        Expr.transverse(expr, leaves.append)
+        assert len(leaves) == 5_000
+
+        assert Expr.apply(expr, lambda x: x) is expr
+        assert Expr.back_apply(expr, lambda x: x) is expr
+        assert Expr.sub(expr, Var("x_0"), Var("y")) == Expr(T_AND, Var("x_4999"), Expr.sub(expr[2], Var("x_0"), Var("y")))
+        assert Expr.calculate(expr) is expr
+        assert expr.logical
+
+    def test_fold(self, fix_vars):
+        x, y, z = fix_vars
+
+        ## Binary negation keeps its operands in order
+        expr = Expr(T_NEG, Expr(T_MUL, x, y), Expr(T_NOT, z))
+
+        assert Expr.fold(expr, lambda e, t: 1 if t is None else 1 + sum(t)) == 6
+        assert Expr.fold(expr, lambda e, t: str(e) if t is None else f"{e.head}({', '.join(t)})") == "-(*(x, y), ~(z))"
+        assert Expr.fold(expr, lambda e, t: e if t is None else Expr(e.head, *t), lambda e: Number("0") if e == z else e) == Expr(T_NEG, Expr(T_MUL, x, y), Expr(T_NOT, Number("0")))
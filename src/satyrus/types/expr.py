@@ -6,6 +6,8 @@ from typing import Callable
 
 # Standard Library
 import itertools as it
+import weakref
+from collections import OrderedDict
 from functools import reduce
 
 # Local
@@ -57,6 +59,8 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
     ):
         """An Expr instance is a (head, tail) pair representing an expression. Here is applied, according to `sort` and `flat` parameters, child sorting and n-ary expression flatening.
 
+        Expressions are interned: building an expression that already exists returns the existing node, unless a `source` is given, in which case a new node is tracked but still shares its identity with the interned one.
+
         Parameters
         ----------
         head : str
@@ -65,13 +69,33 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
             Operand sequence
         """
         if sort and flat:
-            return tuple.__new__(cls, (head, *cls.sort(head, cls.flat(head, tail))))
+            tail = cls.sort(head, cls.flat(head, tail))
         elif sort:
-            return tuple.__new__(cls, (head, *cls.sort(head, tail)))
+            tail = cls.sort(head, tail)
         elif flat:
-            return tuple.__new__(cls, (head, *cls.flat(head, tail)))
-        else:
-            return tuple.__new__(cls, (head, *tail))
+            tail = cls.flat(head, tail)
+
+        key = (head, sort, flat, *map(cls.intern_key, tail))
+
+        handle = cls.INTERN.get(key)
+
+        if handle is not None and source is None:
+            return handle.expr
+
+        expr = tuple.__new__(cls, (head, *tail))
+
+        SatType.__init__(expr, source=source, lexpos=lexpos)
+        expr._flat_ = flat
+        expr._sort_ = sort
+
+        if handle is None:
+            handle = cls.Handle(expr)
+            cls.INTERN[key] = handle
+
+        expr._handle_ = handle
+        expr._hash_ = hash(handle)
+
+        return expr
 
     def __init__(
         self,
@@ -82,10 +106,20 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
         source: Source = None,
         lexpos: int = None,
     ):
-        SatType.__init__(self, source=source, lexpos=lexpos)
-        self._flat_ = flat
-        self._sort_ = sort
-        self._hash_ = None
+        """Everything is done at `__new__`, since interned nodes must not be initialized twice."""
+
+    def __reduce__(self):
+        """Unpickled expressions are interned again on the receiving side."""
+        return (self.__class__._restore, (tuple(self), self._sort_, self._flat_, self.lexinfo))
+
+    @classmethod
+    def _restore(cls, expr: tuple, sort: bool, flat: bool, lexinfo: dict) -> Expr:
+        if lexinfo["source"] is None:
+            return cls(*expr, sort=sort, flat=flat)
+        else:
+            restored = cls(*expr, sort=sort, flat=flat, source=lexinfo["source"], lexpos=0)
+            restored.lexinfo = lexinfo
+            return restored
 
     @property
     def head(self) -> str:
@@ -226,42 +260,33 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
     def __repr__(self):
         return f"Expr({', '.join(map(repr, self))})"
 
-    # -*- Hash Computing -*-
-    HASH_COM = lambda h: (lambda *X: hash((h, hash(sum(map(hash, X))))))
-    HASH_NCM = lambda h: (lambda *X: hash((h, hash(tuple(map(hash, X))))))
-    HASH_REV = lambda h: (lambda *X: hash((h, hash(tuple(map(hash, reversed(X)))))))
-    HASH_IDP = lambda h: (lambda x: (ord(h) - hash(x)))
+    # -*- Interning -*-
+    class Handle(object):
+        """Identity of an interned expression. Tuples can't be weakly referenced, so the intern table refers to handles instead, which live as long as some node sharing their identity does."""
 
-    HASH = {
-        ## Logical
-        T_OR: HASH_COM(T_OR),
-        T_AND: HASH_COM(T_AND),
-        T_NOT: HASH_IDP(T_NOT),
-        T_XOR: HASH_NCM(T_XOR),
-        T_IMP: HASH_NCM(T_IMP),
-        T_RIMP: HASH_REV(T_IMP),
-        T_IFF: HASH_COM(T_IFF),
-        ## Arithmetic
-        T_ADD: HASH_COM(T_ADD),
-        T_NEG: HASH_IDP(T_NEG),
-        T_MUL: HASH_COM(T_MUL),
-        T_DIV: HASH_NCM(T_DIV),
-        T_MOD: HASH_NCM(T_MOD),
-        T_POW: HASH_NCM(T_POW),
-        ## Comparisons
-        T_EQ: HASH_COM(T_EQ),
-        T_NE: HASH_COM(T_NE),
-        T_GE: HASH_NCM(T_GE),
-        T_LE: HASH_NCM(T_GE),
-        T_GT: HASH_NCM(T_GT),
-        T_LT: HASH_NCM(T_GT),
-        ## Indexing
-        T_IDX: HASH_NCM(T_IDX),
-    }
+        __slots__ = ("expr", "hash", "__weakref__")
+
+        def __init__(self, expr: Expr):
+            self.expr = expr
+            self.hash = hash(tuple(map(hash, expr)))
+
+        def __hash__(self):
+            return self.hash
+
+    ## Expression structure (head, flags and operand identities) -> Handle
+    INTERN: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def intern_key(p: SatType) -> object:
+        """Operand identity: interned handle for expressions, the object itself for arrays, whose contents change, and type and value for everything else."""
+        if p.is_expr:
+            return p._handle_
+        elif p.is_array:
+            return (type(p), id(p))
+        else:
+            return (type(p), p)
 
     def __hash__(self):
-        if self._hash_ is None:
-            self._hash_ = self.HASH[self.head](*self.tail)
         return self._hash_
 
     # -*- Computation Rules -*-
@@ -279,7 +304,7 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
                 else:
                     cons_table.append(p)
             else:
-                expr_table[hash(p)] = p
+                expr_table[p] = p
 
         cons = reduce(lambda x, y: x._OR_(y), cons_table, Number("0"))
 
@@ -312,7 +337,7 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
                 else:
                     cons_table.append(p)
             else:
-                expr_table[hash(p)] = p
+                expr_table[p] = p
 
         cons = reduce(lambda x, y: x._AND_(y), cons_table, Number("1"))
 
@@ -361,16 +386,16 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
                 else:
                     q = cls(T_MUL, *t)
 
-                if hash(q) in hash_table:
-                    expr_table[hash(q)] += c
+                if q in hash_table:
+                    expr_table[q] += c
                 else:
-                    hash_table[hash(q)] = q
-                    expr_table[hash(q)] = c
-            elif hash(p) in hash_table:
-                expr_table[hash(p)] += Number("1")
+                    hash_table[q] = q
+                    expr_table[q] = c
+            elif p in hash_table:
+                expr_table[p] += Number("1")
             else:
-                hash_table[hash(p)] = p
-                expr_table[hash(p)] = Number("1")
+                hash_table[p] = p
+                expr_table[p] = Number("1")
 
         cons = reduce(lambda x, y: x._ADD_(y), cons_table, Number("0"))
 
@@ -529,10 +554,18 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
         else:
             return expr
 
+    ## Least recently used results of `calculate`: (expression, precision) -> result
+    CALC_CACHE: OrderedDict = OrderedDict()
+    CALC_CACHE_SIZE: int = 1 << 16
+    CALC_HITS: int = 0
+    CALC_MISSES: int = 0
+
     @classmethod
     def calculate(cls, expr: SatType) -> SatType:
         """\
         Applies rules as described in `cls.RULES` for each expression, in a backward fashion i.e. from leaves to root, then, applies forward. As result, may yield Var, Number or Expr.
+
+        Results are cached per interned expression and numeric precision, see `cls.calculate_info`.
         
         Parameters
         ----------
@@ -543,7 +576,108 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
         -------
         SatType
         """
-        return cls.apply(cls.back_apply(expr, cls.apply_rule), cls.apply_rule)
+        if not expr.is_expr:
+            return cls.apply(cls.back_apply(expr, cls.apply_rule), cls.apply_rule)
+
+        key = (expr, Number.prec())
+
+        if key in cls.CALC_CACHE:
+            cls.CALC_HITS += 1
+            cls.CALC_CACHE.move_to_end(key)
+            return cls.CALC_CACHE[key]
+
+        cls.CALC_MISSES += 1
+
+        result = cls.apply(cls.back_apply(expr, cls.apply_rule), cls.apply_rule)
+
+        cls.CALC_CACHE[key] = result
+
+        if len(cls.CALC_CACHE) > cls.CALC_CACHE_SIZE:
+            cls.CALC_CACHE.popitem(last=False)
+
+        return result
+
+    @classmethod
+    def calculate_info(cls) -> dict:
+        """Hit and miss counts for the `calculate` cache, as well as its current and maximum sizes."""
+        return {
+            "hits": cls.CALC_HITS,
+            "misses": cls.CALC_MISSES,
+            "size": len(cls.CALC_CACHE),
+            "maxsize": cls.CALC_CACHE_SIZE,
+        }
+
+    @classmethod
+    def calculate_clear(cls):
+        """Empties the `calculate` cache and resets its counters."""
+        cls.CALC_CACHE.clear()
+        cls.CALC_HITS = 0
+        cls.CALC_MISSES = 0
+
+    # -*- Traversal Engine -*-
+    @classmethod
+    def traverse(cls, e: SatType):
+        """\
+        Yields every node of the expression tree, depth-first, parents before their operands. Uses an explicit stack, so tree depth isn't bound by the recursion limit.
+
+        Parameters
+        ----------
+        e : SatType
+            Expression to be traversed.
+        """
+        stack = [e]
+
+        while stack:
+            x = stack.pop()
+            yield x
+            if x.is_expr:
+                stack.extend(reversed(x.tail))
+
+    @classmethod
+    def fold(cls, e: SatType, f: Callable, g: Callable = None):
+        """\
+        Computes the value of the expression tree bottom-up, using an explicit stack, so tree depth isn't bound by the recursion limit.
+
+        Parameters
+        ----------
+        e : SatType
+            Expression to be folded.
+        f : Callable
+            Function `f(x: SatType, t: list | None)` that computes the value of node `x` given the values `t` of its operands, with `t = None` for leaves.
+        g : Callable (optional)
+            Function `g(x: SatType) -> SatType` that rewrites every subtree before its operands are visited.
+        """
+        if g is not None:
+            e = g(e)
+
+        if not e.is_expr:
+            return f(e, None)
+
+        ## Nodes being visited, along with the values of their operands visited so far
+        stack = [(e, [])]
+
+        while True:
+            x, t = stack[-1]
+
+            if len(t) + 1 < len(x):
+                y = x[len(t) + 1]
+
+                if g is not None:
+                    y = g(y)
+
+                if y.is_expr:
+                    stack.append((y, []))
+                else:
+                    t.append(f(y, None))
+            else:
+                stack.pop()
+
+                y = f(x, t)
+
+                if stack:
+                    stack[-1][1].append(y)
+                else:
+                    return y
 
     @classmethod
     def transverse(cls, e: SatType, f: Callable, *args, **kwargs) -> None:
@@ -561,11 +695,32 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
         **kwargs : dict (optional)
             `f`'s key-word arguments
         """
-        if e.is_expr:
-            for x in e.tail:
-                cls.transverse(x, f, *args, **kwargs)
-        else:
-            f(e, *args, **kwargs)
+        for x in cls.traverse(e):
+            if not x.is_expr:
+                f(x, *args, **kwargs)
+
+    @classmethod
+    def canonical(cls, e: SatType, f: Callable = repr) -> str:
+        """\
+        String form of the expression tree that doesn't depend on the order of operands of commutative operations, which is hash based and thus changes between interpreter sessions.
+
+        Parameters
+        ----------
+        e : SatType
+            Expression to be written.
+        f : Callable (optional)
+            Function `f(x: SatType) -> str` for leaves, defaults to `repr`.
+        """
+
+        def canonical(x: SatType, t: list | None) -> str:
+            if t is None or not x.is_expr:
+                return f(x)
+            elif x.head in cls.DO_SORT:
+                return f"{x.head}({','.join(sorted(t))})"
+            else:
+                return f"{x.head}({','.join(t)})"
+
+        return cls.fold(e, canonical)
 
     @classmethod
     def seek(cls, e: SatType, f, *a, **kw) -> list:
@@ -583,25 +738,14 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
         **kw : dict (optional)
             `f`'s key-word arguments
         """
-        if e.is_expr:
-            return [y for x in e.tail for y in cls.seek(x, f, *a, **kw)]
-        else:
-            if f(e, *a, **kw):
-                return [e]
-            else:
-                return []
+        return [x for x in cls.traverse(e) if not x.is_expr and f(x, *a, **kw)]
 
     @classmethod
     def tell(cls, e: SatType, c: Callable, f: Callable, *a: tuple, **kw: dict) -> bool:
         """Returns either `True` or `False` if `choice` subtrees
-        satisfies `func`.
+        satisfies `func`. The choice `c` is either `all` or `any`, which are applied at once to the whole tree.
         """
-        if e.is_expr:
-            h = (f(e, *a, **kw),)
-            t = (cls.tell(x, c, f, *a, **kw) for x in e.tail)
-            return c(it.chain(h, t))
-        else:
-            return f(e, *a, **kw)
+        return c(f(x, *a, **kw) for x in cls.traverse(e))
 
     @classmethod
     def apply(cls, e: SatType, f: Callable, *a: tuple, **kw: dict) -> SatType:
@@ -612,23 +756,19 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
         ...    new_expr = ...
         ...    return new_expr
         """
-
-        e = f(e, *a, **kw)
-
-        if e.is_expr:
-            t = (cls.apply(x, f, *a, **kw) for x in e.tail)
-            return cls(e.head, *t)
-        else:
-            return e
+        return cls.fold(
+            e,
+            lambda x, t: x if t is None else cls(x.head, *t),
+            lambda x: f(x, *a, **kw),
+        )
 
     @classmethod
     def back_apply(cls, e: SatType, f: Callable, *a: tuple, **kw: dict):
         """Backward-applies function `func` to `expr`."""
-        if e.is_expr:
-            t = (cls.back_apply(x, f, *a, **kw) for x in e.tail)
-            return f(cls(e.head, *t, *a, **kw))
-        else:
-            return f(e, *a, **kw)
+        return cls.fold(
+            e,
+            lambda x, t: f(x if t is None else cls(x.head, *t), *a, **kw),
+        )
 
     @classmethod
     def sub(cls, e: SatType, x: SatType, y: SatType) -> SatType:
@@ -667,10 +807,10 @@ class Expr(tuple, SatType, metaclass=MetaSatType):
 
     # -*- Comparison Operator Definition -*-
     def __eq__(self, other) -> bool:
-        return hash(self) == hash(other)
+        return isinstance(other, Expr) and self._handle_ is other._handle_
 
     def __ne__(self, other) -> bool:
-        return hash(self) != hash(other)
+        return not self.__eq__(other)
 
     # -*- Python Magic Method Aliases -*-
     def __invert__(self):